@@ -0,0 +1,246 @@
+"""
+Micro-benchmarks for the collision routines that run every frame.
+
+Run from the repository root:
+
+    python -m benchmarks.collision_benchmark --output bench.json
+    python -m benchmarks.collision_benchmark --baseline bench.json --threshold 1.25
+
+Results are written to JSON. When a baseline file is given, every benchmark's median time is compared to the
+baseline's, and the run fails (exit code 1) if any of them got slower by more than the threshold factor.
+On machines without a display, set ARCADE_HEADLESS=1.
+"""
+
+import argparse
+import itertools
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+import shapely
+from pyglet.math import Vec2
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.reporting import (
+    add_report_arguments,
+    compare_to_baseline,
+    format_slowdown,
+    read_results,
+    report_regressions,
+    write_results,
+)
+from benchmarks.synthetic_map import cell_center, create_synthetic_map
+from luna.collision import collision, engine
+from luna.core.map import Map
+from luna.core.region_type import RegionType
+from luna.entities.character import Character
+from luna.game_objects.luna import Luna
+from luna.managers.state_manager import StateManager
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000]
+
+# Numbers of candidate polygons to sweep against in one call
+CANDIDATE_COUNTS = [1, 4, 16, 500]
+
+# How many distinct positions the map benchmarks cycle through, so one lucky spot doesn't dominate
+PROBE_POSITIONS = 64
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Timing of one benchmark, per call.
+
+    :var name: The name of the benchmarked routine.
+    :var regions: The number of regions in the map it ran against, or 0 if it doesn't use a map.
+    :var rounds: How many timed batches were run.
+    :var iterations: How many calls were made in each batch.
+    """
+
+    name: str
+    regions: int
+    rounds: int
+    iterations: int
+    mean_us: float
+    median_us: float
+    p99_us: float
+    min_us: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.regions}]"
+
+
+def time_call(name: str, regions: int, func: Callable[[], Any], min_time: float) -> BenchmarkResult:
+    """
+    Time `func`, calling it in batches until `min_time` seconds have passed.
+
+    :param name: The name to record the result under.
+    :param regions: The map size to record the result under.
+    :param func: The function to time.
+    :param min_time: The minimum total time to spend, in seconds.
+    """
+    # Calibrate the batch size so that one batch takes about a millisecond
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        if time.perf_counter() - start >= 0.001:
+            break
+        iterations *= 2
+
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(samples) < 5:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - start) / iterations * 1e6)
+
+    samples.sort()
+    return BenchmarkResult(
+        name=name,
+        regions=regions,
+        rounds=len(samples),
+        iterations=iterations,
+        mean_us=statistics.fmean(samples),
+        median_us=statistics.median(samples),
+        p99_us=samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        min_us=samples[0],
+    )
+
+
+def _create_luna(game_map: Map) -> Luna:
+    luna = Luna(StateManager(current_map=game_map, character=Character()))
+    luna.position = Vec2(0, 0)
+    luna.gravity = game_map.gravity
+    return luna
+
+
+def benchmark_geometry(min_time: float) -> list[BenchmarkResult]:
+    """
+    Benchmarks of the collision routines that don't depend on a map. `move_polygon_into_polygons` is timed against
+    rows of candidates (recorded as its regions), from a few, which take its scalar path, to a batch.
+    """
+    square = [(0, 0), (0, 1), (1, 1), (1, 0)]
+    other_square = [(2, 0), (2, 1), (3, 1), (3, 0)]
+    movement = Vec2(10, 0)
+
+    results = [
+        time_call("sweep_polygon", 0, lambda: collision.sweep_polygon(polygon=square, vector=movement), min_time),
+        time_call(
+            "move_polygon_into_other_polygon",
+            0,
+            lambda: collision.move_polygon_into_other_polygon(
+                polygon=square, movement_vector=movement, other_polygon=other_square
+            ),
+            min_time,
+        ),
+    ]
+    for count in CANDIDATE_COUNTS:
+        # A row of squares in the path of the movement
+        others = engine.pack_polygons([[(x + 2 * i, y) for x, y in other_square] for i in range(count)])
+        results.append(
+            time_call(
+                "move_polygon_into_polygons",
+                count,
+                lambda others=others: engine.move_polygon_into_polygons(square, movement, others),
+                min_time,
+            )
+        )
+    return results
+
+
+def benchmark_map(region_count: int, min_time: float) -> list[BenchmarkResult]:
+    """
+    Benchmarks of the collision routines that query a map, on a synthetic map of the given size.
+    """
+    game_map = create_synthetic_map(region_count)
+    step = max(1, region_count // PROBE_POSITIONS)
+    positions = [cell_center(game_map, cell) for cell in range(0, region_count, step)][:PROBE_POSITIONS]
+
+    probes = itertools.cycle([shapely.box(x - 25, y - 1000, x + 25, y + 80) for x, y in positions])
+    ground_index = game_map.spatial_index(RegionType.GROUND)
+
+    luna = _create_luna(game_map)
+    luna_positions = itertools.cycle([Vec2(x, y) for x, y in positions])
+
+    def find_ground_below() -> None:
+        luna.position = next(luna_positions)
+        luna.find_ground_below()
+
+    def resolve_wall_collisions_direction() -> None:
+        luna.position = next(luna_positions)
+        luna.resolve_wall_collisions_direction(1)
+
+    return [
+        time_call("SpatialTree.query", region_count, lambda: ground_index.query(next(probes)), min_time),
+        time_call(
+            "SpatialTree.query[intersects]",
+            region_count,
+            lambda: ground_index.query(next(probes), predicate="intersects"),
+            min_time,
+        ),
+        time_call("Luna.find_ground_below", region_count, find_ground_below, min_time),
+        time_call(
+            "Luna.resolve_wall_collisions_direction", region_count, resolve_wall_collisions_direction, min_time
+        ),
+    ]
+
+
+def baseline_medians(baseline: dict[str, Any] | None) -> dict[str, float] | None:
+    """
+    The median time of each benchmark in a results file, by key.
+    """
+    if baseline is None:
+        return None
+    return {f"{entry['name']}[{entry['regions']}]": entry["median_us"] for entry in baseline["benchmarks"]}
+
+
+def print_results(
+    console: Console, comparisons: list[tuple[BenchmarkResult, float | None]], threshold: float
+) -> None:
+    table = Table(title="Collision benchmarks (µs per call)")
+    for column in ("Benchmark", "Regions", "Median", "Mean", "p99", "Min", "vs. baseline"):
+        table.add_column(column, justify="left" if column == "Benchmark" else "right")
+
+    for result, slowdown in comparisons:
+        table.add_row(
+            result.name,
+            f"{result.regions:,}" if result.regions else "-",
+            f"{result.median_us:.2f}",
+            f"{result.mean_us:.2f}",
+            f"{result.p99_us:.2f}",
+            f"{result.min_us:.2f}",
+            format_slowdown(slowdown, threshold),
+        )
+    console.print(table)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Synthetic map sizes (regions)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds to spend on each benchmark")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    console = Console()
+    results = benchmark_geometry(args.min_time)
+    for size in args.sizes:
+        with console.status(f"Benchmarking map with {size:,} regions..."):
+            results.extend(benchmark_map(size, args.min_time))
+
+    comparisons = compare_to_baseline(
+        results, lambda result: result.median_us, baseline_medians(read_results(args.baseline))
+    )
+    print_results(console, comparisons, args.threshold)
+    write_results(console, args.output, {"benchmarks": [asdict(result) for result in results]})
+    return report_regressions(console, comparisons, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
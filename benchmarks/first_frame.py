@@ -0,0 +1,50 @@
+"""
+Starts the game, and reports how long it took to get its first frame on screen. Run by the startup benchmark in a
+fresh interpreter, with the time it was launched at:
+
+    python -m benchmarks.first_frame 1718000000.123
+
+Prints one line of JSON with the seconds from launch to the end of each startup phase, then exits. Only the standard
+library is imported before the game's own imports, so they are all counted.
+"""
+
+import json
+import sys
+import time
+
+
+def main(launched_at: float) -> None:
+    phases: dict[str, float] = {"interpreter": time.time() - launched_at}
+
+    import arcade
+
+    from luna.main import FONT_PATH
+    from luna.managers.game_manager import GameManager
+    from luna.utils.logging import configure_logging
+
+    phases["imports"] = time.time() - launched_at
+
+    configure_logging()
+    arcade.load_font(FONT_PATH)
+    game_manager = GameManager()
+    phases["game_manager"] = time.time() - launched_at
+
+    view = game_manager.screen_manager.current_view
+    draw = view.on_draw
+
+    def on_draw() -> None:
+        draw()
+        # Wait for the frame to actually be drawn, not just queued up
+        game_manager.window.ctx.finish()
+        phases["first_frame"] = time.time() - launched_at
+        print(json.dumps(phases), flush=True)
+        arcade.exit()
+
+    # The view's handlers are looked up when it is shown, so this one is called instead
+    view.on_draw = on_draw  # type: ignore[method-assign]
+    game_manager.start()
+    arcade.run()
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]))
@@ -0,0 +1,124 @@
+"""
+Results files, baseline comparison and regression reports shared by the benchmark runners.
+
+A runner adds the `--output`, `--baseline` and `--threshold` options with `add_report_arguments`, compares its results
+to the baseline's with `compare_to_baseline`, and finishes with `write_results` and `report_regressions`, whose
+return value is its exit code.
+"""
+
+import argparse
+import json
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Protocol, Sequence, TypeVar
+
+from rich.console import Console
+from rich.markup import escape
+
+RESULTS_VERSION = 1
+
+DEFAULT_THRESHOLD = 1.25
+
+
+class Result(Protocol):
+    @property
+    def key(self) -> str: ...
+
+
+R = TypeVar("R", bound=Result)
+
+
+def add_report_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options for writing the results, and for comparing them to a baseline.
+    """
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="Compare against this previous results JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Fail if a benchmark is this many times slower than baseline",
+    )
+
+
+def compare_to_baseline(
+    results: Sequence[R], median: Callable[[R], float | None], baseline_medians: dict[str, float] | None
+) -> list[tuple[R, float | None]]:
+    """
+    Compare results to a baseline.
+
+    :param results: The results of this run.
+    :param median: The median time of a result, or None if it has none (e.g. it failed.)
+    :param baseline_medians: The median time of each result in the baseline, by key, or None if there is no baseline.
+    :return: Each result with its slowdown factor relative to the baseline, or None if the baseline doesn't have it.
+    """
+    comparisons: list[tuple[R, float | None]] = []
+    for result in results:
+        result_median = median(result)
+        baseline_median = (baseline_medians or {}).get(result.key)
+        slowdown = None
+        if result_median is not None and baseline_median is not None:
+            slowdown = result_median / baseline_median
+        comparisons.append((result, slowdown))
+    return comparisons
+
+
+def format_slowdown(slowdown: float | None, threshold: float) -> str:
+    """
+    A slowdown factor as a table cell: red if it is over the threshold, otherwise green.
+    """
+    if slowdown is None:
+        return "-"
+    style = "red" if slowdown > threshold else "green"
+    return f"[{style}]{slowdown:.2f}x[/{style}]"
+
+
+def read_results(path: Path | None) -> dict[str, Any] | None:
+    """
+    Read a results file, e.g. the baseline.
+
+    :param path: The file, or None for no file.
+    """
+    return json.loads(path.read_text()) if path is not None else None
+
+
+def write_results(console: Console, path: Path | None, results: dict[str, Any]) -> None:
+    """
+    Write results to a JSON file, along with when and where they were measured.
+
+    :param console: Where to say the file was written.
+    :param path: The file, or None not to write one.
+    :param results: The runner's results, as JSON-compatible values.
+    """
+    if path is None:
+        return
+    path.write_text(
+        json.dumps(
+            {
+                "version": RESULTS_VERSION,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "processor": platform.processor(),
+                **results,
+            },
+            indent=2,
+        )
+    )
+    console.print(f"Results written to {path}")
+
+
+def report_regressions(console: Console, comparisons: list[tuple[R, float | None]], threshold: float) -> int:
+    """
+    Print the results that got slower than the baseline by more than the threshold.
+
+    :return: The runner's exit code: 1 if there were any regressions, otherwise 0.
+    """
+    regressions = [result for result, slowdown in comparisons if slowdown is not None and slowdown > threshold]
+    for result in regressions:
+        console.print(
+            f"[red]Regression:[/red] {escape(result.key)} is slower than the baseline by more than {threshold}x"
+        )
+    return 1 if regressions else 0
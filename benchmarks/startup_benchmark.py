@@ -0,0 +1,265 @@
+"""
+Cold-start benchmark: how long importing Luna's modules takes, and how long the game takes to get its first frame on
+screen.
+
+Run from the repository root:
+
+    python -m benchmarks.startup_benchmark --output startup.json
+    python -m benchmarks.startup_benchmark --baseline startup.json --threshold 1.25
+
+Every measurement is taken in a fresh interpreter. Imports are timed with `python -X importtime`, which also shows
+which packages the time went to. The time to first frame is measured from launching the game to its first frame being
+drawn, and needs a display; without one it is skipped.
+
+Results are written to JSON. When a baseline file is given, every median time is compared to the baseline's, and the
+run fails (exit code 1) if any of them got slower by more than the threshold factor.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.reporting import (
+    add_report_arguments,
+    compare_to_baseline,
+    format_slowdown,
+    read_results,
+    report_regressions,
+    write_results,
+)
+
+REPOSITORY_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules whose import time is measured: a utility module on its own, the collision routines, the map loader, and
+# everything the game imports to start up
+DEFAULT_MODULES = ["luna.utils.tiled_utils", "luna.collision.collision", "luna.utils.map_loader", "luna.main"]
+
+# Number of packages listed per module, heaviest first
+MAX_LISTED_PACKAGES = 5
+
+# Seconds to wait for the game's first frame before giving up
+FIRST_FRAME_TIMEOUT = 120
+
+
+@dataclass
+class ImportResult:
+    """
+    Timing of a cold import of one module, with everything it imports.
+
+    :var module: The imported module.
+    :var rounds: How many fresh interpreters it was imported in.
+    :var packages: The median time spent importing each top-level package, in milliseconds, heaviest first.
+    :var error: Why the module couldn't be imported, if it couldn't.
+    """
+
+    module: str
+    rounds: int
+    median_ms: float = 0.0
+    min_ms: float = 0.0
+    packages: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def key(self) -> str:
+        return f"import {self.module}"
+
+
+@dataclass
+class FirstFrameResult:
+    """
+    Time from launching the game to its first frame being drawn.
+
+    :var rounds: How many times the game was launched.
+    :var phases: The median time from launch to the end of each startup phase, in milliseconds, in order.
+    :var error: Why the game couldn't be started, if it couldn't.
+    """
+
+    rounds: int
+    median_ms: float = 0.0
+    min_ms: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def key(self) -> str:
+        return "first frame"
+
+
+def parse_import_times(importtime_output: str) -> dict[str, float]:
+    """
+    Parse the output of `python -X importtime`, for the imports made after the interpreter started up.
+
+    :param importtime_output: What the interpreter wrote to stderr.
+    :return: The time spent importing each top-level package (not counting the packages it imported), in
+             milliseconds.
+    """
+    package_times: dict[str, float] = defaultdict(float)
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header
+        if name == " site":
+            # Everything up to here is the interpreter starting up
+            package_times.clear()
+            continue
+        package_times[name.strip().split(".")[0]] += int(self_us) / 1e3
+    return dict(package_times)
+
+
+def benchmark_import(module: str, rounds: int) -> ImportResult:
+    """
+    Import a module in fresh interpreters, timing every import.
+
+    :param module: The module to import.
+    :param rounds: How many times to import it. One more (untimed) import is made first, to compile the bytecode.
+    """
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    totals = []
+    package_samples: dict[str, list[float]] = defaultdict(list)
+    for round_number in range(rounds + 1):
+        process = subprocess.run(command, cwd=REPOSITORY_ROOT, capture_output=True, text=True)
+        if process.returncode != 0:
+            return ImportResult(module=module, rounds=0, error=_error_message(process.stderr))
+        if round_number == 0:
+            continue
+
+        package_times = parse_import_times(process.stderr)
+        totals.append(sum(package_times.values()))
+        for package, milliseconds in package_times.items():
+            package_samples[package].append(milliseconds)
+
+    packages = {package: statistics.median(samples) for package, samples in package_samples.items()}
+    return ImportResult(
+        module=module,
+        rounds=rounds,
+        median_ms=statistics.median(totals),
+        min_ms=min(totals),
+        packages=dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)),
+    )
+
+
+def benchmark_first_frame(rounds: int) -> FirstFrameResult:
+    """
+    Launch the game, and time how long it takes to draw its first frame.
+
+    :param rounds: How many times to launch it.
+    """
+    samples: list[dict[str, float]] = []
+    for _ in range(rounds):
+        command = [sys.executable, "-m", "benchmarks.first_frame", repr(time.time())]
+        try:
+            process = subprocess.run(
+                command, cwd=REPOSITORY_ROOT, capture_output=True, text=True, timeout=FIRST_FRAME_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            return FirstFrameResult(rounds=0, error=f"no frame within {FIRST_FRAME_TIMEOUT} seconds")
+        lines = process.stdout.strip().splitlines()
+        if process.returncode != 0 or not lines:
+            return FirstFrameResult(rounds=0, error=_error_message(process.stderr))
+        samples.append(json.loads(lines[-1]))
+
+    first_frames = [sample["first_frame"] * 1e3 for sample in samples]
+    return FirstFrameResult(
+        rounds=rounds,
+        median_ms=statistics.median(first_frames),
+        min_ms=min(first_frames),
+        phases={phase: statistics.median(sample[phase] for sample in samples) * 1e3 for phase in samples[0]},
+    )
+
+
+def _error_message(stderr: str) -> str:
+    # The last line of the traceback, skipping the import times that are written along with it
+    lines = [line for line in stderr.strip().splitlines() if not line.startswith("import time:")]
+    return lines[-1] if lines else "failed"
+
+
+def baseline_medians(baseline: dict[str, Any] | None) -> dict[str, float] | None:
+    """
+    The median time of each measurement that succeeded in a results file, by key.
+    """
+    if baseline is None:
+        return None
+    medians = {
+        f"import {entry['module']}": entry["median_ms"] for entry in baseline["imports"] if entry["error"] is None
+    }
+    if baseline.get("first_frame") and baseline["first_frame"]["error"] is None:
+        medians["first frame"] = baseline["first_frame"]["median_ms"]
+    return medians
+
+
+def print_results(
+    console: Console, comparisons: list[tuple[ImportResult | FirstFrameResult, float | None]], threshold: float
+) -> None:
+    table = Table(title="Startup benchmarks (ms)")
+    for column in ("Benchmark", "Median", "Min", "Breakdown", "vs. baseline"):
+        table.add_column(column, justify="left" if column in ("Benchmark", "Breakdown") else "right")
+
+    for result, slowdown in comparisons:
+        if result.error is not None:
+            table.add_row(result.key, "-", "-", f"[yellow]skipped: {result.error}[/yellow]", "-")
+            continue
+
+        if isinstance(result, ImportResult):
+            breakdown = list(result.packages.items())[:MAX_LISTED_PACKAGES]
+        else:
+            breakdown = list(result.phases.items())
+        table.add_row(
+            result.key,
+            f"{result.median_ms:.1f}",
+            f"{result.min_ms:.1f}",
+            ", ".join(f"{name} {milliseconds:.1f}" for name, milliseconds in breakdown),
+            format_slowdown(slowdown, threshold),
+        )
+    console.print(table)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="Modules to time the import of")
+    parser.add_argument("--rounds", type=int, default=5, help="Fresh interpreters to time each measurement in")
+    parser.add_argument("--no-first-frame", action="store_true", help="Don't launch the game")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    console = Console()
+    results: list[ImportResult | FirstFrameResult] = []
+    for module in args.modules:
+        with console.status(f"Importing {module}..."):
+            results.append(benchmark_import(module, args.rounds))
+    first_frame = None
+    if not args.no_first_frame:
+        with console.status("Launching the game..."):
+            first_frame = benchmark_first_frame(args.rounds)
+        results.append(first_frame)
+
+    comparisons = compare_to_baseline(
+        results,
+        lambda result: result.median_ms if result.error is None else None,
+        baseline_medians(read_results(args.baseline)),
+    )
+    print_results(console, comparisons, args.threshold)
+    write_results(
+        console,
+        args.output,
+        {
+            "imports": [asdict(result) for result in results if isinstance(result, ImportResult)],
+            "first_frame": asdict(first_frame) if first_frame is not None else None,
+        },
+    )
+    return report_regressions(console, comparisons, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
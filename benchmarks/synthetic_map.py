@@ -0,0 +1,70 @@
+"""
+Procedurally generated maps for benchmarking, so benchmarks don't depend on hand-made Tiled maps.
+"""
+
+import numpy
+
+from luna.core.map import Map
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+
+# World-space size of one cell of the synthetic map. Each cell holds one region.
+CELL_SIZE = 200
+
+# Every this many cells, the region is a wall instead of ground
+WALL_INTERVAL = 4
+
+
+def create_synthetic_map(region_count: int, seed: int = 0) -> Map:
+    """
+    Create a map with `region_count` regions laid out on a square grid of cells. Most cells hold a ground triangle
+    with a (slightly randomized) sloped top; every `WALL_INTERVAL`th cell holds a vertical wall line instead.
+
+    :param region_count: How many regions to put in the map.
+    :param seed: Seed for the random slopes.
+    :return: The map, with its spatial indexes built.
+    """
+    random = numpy.random.default_rng(seed)
+    columns = max(1, int(numpy.ceil(numpy.sqrt(region_count))))
+    cells = numpy.arange(region_count)
+    x = (cells % columns) * CELL_SIZE
+    y = (cells // columns) * CELL_SIZE
+    slope = random.uniform(-CELL_SIZE / 4, CELL_SIZE / 4, size=region_count)
+
+    regions = []
+    for i, (cell_x, cell_y, cell_slope) in enumerate(zip(x.tolist(), y.tolist(), slope.tolist())):
+        if i % WALL_INTERVAL == WALL_INTERVAL - 1:
+            regions.append(
+                Region(
+                    region_points=[(cell_x + CELL_SIZE / 2, cell_y), (cell_x + CELL_SIZE / 2, cell_y + CELL_SIZE)],
+                    geometry_type="line_string",
+                    designation=RegionType.WALL,
+                )
+            )
+        else:
+            regions.append(
+                Region(
+                    region_points=[
+                        (cell_x, cell_y),
+                        (cell_x + CELL_SIZE, cell_y),
+                        (cell_x + CELL_SIZE / 2, cell_y + CELL_SIZE / 2 + cell_slope),
+                    ],
+                    geometry_type="polygon",
+                    designation=RegionType.GROUND,
+                )
+            )
+
+    game_map = Map(name=f"synthetic-{region_count}", regions=regions)
+    game_map.build_spatial_indexes()
+    return game_map
+
+
+def cell_center(game_map: Map, cell: int) -> tuple[float, float]:
+    """
+    The world-space center of one of the map's cells.
+
+    :param game_map: A map created by `create_synthetic_map`.
+    :param cell: The index of the cell.
+    """
+    columns = max(1, int(numpy.ceil(numpy.sqrt(len(game_map.regions)))))
+    return (cell % columns + 0.5) * CELL_SIZE, (cell // columns + 0.5) * CELL_SIZE
@@ -0,0 +1,372 @@
+"""
+2D collision engine for convex polygons, vectorized with NumPy.
+
+All tests are done with the separating axis theorem directly on vertex arrays, so no intermediate geometry objects
+are built. A moving polygon is tested against a whole batch of candidate polygons (e.g. the convex triangles and line
+segments that make up a map's regions) in one pass.
+
+Batches of polygons are stored as an (M, K, 2) array: M polygons with K vertices each. Polygons with fewer than K
+vertices are padded by repeating their last vertex, which adds only degenerate (zero length) edges that are ignored.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy
+from arcade.types import PointList
+from pyglet.math import Vec2
+
+# Penetration depths within this distance of each other are considered equal when choosing a push out direction
+_DEPTH_TOLERANCE = 1e-9
+
+# The most candidate polygons tested one at a time, in plain Python. A batched sweep costs a fixed ~100 µs in NumPy
+# calls, however few candidates it is given, which is more than testing this many candidates one by one.
+SCALAR_CANDIDATE_LIMIT = 4
+
+
+@dataclass
+class PolygonMovementCollisionResult:
+    """
+    Result from `move_polygon_into_polygons`: one separating axis sweep of the moving polygon against a whole batch of
+    packed candidate polygons (see `pack_polygons`.)
+
+    :var collision: If the polygon already overlaps a candidate, or hits one during the movement
+    :var new_movement_vector: If the polygon already overlaps candidates, the vector that pushes it out of the deepest
+         one. Otherwise, the movement vector shortened to stop at the first candidate hit, or the original movement
+         vector if nothing is hit.
+    """
+
+    collision: bool
+    new_movement_vector: Vec2 | None
+
+
+@dataclass
+class SweepResult:
+    """
+    Per-candidate result from `sweep_polygon_against`.
+
+    :var overlapping: (M,) Whether the polygon already overlaps each candidate before moving.
+    :var time_of_impact: (M,) The fraction of the movement (0 to 1) after which the polygon touches each candidate, or
+         infinity if it doesn't hit it. Undefined where `overlapping` is set.
+    :var push_out: (M, 2) The minimum translation that separates the polygon from each candidate it overlaps. Zero
+         where `overlapping` is not set.
+    :var penetration: (M,) The length of `push_out`.
+    """
+
+    overlapping: numpy.ndarray
+    time_of_impact: numpy.ndarray
+    push_out: numpy.ndarray
+    penetration: numpy.ndarray
+
+
+def pack_polygons(polygons: Sequence[PointList]) -> numpy.ndarray:
+    """
+    Pack polygons into a single (M, K, 2) vertex array, padding polygons with fewer than K vertices by repeating their
+    last vertex.
+
+    :param polygons: The polygons to pack.
+    :return: The packed vertex array.
+    """
+    max_vertices = max((len(polygon) for polygon in polygons), default=1)
+    packed = numpy.empty((len(polygons), max_vertices, 2), dtype=float)
+    for i, polygon in enumerate(polygons):
+        count = len(polygon)
+        packed[i, :count] = polygon
+        packed[i, count:] = packed[i, count - 1]
+    return packed
+
+
+def edge_axes(vertices: numpy.ndarray) -> numpy.ndarray:
+    """
+    Compute the (unnormalized) perpendicular of every edge of the given polygons. These are the candidate separating
+    axes of the polygons.
+
+    :param vertices: (..., K, 2) polygon vertices.
+    :return: (..., K, 2) edge perpendiculars. Degenerate edges give a zero vector.
+    """
+    axes = numpy.empty_like(vertices)
+    axes[..., :-1, 0] = vertices[..., :-1, 1] - vertices[..., 1:, 1]
+    axes[..., :-1, 1] = vertices[..., 1:, 0] - vertices[..., :-1, 0]
+    axes[..., -1, 0] = vertices[..., -1, 1] - vertices[..., 0, 1]
+    axes[..., -1, 1] = vertices[..., 0, 0] - vertices[..., -1, 0]
+    return axes
+
+
+def sweep_polygon_against(polygon: PointList, movement_vector: Vec2, others: numpy.ndarray) -> SweepResult:
+    """
+    Move a convex polygon and test it against a batch of convex candidate polygons at once.
+
+    Touching polygons are not considered overlapping. A polygon touching a candidate collides with it (at time 0) only
+    if it moves towards it.
+
+    :param polygon: The convex polygon that moves.
+    :param movement_vector: How far the polygon moves.
+    :param others: (M, K, 2) packed candidate polygons, see `pack_polygons`.
+    :return: Per-candidate overlap and time of impact results.
+    """
+    moving = numpy.asarray(polygon, dtype=float)
+    movement = numpy.array((movement_vector[0], movement_vector[1]), dtype=float)
+    count = len(others)
+
+    # Candidate separating axes: the edge normals of both polygons. (M, A, 2)
+    own_axes = edge_axes(moving)
+    axes = numpy.concatenate((numpy.broadcast_to(own_axes, (count, *own_axes.shape)), edge_axes(others)), axis=1)
+    axes_x = axes[..., 0]
+    axes_y = axes[..., 1]
+    valid = (axes_x != 0) | (axes_y != 0)
+
+    # Project both polygons and the movement onto every axis. (M, A)
+    # Vertices go on the leading axis so the min/max reductions run over whole (M, A) planes at once.
+    projected_moving = moving[:, 0, None, None] * axes_x + moving[:, 1, None, None] * axes_y
+    moving_min = projected_moving.min(axis=0)
+    moving_max = projected_moving.max(axis=0)
+    others_x = others[..., 0].T[:, :, None]
+    others_y = others[..., 1].T[:, :, None]
+    projected_others = others_x * axes_x + others_y * axes_y
+    others_min = projected_others.min(axis=0)
+    others_max = projected_others.max(axis=0)
+    velocity = axes_x * movement[0] + axes_y * movement[1]
+
+    # Time interval on each axis during which the projections overlap
+    moving_forward = velocity > 0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        entry = numpy.where(moving_forward, others_min - moving_max, others_max - moving_min) / velocity
+        exit_ = numpy.where(moving_forward, others_max - moving_min, others_min - moving_max) / velocity
+
+    separated = ((moving_max <= others_min) | (others_max <= moving_min)) & valid
+    # Axes that the movement runs parallel to either always or never overlap; degenerate axes never separate.
+    parallel = (velocity == 0) | ~valid
+    entry[parallel] = -numpy.inf
+    exit_[parallel] = numpy.inf
+    entry[parallel & separated] = numpy.inf
+    exit_[parallel & separated] = -numpy.inf
+
+    first_contact = entry.max(axis=1)
+    last_contact = exit_.min(axis=1)
+
+    overlapping = ~separated.any(axis=1)
+    hit = ~overlapping & (first_contact < last_contact) & (last_contact > 0) & (first_contact < 1)
+    time_of_impact = numpy.where(hit, first_contact, numpy.inf)
+
+    push_out = numpy.zeros((count, 2))
+    penetration = numpy.zeros(count)
+    if overlapping.any():
+        _compute_push_out(
+            axes=axes[overlapping],
+            valid=valid[overlapping],
+            forward_depth=(others_max - moving_min)[overlapping],
+            backward_depth=(moving_max - others_min)[overlapping],
+            movement=movement,
+            push_out=push_out,
+            penetration=penetration,
+            rows=numpy.flatnonzero(overlapping),
+        )
+
+    return SweepResult(
+        overlapping=overlapping,
+        time_of_impact=time_of_impact,
+        push_out=push_out,
+        penetration=penetration,
+    )
+
+
+def _compute_push_out(
+    axes: numpy.ndarray,
+    valid: numpy.ndarray,
+    forward_depth: numpy.ndarray,
+    backward_depth: numpy.ndarray,
+    movement: numpy.ndarray,
+    push_out: numpy.ndarray,
+    penetration: numpy.ndarray,
+    rows: numpy.ndarray,
+) -> None:
+    """
+    Minimum translation to push out of overlapping candidates: the shallowest penetration over all axes in either
+    direction. Ties go to the direction most opposed to the movement. Results are written into `push_out` and
+    `penetration` at `rows`.
+    """
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        axis_lengths = numpy.hypot(axes[..., 0], axes[..., 1])
+        unit_axes = axes / axis_lengths[..., None]
+        depths = numpy.concatenate((forward_depth, backward_depth), axis=1) / numpy.concatenate(
+            (axis_lengths, axis_lengths), axis=1
+        )
+    directions = numpy.concatenate((unit_axes, -unit_axes), axis=1)
+    depths[~numpy.concatenate((valid, valid), axis=1)] = numpy.inf
+
+    alignment = directions @ movement
+    shallowest = depths.min(axis=1, keepdims=True)
+    alignment[depths > shallowest + _DEPTH_TOLERANCE] = numpy.inf
+    best = alignment.argmin(axis=1)
+
+    selected = numpy.arange(len(rows))
+    penetration[rows] = depths[selected, best]
+    push_out[rows] = directions[selected, best] * penetration[rows, None]
+
+
+def move_polygon_into_polygons(
+    polygon: PointList, movement_vector: Vec2, others: numpy.ndarray
+) -> PolygonMovementCollisionResult:
+    """
+    Moves `polygon` by `movement_vector` and checks if it collides with any of the `others`.
+
+    If the polygon already overlaps any of them, the result holds the vector that pushes it out of the deepest one.
+    Otherwise, the movement vector is shortened to stop at the first candidate it hits.
+
+    Up to `SCALAR_CANDIDATE_LIMIT` candidates are tested one by one in plain Python, which gives the same results as
+    the batched sweep, without the overhead of its NumPy calls.
+
+    :param polygon: The convex polygon that moves.
+    :param movement_vector: How far the polygon moves.
+    :param others: (M, K, 2) packed candidate polygons, see `pack_polygons`.
+    """
+    if movement_vector is None:
+        movement_vector = Vec2(0, 0)
+
+    if len(others) == 0:
+        return PolygonMovementCollisionResult(collision=False, new_movement_vector=movement_vector)
+
+    if len(others) <= SCALAR_CANDIDATE_LIMIT:
+        return _move_polygon_into_few_polygons(polygon, movement_vector, others.tolist())
+
+    result = sweep_polygon_against(polygon, movement_vector, others)
+
+    if result.overlapping.any():
+        deepest = numpy.where(result.overlapping, result.penetration, -numpy.inf).argmax()
+        push_x, push_y = result.push_out[deepest].tolist()
+        return PolygonMovementCollisionResult(collision=True, new_movement_vector=Vec2(push_x, push_y))
+
+    first = result.time_of_impact.argmin()
+    time_of_impact = float(result.time_of_impact[first])
+    if time_of_impact == numpy.inf:
+        return PolygonMovementCollisionResult(collision=False, new_movement_vector=movement_vector)
+
+    return PolygonMovementCollisionResult(
+        collision=True,
+        new_movement_vector=Vec2(movement_vector[0] * time_of_impact, movement_vector[1] * time_of_impact),
+    )
+
+
+def _move_polygon_into_few_polygons(
+    polygon: PointList, movement_vector: Vec2, others: Sequence[PointList]
+) -> PolygonMovementCollisionResult:
+    """
+    `move_polygon_into_polygons` for a few candidates, sweeping the polygon against each of them in turn.
+    """
+    moving = [(float(x), float(y)) for x, y in polygon]
+    movement = (float(movement_vector[0]), float(movement_vector[1]))
+    # The polygon's own axes are the same for every candidate, and so are its projections onto them
+    moving_axes = [(axis, *_project(moving, *axis)) for axis in _polygon_axes(moving)]
+
+    deepest: tuple[float, float, float] | None = None
+    first_impact = math.inf
+    for other in others:
+        result = _sweep_polygon_against_one(moving, moving_axes, movement, other, min(first_impact, 1.0))
+        if result is None:
+            continue
+        overlapping, time_of_impact, push_x, push_y, penetration = result
+        if overlapping:
+            if deepest is None or penetration > deepest[0]:
+                deepest = penetration, push_x, push_y
+        elif time_of_impact < first_impact:
+            first_impact = time_of_impact
+
+    if deepest is not None:
+        return PolygonMovementCollisionResult(collision=True, new_movement_vector=Vec2(deepest[1], deepest[2]))
+    if first_impact == math.inf:
+        return PolygonMovementCollisionResult(collision=False, new_movement_vector=movement_vector)
+    return PolygonMovementCollisionResult(
+        collision=True,
+        new_movement_vector=Vec2(movement_vector[0] * first_impact, movement_vector[1] * first_impact),
+    )
+
+
+def _polygon_axes(vertices: Sequence[Sequence[float]]) -> list[tuple[float, float]]:
+    # The non-degenerate edge perpendiculars of one polygon, in the same order as `edge_axes`
+    axes = []
+    for (x, y), (next_x, next_y) in zip(vertices, [*vertices[1:], vertices[0]]):
+        axis = (y - next_y, next_x - x)
+        if axis != (0, 0):
+            axes.append(axis)
+    return axes
+
+
+def _project(vertices: Sequence[Sequence[float]], axis_x: float, axis_y: float) -> tuple[float, float]:
+    projection = [x * axis_x + y * axis_y for x, y in vertices]
+    return min(projection), max(projection)
+
+
+def _sweep_polygon_against_one(
+    moving: list[tuple[float, float]],
+    moving_axes: list[tuple[tuple[float, float], float, float]],
+    movement: tuple[float, float],
+    other: PointList,
+    limit: float,
+) -> tuple[bool, float, float, float, float] | None:
+    """
+    `sweep_polygon_against` for a single candidate, in plain Python.
+
+    :param moving: The vertices of the polygon that moves.
+    :param moving_axes: The polygon's axes, each with the polygon's projection onto it.
+    :param movement: How far the polygon moves.
+    :param other: The candidate polygon.
+    :param limit: Stop as soon as it's clear the polygon doesn't hit the candidate before this time of impact.
+    :return: Whether the polygon overlaps the candidate, the time of impact, and the push out vector and its length.
+             None if the polygon doesn't overlap the candidate, and doesn't hit it before `limit`.
+    """
+    movement_x, movement_y = movement
+    axes = moving_axes + [(axis, *_project(moving, *axis)) for axis in _polygon_axes(other)]
+
+    first_contact = -math.inf
+    last_contact = math.inf
+    projections = []
+    for (axis_x, axis_y), moving_min, moving_max in axes:
+        other_min, other_max = _project(other, axis_x, axis_y)
+        projections.append((moving_min, moving_max, other_min, other_max))
+
+        velocity = axis_x * movement_x + axis_y * movement_y
+        if velocity > 0:
+            first_contact = max(first_contact, (other_min - moving_max) / velocity)
+            last_contact = min(last_contact, (other_max - moving_min) / velocity)
+        elif velocity < 0:
+            first_contact = max(first_contact, (other_max - moving_min) / velocity)
+            last_contact = min(last_contact, (other_min - moving_max) / velocity)
+        elif moving_max <= other_min or other_max <= moving_min:
+            # Moving parallel to an axis the polygons are apart on: they never meet
+            return None
+
+        # Polygons that overlap have first_contact < 0 < last_contact, and keep it on every axis. Past this, the
+        # polygons are apart on some axis, and the polygon can only hit the candidate after `limit`, or not at all.
+        if first_contact >= limit or last_contact <= 0 or first_contact >= last_contact:
+            return None
+
+    if first_contact >= 0:
+        # Apart (or touching) on some axis, but hit during the movement
+        return False, first_contact, 0.0, 0.0, 0.0
+
+    # Push out along the shallowest penetration, in either direction of any axis, preferring the direction most opposed
+    # to the movement. Forward directions come before backward ones, as in `_compute_push_out`.
+    forward = []
+    backward = []
+    for ((axis_x, axis_y), _, _), (moving_min, moving_max, other_min, other_max) in zip(axes, projections):
+        length = math.hypot(axis_x, axis_y)
+        unit_x = axis_x / length
+        unit_y = axis_y / length
+        forward.append(((other_max - moving_min) / length, unit_x, unit_y))
+        backward.append(((moving_max - other_min) / length, -unit_x, -unit_y))
+    pushes = forward + backward
+
+    shallowest = min(depth for depth, _, _ in pushes)
+    best_alignment = math.inf
+    best = pushes[0]
+    for push in pushes:
+        depth, direction_x, direction_y = push
+        if depth > shallowest + _DEPTH_TOLERANCE:
+            continue
+        alignment = direction_x * movement_x + direction_y * movement_y
+        if alignment < best_alignment:
+            best_alignment = alignment
+            best = push
+    depth, direction_x, direction_y = best
+    return True, math.inf, direction_x * depth, direction_y * depth, depth
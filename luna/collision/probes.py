@@ -0,0 +1,148 @@
+"""
+Ray and box casts against the regions of a spatial tree, for finding the ground below and the walls beside a game
+object every frame.
+
+Probes take raw floats instead of geometry objects, and evaluate the casts directly on the packed vertex arrays cached
+by `SpatialTree`, so no shapely geometry is built per candidate. Results are written into a `ProbeResult` owned by the
+caller, which is reused from frame to frame.
+
+A cast sweeps a slab (the width of the box, or zero for a ray) from an origin along one axis, up to a maximum depth.
+Each candidate region is clipped to the slab; the hit distance is how far the cast travels before reaching the nearest
+point of the clipped region. A region already overlapping the origin has a distance of zero.
+"""
+
+from dataclasses import dataclass
+
+import numpy
+
+from luna.core.region import Region
+from luna.core.spatial_tree import SpatialTree
+from luna.utils.profiler import PROFILER
+
+
+@dataclass
+class ProbeResult:
+    """
+    Reusable result of a cast. Every cast resets it before writing its result.
+
+    :var hit: Whether the cast hit a region.
+    :var distance: How far the cast travelled before hitting the nearest region, or infinity if it hit nothing.
+    :var region: The nearest region hit, if any.
+    """
+
+    hit: bool = False
+    distance: float = numpy.inf
+    region: Region | None = None
+
+    def clear(self) -> None:
+        self.hit = False
+        self.distance = numpy.inf
+        self.region = None
+
+
+def cast_down(tree: SpatialTree, x: float, y: float, width: float, depth: float, result: ProbeResult) -> bool:
+    """
+    Cast a box straight down, from a horizontal edge centred on (x, y).
+
+    :param tree: The regions to cast against.
+    :param x: The X co-ordinate of the middle of the box's edge.
+    :param y: The Y co-ordinate the cast starts from.
+    :param width: The width of the box. Zero for a ray.
+    :param depth: How far down to cast.
+    :param result: Receives the nearest hit.
+    :return: Whether anything was hit.
+    """
+    left = x - width / 2
+    right = x + width / 2
+    with PROFILER.scope("probes.cast_down"):
+        return _cast(tree, 0, left, right, 1, y, -1, depth, result, (left, y - depth, right, y))
+
+
+def cast_horizontal(
+    tree: SpatialTree, x: float, y: float, height: float, direction: int, depth: float, result: ProbeResult
+) -> bool:
+    """
+    Cast a box sideways, from a vertical edge whose bottom is at (x, y).
+
+    :param tree: The regions to cast against.
+    :param x: The X co-ordinate the cast starts from.
+    :param y: The Y co-ordinate of the bottom of the box.
+    :param height: The height of the box. Zero for a ray.
+    :param direction: Which way to cast: -1 (left) or 1 (right).
+    :param depth: How far to cast.
+    :param result: Receives the nearest hit.
+    :return: Whether anything was hit.
+    """
+    end = x + direction * depth
+    query = (min(x, end), y, max(x, end), y + height)
+    with PROFILER.scope("probes.cast_horizontal"):
+        return _cast(tree, 1, y, y + height, 0, x, direction, depth, result, query)
+
+
+def _cast(
+    tree: SpatialTree,
+    slab_axis: int,
+    slab_min: float,
+    slab_max: float,
+    axis: int,
+    origin: float,
+    direction: int,
+    depth: float,
+    result: ProbeResult,
+    query: tuple[float, float, float, float],
+) -> bool:
+    result.clear()
+    candidates = tree.query_indices(*query)
+    if len(candidates) == 0:
+        return False
+
+    vertices = tree.vertices[candidates]
+    closed = tree.closed[candidates]
+    start = vertices
+    end = numpy.concatenate((vertices[:, 1:], vertices[:, :1]), axis=1)
+
+    # Clip every edge to the slab, as a range of its parameter t
+    slab_start = start[..., slab_axis]
+    slab_delta = end[..., slab_axis] - slab_start
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        t1 = (slab_min - slab_start) / slab_delta
+        t2 = (slab_max - slab_start) / slab_delta
+    # Edges parallel to the slab are either entirely inside it or entirely outside
+    parallel = slab_delta == 0
+    inside = (slab_min <= slab_start) & (slab_start <= slab_max)
+    t_min = numpy.where(parallel, 0.0, numpy.maximum(numpy.minimum(t1, t2), 0.0))
+    t_max = numpy.where(parallel, 1.0, numpy.minimum(numpy.maximum(t1, t2), 1.0))
+    valid = numpy.where(parallel, inside, t_min <= t_max)
+    # The closing edge of an open line string isn't part of it
+    valid[~closed, -1] = False
+
+    # The range covered by each clipped edge along the cast axis
+    axis_start = start[..., axis]
+    axis_delta = end[..., axis] - axis_start
+    a = axis_start + axis_delta * t_min
+    b = axis_start + axis_delta * t_max
+    low = numpy.where(valid, numpy.minimum(a, b), numpy.inf)
+    high = numpy.where(valid, numpy.maximum(a, b), -numpy.inf)
+
+    # A closed polygon covers everything between its edges
+    low[closed] = low[closed].min(axis=1, keepdims=True)
+    high[closed] = high[closed].max(axis=1, keepdims=True)
+
+    if direction > 0:
+        distance = numpy.maximum(low, origin) - origin
+        valid &= high >= origin
+    else:
+        distance = origin - numpy.minimum(high, origin)
+        valid &= low <= origin
+    valid &= distance <= depth
+    distance[~valid] = numpy.inf
+
+    nearest = int(distance.argmin())
+    nearest_distance = float(distance.flat[nearest])
+    if nearest_distance == numpy.inf:
+        return False
+
+    result.hit = True
+    result.distance = nearest_distance
+    result.region = tree.regions[int(candidates[nearest // distance.shape[1]])]
+    return True
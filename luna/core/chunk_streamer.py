@@ -0,0 +1,143 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+import shapely
+from shapely import STRtree
+
+from luna.core.map_chunk import ChunkCoordinate, ChunkSource, MapChunk, bounds_within
+from luna.utils.logging import LOGGER
+
+# Default distance from the camera within which chunks are loaded
+DEFAULT_LOAD_DISTANCE = 2048
+
+# Default distance from the camera beyond which loaded chunks are unloaded. Larger than the load distance, so
+# moving back and forth over a chunk border doesn't keep loading and unloading the same chunks.
+DEFAULT_UNLOAD_DISTANCE = 3072
+
+# Default distance from the camera within which chunks must be loaded before the next frame, even if it means waiting
+# for them. This keeps the ground under the player from ever missing.
+DEFAULT_REQUIRED_DISTANCE = 256
+
+# Number of times a chunk is built before giving up on it, if building it keeps failing
+MAX_BUILD_ATTEMPTS = 3
+
+
+class ChunkStreamer:
+    """
+    Loads and unloads the chunks of a map around a focus position (the camera), building chunks on a background
+    worker thread so that crossing into a new section of the map doesn't stall the game.
+
+    :var sources: The source data of every chunk in the map.
+    :var load_distance: Distance from the focus within which chunks are loaded.
+    :var unload_distance: Distance from the focus beyond which loaded chunks are unloaded.
+    :var required_distance: Distance from the focus within which chunks are loaded immediately, waiting if needed.
+    :var failed: The chunks that failed to build `MAX_BUILD_ATTEMPTS` times, and won't be built again.
+    """
+
+    sources: dict[ChunkCoordinate, ChunkSource]
+    load_distance: float
+    unload_distance: float
+    required_distance: float
+    failed: set[ChunkCoordinate]
+
+    _build_chunk: Callable[[ChunkSource], MapChunk]
+    _coordinates: list[ChunkCoordinate]
+    _bounds_tree: STRtree
+    _executor: ThreadPoolExecutor
+    _pending: dict[ChunkCoordinate, Future[MapChunk]]
+    _attempts: dict[ChunkCoordinate, int]
+
+    def __init__(
+        self,
+        sources: dict[ChunkCoordinate, ChunkSource],
+        build_chunk: Callable[[ChunkSource], MapChunk],
+        load_distance: float = DEFAULT_LOAD_DISTANCE,
+        unload_distance: float = DEFAULT_UNLOAD_DISTANCE,
+        required_distance: float = DEFAULT_REQUIRED_DISTANCE,
+    ) -> None:
+        """
+        :param sources: The source data of every chunk in the map.
+        :param build_chunk: Builds a chunk from its source data. Called on the worker thread.
+        """
+        self.sources = sources
+        self.load_distance = load_distance
+        self.unload_distance = unload_distance
+        self.required_distance = required_distance
+        self.failed = set()
+        self._build_chunk = build_chunk
+        self._coordinates = list(sources)
+        self._bounds_tree = STRtree([shapely.box(*source.bounds) for source in sources.values()])
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-streamer")
+        self._pending = {}
+        self._attempts = {}
+
+    def update(
+        self, x: float, y: float, loaded: set[ChunkCoordinate]
+    ) -> tuple[list[MapChunk], list[ChunkCoordinate]]:
+        """
+        Work out which chunks should be loaded and unloaded for the given focus position.
+
+        :param x: The world-space X co-ordinate of the focus.
+        :param y: The world-space Y co-ordinate of the focus.
+        :param loaded: The chunks that are currently loaded.
+        :return: The chunks that finished building and should be added to the map, and the co-ordinates of the
+                 chunks that should be removed from it.
+        """
+        # Start building the chunks that are close enough
+        load_area = shapely.box(
+            x - self.load_distance, y - self.load_distance, x + self.load_distance, y + self.load_distance
+        )
+        for index in sorted(self._bounds_tree.query(load_area)):
+            coordinate = self._coordinates[index]
+            if coordinate not in loaded and coordinate not in self._pending and coordinate not in self.failed:
+                self._pending[coordinate] = self._executor.submit(self._build_chunk, self.sources[coordinate])
+
+        # Collect the chunks that finished building, waiting for the ones that are needed right now
+        finished = []
+        for coordinate, future in list(self._pending.items()):
+            bounds = self.sources[coordinate].bounds
+            if not bounds_within(bounds, x, y, self.unload_distance):
+                # The focus moved away before the chunk was loaded, so it would only be unloaded again. If it is
+                # already building, cancelling does nothing and its result is dropped.
+                future.cancel()
+                del self._pending[coordinate]
+            elif future.done() or bounds_within(bounds, x, y, self.required_distance):
+                del self._pending[coordinate]
+                try:
+                    finished.append(future.result())
+                    self._attempts.pop(coordinate, None)
+                except Exception:
+                    self._build_failed(coordinate)
+
+        unloaded = [
+            coordinate
+            for coordinate in loaded
+            if not bounds_within(self.sources[coordinate].bounds, x, y, self.unload_distance)
+        ]
+
+        if finished or unloaded:
+            LOGGER.debug(
+                f"Streaming chunks: loaded {[chunk.coordinate for chunk in finished]}, unloaded {unloaded}"
+            )
+        return finished, unloaded
+
+    def _build_failed(self, coordinate: ChunkCoordinate) -> None:
+        """
+        Log a chunk that failed to build. It is built again on a later update, unless it has already failed too many
+        times, in which case it is left out of the map rather than failing forever.
+        """
+        self._attempts[coordinate] = self._attempts.get(coordinate, 0) + 1
+        if self._attempts[coordinate] < MAX_BUILD_ATTEMPTS:
+            LOGGER.exception(f"Failed to build chunk {coordinate}, retrying")
+        else:
+            LOGGER.exception(
+                f"Failed to build chunk {coordinate} {MAX_BUILD_ATTEMPTS} times, leaving it out of the map"
+            )
+            self.failed.add(coordinate)
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker thread, abandoning any chunks that haven't started building.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Generic, Protocol, TypeVar
+
+import shapely
+from shapely import STRtree
+
+from luna.core.game_object import GameObject
+from luna.core.map_chunk import Bounds, bounds_within
+from luna.core.region_overlay import RegionOverlayPage
+from luna.core.tile_sprites import TilePage
+
+if TYPE_CHECKING:
+    # Pre-rendered layers are indexed with a PageIndex themselves
+    from luna.core.prerendered_layers import PrerenderedPage
+
+# Game objects have no bounds of their own, so an object is drawn if its position is within this distance of the view
+DEFAULT_OBJECT_MARGIN = 256
+
+
+class Page(Protocol):
+    """
+    A batch of map elements that is drawn, and culled, as a whole.
+    """
+
+    bounds: Bounds
+
+
+PageType = TypeVar("PageType", bound=Page)
+
+
+@dataclass
+class CullingStats:
+    """
+    How many of each kind of map element were drawn and culled (skipped because they are off screen) in a frame.
+    Tiles and regions are culled a page at a time, so the drawn ones include the off-screen ones in visible pages.
+    """
+
+    tiles_drawn: int = 0
+    tiles_culled: int = 0
+    tile_pages_drawn: int = 0
+    tile_pages_culled: int = 0
+    regions_drawn: int = 0
+    regions_culled: int = 0
+    objects_drawn: int = 0
+    objects_culled: int = 0
+
+
+@dataclass
+class VisibleSet:
+    """
+    The elements of a map that are visible through a view.
+
+    :var tile_pages: The visible tile pages, in draw order.
+    :var region_pages: The visible pages of the region debug overlay.
+    :var prerendered_pages: The visible pre-rendered pages, if the map's layers are pre-rendered.
+    :var objects: The visible game objects, in map order.
+    :var stats: How many elements were visible and culled.
+    """
+
+    tile_pages: list[TilePage] = field(default_factory=list)
+    region_pages: list[RegionOverlayPage] = field(default_factory=list)
+    prerendered_pages: list["PrerenderedPage"] = field(default_factory=list)
+    objects: list[GameObject] = field(default_factory=list)
+    stats: CullingStats = field(default_factory=CullingStats)
+
+
+class PageIndex(Generic[PageType]):
+    """
+    Spatial index over the bounds of pages, to find the pages that are visible through a view.
+    """
+
+    _pages: list[PageType]
+    _tree: STRtree
+
+    def __init__(self, pages: list[PageType]) -> None:
+        self._pages = pages
+        self._tree = STRtree([shapely.box(*page.bounds) for page in pages])
+
+    @property
+    def pages(self) -> list[PageType]:
+        return self._pages
+
+    def query(self, view: Bounds) -> list[PageType]:
+        """
+        Find the pages that overlap the view.
+
+        :param view: The world-space bounds of the view.
+        :return: The overlapping pages, in the order they were given (i.e. draw order.)
+        """
+        return [self._pages[index] for index in sorted(self._tree.query(shapely.box(*view)))]
+
+
+def cull_objects(
+    objects: list[GameObject], view: Bounds, margin: float = DEFAULT_OBJECT_MARGIN
+) -> list[GameObject]:
+    """
+    Find the game objects that are (probably) visible through a view.
+
+    :param objects: The game objects to cull.
+    :param view: The world-space bounds of the view.
+    :param margin: How far outside the view an object's position can be for it to still be drawn.
+    :return: The visible objects, in the order they were given.
+    """
+    return [
+        game_object
+        for game_object in objects
+        if bounds_within(view, game_object.position[0], game_object.position[1], margin)
+    ]
@@ -5,6 +5,7 @@ from arcade.types import Point
 from pyglet.math import Vec2
 
 from luna.core.input_action import InputAction
+from luna.core.object_phase import ObjectPhase
 from luna.utils.logging import LOGGER
 
 
@@ -21,13 +22,24 @@ class GameObject:
     put that in a linked Entity.
 
     :var name: The internal name of the game object, mostly for debugging purposes.
+    :var phases: The parts of the game loop the game object takes part in. Subclasses should declare only the phases
+                 they need, so they are skipped in the others.
+    :var object_id: The id of the game object in its map's registry (see `ObjectRegistry`), or None if it hasn't been
+                    spawned.
     :var position: The position of the game object in the game world. It is up to the GameObject
                    to decide what this location means in relation to itself; it comes straight from
                    the map data.
+    :var previous_position: The position of the game object before the last simulation step.
+    :var render_position: Where to draw the game object: its position interpolated between the last two simulation
+                          steps, so that movement looks smooth when frames don't line up with simulation steps.
     """
 
     name: str
+    phases: ObjectPhase = ObjectPhase.ALL
+    object_id: int | None = None
     position: Vec2
+    previous_position: Vec2
+    render_position: Vec2
     gravity: float = 0
 
     def on_spawn(self, parameters: SpawnParameters) -> None:
@@ -35,11 +47,48 @@ class GameObject:
         Called when the game object is spawned into the game world.
         """
         self.position = parameters.position
+        self.previous_position = parameters.position
+        self.render_position = parameters.position
         LOGGER.debug(f"Spawned game object {self.name}")
 
+    def on_despawn(self) -> None:
+        """
+        Called when the game object is removed from the game world.
+        Subclasses should override this method to release anything they hold in the map.
+        """
+        LOGGER.debug(f"Despawned game object {self.name}")
+
+    @property
+    def settled(self) -> bool:
+        """
+        Whether the game object is resting on something, rather than falling or flying. Only settled objects are
+        simulated at a reduced rate (see `SimulationLod`): advancing several steps at once would let a moving object
+        skip through thin ground, and take a different path than it would step by step.
+        """
+        return True
+
+    def set_step_scale(self, step_scale: int) -> None:
+        """
+        Called by the simulation LOD (see `SimulationLod`) when the number of steps the game object advances by per
+        simulation step changes: 1 at the full rate, 0 while it is asleep or waiting for its turn at a reduced rate,
+        and more on its turn at a reduced rate. `update` is given the matching time, but anything the object
+        simulates elsewhere (like its body) should follow it too.
+
+        :param step_scale: The number of steps to advance by.
+        """
+        ...
+
+    def interpolate(self, alpha: float) -> None:
+        """
+        Update the render position to the point between the previous and current position.
+
+        :param alpha: How far between the previous (0) and current (1) position to render the game object.
+        """
+        self.render_position = self.previous_position + (self.position - self.previous_position) * alpha
+
     def update(self, delta_time: float) -> None:
         """
-        Process logic for the game object, this is called once per frame.
+        Process logic for the game object, this is called once per fixed simulation step.
         Subclasses should override this method to implement their own logic.
 
         :param delta_time: Time passed since the last update.
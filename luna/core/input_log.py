@@ -0,0 +1,65 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from arcade.experimental.input import ActionState
+
+from luna.core.input_action import InputAction
+
+
+@dataclass
+class InputEvent:
+    """
+    An input action, as applied to the simulation.
+
+    :var tick: The simulation step the action was applied at, before the step's update.
+    :var action: The action.
+    :var state: Whether the action was pressed or released.
+    """
+
+    tick: int
+    action: InputAction
+    state: ActionState
+
+
+@dataclass
+class InputLog:
+    """
+    A recording of all the input actions applied to a simulation, in order. Since the simulation runs in fixed steps,
+    replaying the log from the same starting state reproduces the same run.
+
+    :var events: The recorded input events, in the order they were applied.
+    """
+
+    events: list[InputEvent] = field(default_factory=list)
+
+    def save(self, path: Path) -> None:
+        """
+        Write the log to a file, one JSON event per line.
+
+        :param path: The file to write to.
+        """
+        path.write_text(
+            "".join(
+                json.dumps({"tick": event.tick, "action": event.action.value, "state": event.state.name}) + "\n"
+                for event in self.events
+            )
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "InputLog":
+        """
+        Read a log written by `save`.
+
+        :param path: The file to read from.
+        """
+        events = []
+        for line in path.read_text().splitlines():
+            if line.strip():
+                event = json.loads(line)
+                events.append(
+                    InputEvent(
+                        tick=event["tick"], action=InputAction(event["action"]), state=ActionState[event["state"]]
+                    )
+                )
+        return cls(events=events)
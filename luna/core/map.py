@@ -1,14 +1,26 @@
 from dataclasses import dataclass, field
 
-import arcade
-from shapely import STRtree
+from arcade import TextureAtlas
 
+from luna.core.chunk_streamer import ChunkStreamer
+from luna.core.culling import CullingStats, PageIndex, VisibleSet, cull_objects
 from luna.core.game_object import GameObject, SpawnParameters
+from luna.core.map_chunk import Bounds, ChunkCoordinate, MapChunk
 from luna.core.map_tile import MapTile
+from luna.core.object_phase import ObjectPhase
+from luna.core.object_registry import ObjectRegistry
+from luna.core.prerendered_layers import PrerenderedLayers
 from luna.core.region import Region
+from luna.core.region_overlay import RegionOverlayPage, build_region_overlay
 from luna.core.region_type import RegionType
-from luna.core.spatial_tree import SpatialTree
+from luna.core.simulation_lod import SimulationLod
+from luna.core.spatial_tree import SpatialTree, build_type_indexes
+from luna.core.surface_graph import SurfaceGraph
+from luna.core.tile_layer import TileLayer
+from luna.core.tile_sprites import DEFAULT_PAGE_SIZE, TilePage, build_tile_pages
+from luna.physics.body_store import BodyStore
 from luna.utils.map_constants import DEFAULT_GRAVITY
+from luna.utils.profiler import PROFILER
 
 
 @dataclass
@@ -19,20 +31,51 @@ class Map:
     :var name: The name of the map, shown on entering the map if it is different to the previously
                shown name.
     :var objects: Active objects in the game to draw.
+    :var registry: Index of the objects by id, type and name, for finding objects without scanning `objects`.
+    :var simulation_lod: Decides which objects are simulated, and how often, by how far they are from the player.
+    :var bodies: The kinematic bodies of the objects in the map, simulated together.
     :var regions: Areas in the map that affect gameplay, such as level geometry, death zones,
                   camera focus zones, and so on.
+    :var spatial_tree: Spatial index over all the regions in the map.
+    :var spatial_indexes: Spatial index over the regions of each RegionType, see `spatial_index`.
     :var tiles: Graphical tiles (back/middle/foreground) that make up the visible world in the map.
+    :var tile_pages: The tiles batched into one SpriteList per render layer and map cell, see `build_tile_pages`.
+    :var tile_page_size: The width and height of the map cell covered by a tile page.
+    :var texture_atlas: The texture atlas holding all the tiles' textures, if they were packed into one (see
+                        `MapLoader.pack_atlas`.) Otherwise, tiles are drawn from the window's default atlas.
+    :var prerender_layers: Whether to pre-render the tile layers into textures, and draw those instead of the tiles
+                           (see `PrerenderedLayers`.) Takes effect when the tile pages are next built.
+    :var chunks: For streamed maps, the chunks that are currently loaded. The map's regions and tiles are those of
+                 its loaded chunks.
+    :var chunk_streamer: For streamed maps, the streamer that loads and unloads chunks around the camera.
+    :var culling_stats: How many elements were drawn and culled in the last drawn frame.
 
     """
 
     name: str = ""
     objects: list[GameObject] = field(default_factory=list)
+    registry: ObjectRegistry = field(default_factory=ObjectRegistry)
+    simulation_lod: SimulationLod = field(default_factory=SimulationLod)
+    bodies: BodyStore = field(default_factory=BodyStore)
     regions: list[Region] = field(default_factory=list)
     spatial_tree: SpatialTree = None
+    spatial_indexes: dict[RegionType, SpatialTree] = field(default_factory=dict)
     tiles: list[MapTile] = field(default_factory=list)
+    tile_pages: list[TilePage] = field(default_factory=list)
+    tile_page_size: float = DEFAULT_PAGE_SIZE
+    texture_atlas: TextureAtlas | None = None
+    prerender_layers: bool = False
     gravity: float = DEFAULT_GRAVITY
+    chunks: dict[ChunkCoordinate, MapChunk] = field(default_factory=dict)
+    chunk_streamer: ChunkStreamer | None = None
+    culling_stats: CullingStats = field(default_factory=CullingStats)
 
     _draw_regions: bool = True
+    _tile_page_index: PageIndex[TilePage] | None = None
+    _region_overlay_index: PageIndex[RegionOverlayPage] | None = None
+    _prerendered_layers: PrerenderedLayers | None = None
+    _surface_graph: SurfaceGraph | None = None
+    _streamed_ground: set[int] = field(default_factory=set)
 
     def spawn(self, game_object: GameObject, spawn_parameters: SpawnParameters) -> None:
         """
@@ -44,41 +87,225 @@ class Map:
         game_object.gravity = self.gravity
         game_object.on_spawn(spawn_parameters)
         self.objects.append(game_object)
+        self.registry.add(game_object)
+        self.simulation_lod.add(game_object)
 
-    def draw(self) -> None:
+    def despawn(self, game_object: GameObject) -> None:
+        """
+        Remove a game object from the map.
+
+        :param game_object: The game object to remove.
+        """
+        self.simulation_lod.remove(game_object)
+        self.registry.remove(game_object)
+        self.objects.remove(game_object)
+        game_object.on_despawn()
+
+    def stream(self, focus: tuple[float, float]) -> None:
+        """
+        For streamed maps, load the chunks around the focus position and unload the ones far away from it.
+        Does nothing for maps that are loaded all at once.
+
+        :param focus: The world-space position to stream around, i.e. where the camera is.
+        """
+        if not self.chunk_streamer:
+            return
+
+        finished, unloaded = self.chunk_streamer.update(focus[0], focus[1], set(self.chunks))
+        if not finished and not unloaded:
+            return
+
+        # The chunks were indexed as they were built, so the map's indexes are combined from the loaded chunks'
+        # indexes, rather than rebuilt from all of their regions
+        for coordinate in unloaded:
+            chunk = self.chunks.pop(coordinate)
+            self._streamed_ground.difference_update(map(id, chunk.spatial_indexes[RegionType.GROUND].regions))
+        for chunk in finished:
+            self.chunks[chunk.coordinate] = chunk
+            self._streamed_ground.update(map(id, chunk.spatial_indexes[RegionType.GROUND].regions))
+        self._surface_graph = None
+
+        chunks = [self.chunks[coordinate] for coordinate in sorted(self.chunks)]
+        self.regions = [region for chunk in chunks for region in chunk.regions]
+        self.tiles = [tile for chunk in chunks for tile in chunk.tiles]
+        self.spatial_tree = SpatialTree.combine([chunk.spatial_tree for chunk in chunks])
+        self.spatial_indexes = {
+            region_type: SpatialTree.combine([chunk.spatial_indexes[region_type] for chunk in chunks])
+            for region_type in RegionType
+        }
+        self._set_tile_pages(
+            sorted(
+                (page for chunk in chunks for page in chunk.tile_pages), key=lambda page: (page.layer.value, page.cell)
+            )
+        )
+        self._region_overlay_index = PageIndex([page for chunk in chunks for page in chunk.region_pages])
+
+    def build_tile_pages(self) -> None:
+        """
+        (Re)build the tile pages and their spatial index from the map's tiles. Must be called whenever the tiles
+        change.
+        """
+        self._set_tile_pages(build_tile_pages(self.tiles, self.tile_page_size, self.texture_atlas))
+
+    def _set_tile_pages(self, tile_pages: list[TilePage]) -> None:
+        self.tile_pages = tile_pages
+        self._tile_page_index = PageIndex(tile_pages)
+
+        if not self.prerender_layers:
+            self._prerendered_layers = None
+        else:
+            # Keeps the pages whose tiles didn't change, so they aren't rendered again
+            if self._prerendered_layers is None:
+                self._prerendered_layers = PrerenderedLayers(self.tile_page_size)
+            self._prerendered_layers.update(self.tile_pages)
+
+    def build_region_overlay(self) -> None:
+        """
+        (Re)build the cached debug overlay of the map's regions, see `draw_regions`. Must be called whenever the
+        regions change.
+        """
+        self._region_overlay_index = PageIndex(build_region_overlay(self.regions, self.tile_page_size))
+
+    def build_spatial_indexes(self) -> None:
+        """
+        (Re)build the spatial indexes from the map's regions: one over every region, and one per RegionType.
+        This also discards the surface graph, which is rebuilt from the new indexes when it is next needed.
+        """
+        self.spatial_tree = SpatialTree.from_regions(self.regions)
+        self.spatial_indexes = build_type_indexes(self.regions)
+        self._surface_graph = None
+
+    def surface_graph_of(self, region: Region) -> SurfaceGraph | None:
+        """
+        The walkable surfaces that a ground region is part of: the graph of all the map's ground, built on first use
+        after the regions change. For streamed maps, it is combined from the graphs of the loaded chunks, which were
+        built along with the chunks.
+
+        :param region: A ground region in the map.
+        :return: The surface graph, or None if the region isn't in a loaded chunk of a streamed map.
+        """
+        if self.chunk_streamer and id(region) not in self._streamed_ground:
+            return None
+        if self._surface_graph is None:
+            if self.chunk_streamer:
+                chunks = [self.chunks[coordinate] for coordinate in sorted(self.chunks)]
+                self._surface_graph = SurfaceGraph.combine([chunk.surface_graph for chunk in chunks])
+            else:
+                self._surface_graph = SurfaceGraph.from_regions(self.spatial_index(RegionType.GROUND).regions)
+        return self._surface_graph
+
+    def spatial_index(self, region_type: RegionType) -> SpatialTree:
+        """
+        Get the spatial index containing only the regions of the given type.
+
+        :param region_type: The type of region to look up.
+        :return: The spatial index for that region type.
+        """
+        return self.spatial_indexes[region_type]
+
+    def cull(self, view: Bounds | None) -> VisibleSet:
+        """
+        Find the elements of the map that are visible through a view.
+
+        :param view: The world-space bounds of the view, or None to treat everything as visible.
+        :return: The visible tile pages, regions and game objects. Only game objects that are drawn (see
+                 `ObjectPhase.DRAW`) are considered.
+        """
+        drawn_objects = self.registry.in_phase(ObjectPhase.DRAW)
+        if self._region_overlay_index is None:
+            self.build_region_overlay()
+
+        if view is None:
+            visible = VisibleSet(
+                tile_pages=self.tile_pages,
+                region_pages=self._region_overlay_index.pages,
+                prerendered_pages=self._prerendered_layers.pages if self._prerendered_layers else [],
+                objects=list(drawn_objects),
+            )
+        else:
+            visible = VisibleSet(
+                tile_pages=self._tile_page_index.query(view) if self._tile_page_index else [],
+                region_pages=self._region_overlay_index.query(view),
+                prerendered_pages=self._prerendered_layers.query(view) if self._prerendered_layers else [],
+                objects=cull_objects(drawn_objects, view),
+            )
+
+        stats = visible.stats
+        stats.tile_pages_drawn = len(visible.tile_pages)
+        stats.tile_pages_culled = len(self.tile_pages) - stats.tile_pages_drawn
+        stats.tiles_drawn = sum(len(page) for page in visible.tile_pages)
+        stats.tiles_culled = len(self.tiles) - stats.tiles_drawn
+        stats.regions_drawn = sum(page.region_count for page in visible.region_pages)
+        stats.regions_culled = len(self.regions) - stats.regions_drawn
+        stats.objects_drawn = len(visible.objects)
+        stats.objects_culled = len(drawn_objects) - stats.objects_drawn
+        return visible
+
+    def draw(self, view: Bounds | None = None) -> None:
         """
         Draw the map to the screen.
+
+        :param view: The world-space bounds of the camera's view. Only what is visible through it is drawn; if not
+                     given, everything is drawn.
         """
-        # Draw map tiles
-        for tile in self.tiles:
-            tile.draw()
+        with PROFILER.scope("Map.draw.cull"):
+            visible = self.cull(view)
+        self.culling_stats = visible.stats
+
+        # Draw the background and middle tile layers, behind everything else
+        with PROFILER.scope("Map.draw.tiles"):
+            self.draw_tile_layer(visible, TileLayer.BACKGROUND)
+            self.draw_tile_layer(visible, TileLayer.MIDDLE)
 
         # Draw regions
         if self._draw_regions:
-            self.draw_regions()
+            with PROFILER.scope("Map.draw.regions"):
+                self.draw_regions(visible.region_pages)
 
         # Draw game objects
-        for game_object in self.objects:
-            game_object.draw()
-
-    def draw_regions(self) -> None:
-        """
-        For debugging purposes, draw the map geometry as outlined polygons.
-        """
-        for region in self.regions:
-            color = arcade.color.BLACK
-            match region.designation:
-                case RegionType.GROUND:
-                    color = arcade.color.GREEN
-                case RegionType.DEATH_ZONE:
-                    color = arcade.color.BLACK
-                case RegionType.WALL:
-                    color = arcade.color.RED
-                case RegionType.PLATFORM:
-                    color = arcade.color.YELLOW
-                case RegionType.CEILING:
-                    color = arcade.color.MAGENTA
-            if region.geometry_type == "polygon":
-                arcade.draw_polygon_outline(region.region_points, color, 2)
-            elif region.geometry_type == "line_string":
-                arcade.draw_line_strip(region.region_points, color, 3)
+        with PROFILER.scope("Map.draw.objects"):
+            for game_object in visible.objects:
+                game_object.draw()
+
+        # Draw the foreground tiles in front of the game objects
+        with PROFILER.scope("Map.draw.tiles"):
+            self.draw_tile_layer(visible, TileLayer.FOREGROUND)
+
+    def draw_tile_layer(self, visible: VisibleSet, layer: TileLayer) -> None:
+        """
+        Draw the visible part of a render layer: its pre-rendered pages, if the layers are pre-rendered, otherwise
+        its tile pages.
+
+        :param visible: The visible elements of the map.
+        :param layer: The render layer to draw.
+        """
+        if self._prerendered_layers:
+            self._prerendered_layers.draw(visible.prerendered_pages, layer)
+        else:
+            self.draw_tile_pages(visible.tile_pages, layer)
+
+    @staticmethod
+    def draw_tile_pages(tile_pages: list[TilePage], layer: TileLayer) -> None:
+        """
+        Draw the tile pages of a render layer, each in one batched draw call.
+
+        :param tile_pages: The tile pages to draw from.
+        :param layer: The render layer to draw.
+        """
+        for page in tile_pages:
+            if page.layer == layer:
+                page.sprite_list.draw()
+
+    def draw_regions(self, region_pages: list[RegionOverlayPage] | None = None) -> None:
+        """
+        For debugging purposes, draw the map geometry as outlines, colored by region type.
+
+        :param region_pages: The pages of the overlay to draw. Defaults to all of them.
+        """
+        if region_pages is None:
+            if self._region_overlay_index is None:
+                self.build_region_overlay()
+            region_pages = self._region_overlay_index.pages
+
+        for page in region_pages:
+            page.draw()
@@ -0,0 +1,93 @@
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from luna.core.map_tile import MapTile
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+
+if TYPE_CHECKING:
+    # These modules import this one for its types
+    from luna.core.region_overlay import RegionOverlayPage
+    from luna.core.spatial_tree import SpatialTree
+    from luna.core.surface_graph import SurfaceGraph
+    from luna.core.tile_sprites import TilePage
+
+# Default width and height of a chunk in world space
+DEFAULT_CHUNK_SIZE = 2048
+
+# Integer (column, row) of a chunk in the chunk grid
+ChunkCoordinate = tuple[int, int]
+
+# World-space (min_x, min_y, max_x, max_y)
+Bounds = tuple[float, float, float, float]
+
+
+@dataclass
+class MapChunk:
+    """
+    A fixed-size square section of a map, which can be loaded and unloaded independently of the rest of the map.
+
+    :var coordinate: The position of the chunk in the chunk grid.
+    :var regions: The regions belonging to the chunk.
+    :var tiles: The tiles belonging to the chunk.
+    :var spatial_tree: Spatial index over the chunk's regions.
+    :var spatial_indexes: Spatial index over the chunk's regions of each RegionType.
+    :var tile_pages: The chunk's tiles, batched into pages (see `build_tile_pages`.)
+    :var region_pages: The debug overlay of the chunk's regions (see `build_region_overlay`.)
+    :var surface_graph: The walkable surfaces of the chunk's ground, built with the neighbouring chunks' ground as
+                        context, so they can be connected to the surfaces of the neighbouring chunks (see
+                        `SurfaceGraph.combine`.)
+
+    Everything but the coordinate is built along with the chunk, on the streamer's worker thread, so that loading the
+    chunk into the map only has to add it to the map's indexes (see `Map.stream`.)
+    """
+
+    coordinate: ChunkCoordinate
+    regions: list[Region] = field(default_factory=list)
+    tiles: list[MapTile] = field(default_factory=list)
+    spatial_tree: "SpatialTree | None" = None
+    spatial_indexes: dict[RegionType, "SpatialTree"] = field(default_factory=dict)
+    tile_pages: list["TilePage"] = field(default_factory=list)
+    region_pages: list["RegionOverlayPage"] = field(default_factory=list)
+    surface_graph: "SurfaceGraph | None" = None
+
+
+@dataclass
+class ChunkSource:
+    """
+    The source data of a chunk, from which the chunk can be built: which parts of the map's cooked data (see
+    `CookedMap`) belong to it.
+
+    :var coordinate: The position of the chunk in the chunk grid.
+    :var bounds: The world-space bounds of everything in the chunk. Content may stick out of the chunk's grid cell,
+                 so this is what decides whether a chunk is close enough to be loaded.
+    :var regions: The indices of the chunk's regions.
+    :var tiles: The indices of the chunk's tiles.
+    :var context: The indices of the ground regions of other chunks that touch the chunk's ground, which the chunk's
+                  surfaces are built around.
+    """
+
+    coordinate: ChunkCoordinate
+    bounds: Bounds
+    regions: list[int] = field(default_factory=list)
+    tiles: list[int] = field(default_factory=list)
+    context: list[int] = field(default_factory=list)
+
+
+def chunk_coordinate(x: float, y: float, chunk_size: float) -> ChunkCoordinate:
+    """
+    Find the chunk that a world-space point falls in.
+
+    :param x: The world-space X co-ordinate.
+    :param y: The world-space Y co-ordinate.
+    :param chunk_size: The width and height of a chunk.
+    """
+    return math.floor(x / chunk_size), math.floor(y / chunk_size)
+
+
+def bounds_within(bounds: Bounds, x: float, y: float, distance: float) -> bool:
+    """
+    Whether any part of `bounds` is within `distance` (on each axis) of the point (x, y).
+    """
+    return bounds[0] - distance <= x <= bounds[2] + distance and bounds[1] - distance <= y <= bounds[3] + distance
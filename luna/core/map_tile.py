@@ -1,7 +1,10 @@
+import math
 from dataclasses import dataclass
 
 import arcade
-from arcade import Texture
+from arcade import Sprite, Texture
+
+from luna.core.tile_layer import TileLayer
 
 
 @dataclass
@@ -14,12 +17,40 @@ class MapTile:
                it's scaled.)
     :var rotation: The rotation of the tile in degrees.
     :var texture: The texture of the tile to render.
+    :var layer: The render layer the tile is drawn in.
     """
 
     position: tuple[float, float]
     size: tuple[float, float]
     rotation: float
     texture: Texture
+    layer: TileLayer = TileLayer.MIDDLE
+
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        """
+        The world-space (min_x, min_y, max_x, max_y) bounding box of the tile, including its rotation.
+        """
+        angle = math.radians(self.rotation)
+        cos = abs(math.cos(angle))
+        sin = abs(math.sin(angle))
+        half_width = (self.size[0] * cos + self.size[1] * sin) / 2
+        half_height = (self.size[0] * sin + self.size[1] * cos) / 2
+        return (
+            self.position[0] - half_width,
+            self.position[1] - half_height,
+            self.position[0] + half_width,
+            self.position[1] + half_height,
+        )
+
+    def to_sprite(self) -> Sprite:
+        """
+        Create a sprite that draws the tile, for batched rendering in a SpriteList.
+        """
+        sprite = Sprite(self.texture, center_x=self.position[0], center_y=self.position[1], angle=self.rotation)
+        sprite.width = self.size[0]
+        sprite.height = self.size[1]
+        return sprite
 
     def draw(self) -> None:
         """
@@ -0,0 +1,22 @@
+import enum
+
+
+class ObjectPhase(enum.Flag):
+    """
+    The parts of the game loop a game object takes part in. Each phase only runs over the objects that declared it
+    (see `GameObject.phases`), so objects that take part in none, like spawn points and other markers, cost nothing
+    per frame however many of them there are.
+
+    :var UPDATE: `update` is called every simulation step.
+    :var DRAW: `draw` is called every frame the object is in view.
+    :var INPUT: `on_action` is called with the player's input actions.
+    :var PHYSICS: The object moves: its position before each simulation step is kept, and it is drawn at its position
+                  interpolated between steps.
+    """
+
+    NONE = 0
+    UPDATE = enum.auto()
+    DRAW = enum.auto()
+    INPUT = enum.auto()
+    PHYSICS = enum.auto()
+    ALL = UPDATE | DRAW | INPUT | PHYSICS
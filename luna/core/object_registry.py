@@ -0,0 +1,141 @@
+from typing import Iterator, TypeVar
+
+from luna.core.game_object import GameObject
+from luna.core.object_phase import ObjectPhase
+
+T = TypeVar("T", bound=GameObject)
+
+
+class ObjectRegistry:
+    """
+    Index of the game objects in a map, by id, by type, by name and by phase, kept up to date as objects are added and
+    removed, so finding an object (e.g. the player, or a spawn point) doesn't mean scanning every object in the map.
+
+    Every object gets an integer id when it is added, which is never reused within the registry. An object is indexed
+    under its own class and all of its base classes up to `GameObject` (so looking up a base class finds the objects
+    of every class derived from it), under the name it had when it was added, and in each of the phases it declared
+    (see `ObjectPhase`.) Lookups return objects in the order they were added.
+    """
+
+    _objects: dict[int, GameObject]
+    _by_type: dict[type[GameObject], dict[int, GameObject]]
+    _by_name: dict[str, dict[int, GameObject]]
+    _names: dict[int, str]
+    _by_phase: dict[ObjectPhase, list[GameObject]]
+    _next_id: int
+
+    def __init__(self) -> None:
+        self._objects = {}
+        self._by_type = {}
+        self._by_name = {}
+        self._names = {}
+        self._by_phase = {phase: [] for phase in ObjectPhase.ALL}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __iter__(self) -> Iterator[GameObject]:
+        return iter(self._objects.values())
+
+    def __contains__(self, game_object: GameObject) -> bool:
+        return self._objects.get(game_object.object_id) is game_object
+
+    def add(self, game_object: GameObject) -> int:
+        """
+        Add a game object to the registry, and give it a new id.
+
+        :param game_object: The game object to add. Mustn't be in a registry already.
+        :return: The object's id, also stored in its `object_id`.
+        """
+        if game_object.object_id is not None:
+            raise ValueError(f"Game object {game_object.name} is already registered, as {game_object.object_id}")
+
+        object_id = self._next_id
+        self._next_id += 1
+        game_object.object_id = object_id
+        self._objects[object_id] = game_object
+        for object_type in _indexed_types(type(game_object)):
+            self._by_type.setdefault(object_type, {})[object_id] = game_object
+        self._by_name.setdefault(game_object.name, {})[object_id] = game_object
+        self._names[object_id] = game_object.name
+        for phase in game_object.phases:
+            self._by_phase[phase].append(game_object)
+        return object_id
+
+    def remove(self, game_object: GameObject) -> None:
+        """
+        Remove a game object from the registry. Its id isn't given to any other object.
+
+        :param game_object: The game object to remove.
+        """
+        if game_object not in self:
+            raise ValueError(f"Game object {game_object.name} is not in the registry")
+
+        object_id = game_object.object_id
+        del self._objects[object_id]
+        for object_type in _indexed_types(type(game_object)):
+            _remove_from_index(self._by_type, object_type, object_id)
+        _remove_from_index(self._by_name, self._names.pop(object_id), object_id)
+        for phase in game_object.phases:
+            self._by_phase[phase].remove(game_object)
+        game_object.object_id = None
+
+    def get(self, object_id: int) -> GameObject | None:
+        """
+        Find a game object by id.
+
+        :param object_id: The object's id.
+        :return: The object, or None if there is no object with that id (any more).
+        """
+        return self._objects.get(object_id)
+
+    def first(self, object_type: type[T]) -> T | None:
+        """
+        Find the earliest added game object of a type.
+
+        :param object_type: The type of object to find, including the types derived from it.
+        :return: The object, or None if there are none.
+        """
+        objects = self._by_type.get(object_type)
+        return next(iter(objects.values())) if objects else None
+
+    def of_type(self, object_type: type[T]) -> list[T]:
+        """
+        Find all the game objects of a type.
+
+        :param object_type: The type of objects to find, including the types derived from it.
+        :return: The objects, in the order they were added.
+        """
+        return list(self._by_type.get(object_type, {}).values())
+
+    def named(self, name: str) -> list[GameObject]:
+        """
+        Find all the game objects with a name.
+
+        :param name: The name of the objects to find.
+        :return: The objects, in the order they were added.
+        """
+        return list(self._by_name.get(name, {}).values())
+
+    def in_phase(self, phase: ObjectPhase) -> list[GameObject]:
+        """
+        Find all the game objects that take part in a phase. Called every step and frame, so the registry's own list
+        is returned, rather than a copy: don't modify it.
+
+        :param phase: A single phase.
+        :return: The objects, in the order they were added.
+        """
+        return self._by_phase[phase]
+
+
+def _indexed_types(object_type: type[GameObject]) -> list[type[GameObject]]:
+    return [base for base in object_type.__mro__ if issubclass(base, GameObject)]
+
+
+def _remove_from_index(index: dict, key: object, object_id: int) -> None:
+    objects = index[key]
+    del objects[object_id]
+    # Drop emptied entries, so lookups of types and names that are gone stay constant time
+    if not objects:
+        del index[key]
@@ -0,0 +1,207 @@
+import math
+from dataclasses import dataclass, field
+
+from arcade import Sprite, SpriteList, Texture, TextureAtlas
+from arcade.gl import ONE, ONE_MINUS_SRC_ALPHA, SRC_ALPHA
+from pyglet.math import Mat4
+
+from luna.core.culling import PageIndex
+from luna.core.map_chunk import Bounds
+from luna.core.tile_layer import TileLayer
+from luna.core.tile_sprites import DEFAULT_PAGE_SIZE, TilePage
+
+# Default resolution of pre-rendered pages: texture pixels per world unit
+DEFAULT_PIXELS_PER_UNIT = 1.0
+
+# Pages are rendered with premultiplied alpha, i.e. their colors are already multiplied by their alpha, so that
+# drawing a page blends exactly like drawing each of its tiles would have. Rendering blends the color as usual, but
+# accumulates the alpha; drawing adds the page's (premultiplied) color on top of what is behind it.
+_RENDER_BLEND = SRC_ALPHA, ONE_MINUS_SRC_ALPHA, ONE, ONE_MINUS_SRC_ALPHA
+_DRAW_BLEND = ONE, ONE_MINUS_SRC_ALPHA
+
+# What was rendered into a page: for each source tile page, the transform and texture of each of its tiles
+PageSignature = tuple[tuple[tuple[float, float, float, float, float, int], ...], ...]
+
+
+@dataclass
+class PrerenderedPage:
+    """
+    One render layer of one square cell of the map, rendered once into a texture, so that it can be drawn as a single
+    textured quad however many tiles are in it. Tiles sticking out of the cell are cut off at its edges, and drawn
+    into the neighbouring cells' pages too.
+
+    The page's texture is only created, and rendered into, when the page is first drawn, so pages can be set up
+    without a window.
+
+    :var layer: The render layer of the page's tiles.
+    :var cell: The (column, row) of the cell the page covers.
+    :var bounds: The world-space bounds of the cell.
+    :var sources: The tile pages of the layer with tiles in the cell, which the page is rendered from.
+    :var signature: The tiles the page was (or will be) rendered from, to tell whether it needs re-rendering.
+    :var dirty: Whether the page needs to be rendered before it is next drawn.
+    :var renders: How many times the page has been rendered.
+    """
+
+    layer: TileLayer
+    cell: tuple[int, int]
+    bounds: Bounds
+    sources: list[TilePage]
+    signature: PageSignature
+    dirty: bool = True
+    renders: int = 0
+
+    _atlas: TextureAtlas | None = None
+    _texture: Texture | None = None
+    _sprite_list: SpriteList | None = field(default=None, repr=False)
+
+    def render(self, pixels_per_unit: float = DEFAULT_PIXELS_PER_UNIT) -> None:
+        """
+        Render the page's tiles into its texture. Needs a window.
+
+        :param pixels_per_unit: The resolution of the texture, in pixels per world unit.
+        """
+        left, bottom, right, top = self.bounds
+        if self._texture is None:
+            size = math.ceil((right - left) * pixels_per_unit), math.ceil((top - bottom) * pixels_per_unit)
+            # Each page has an atlas of its own: the tiles it is rendered from may be in any other atlas
+            self._atlas = TextureAtlas(size, border=0, auto_resize=False)
+            self._texture = Texture.create_empty(f"prerendered-{self.layer.name}-{self.cell}", size)
+            self._atlas.add(self._texture)
+            sprite = Sprite(self._texture, center_x=(left + right) / 2, center_y=(bottom + top) / 2)
+            sprite.width = right - left
+            sprite.height = top - bottom
+            self._sprite_list = SpriteList(atlas=self._atlas)
+            self._sprite_list.append(sprite)
+
+        # The projection maps the cell onto the texture; the camera's view (if any) mustn't move it
+        context = self._atlas.ctx
+        view_matrix = context.view_matrix
+        context.view_matrix = Mat4()
+        try:
+            with self._atlas.render_into(self._texture, projection=(left, right, bottom, top)) as framebuffer:
+                framebuffer.clear()
+                for source in self.sources:
+                    source.sprite_list.draw(blend_function=_RENDER_BLEND)
+        finally:
+            context.view_matrix = view_matrix
+        self.dirty = False
+        self.renders += 1
+
+    def draw(self, pixels_per_unit: float = DEFAULT_PIXELS_PER_UNIT) -> None:
+        """
+        Draw the page, rendering it first if needed.
+
+        :param pixels_per_unit: The resolution to render the page at, if it hasn't been rendered yet.
+        """
+        if self.dirty:
+            self.render(pixels_per_unit)
+        self._sprite_list.draw(blend_function=_DRAW_BLEND)
+
+
+class PrerenderedLayers:
+    """
+    The map's tile layers, pre-rendered into textures, one page per render layer and fixed-size, square map cell.
+
+    Tiles are static, so re-drawing every tile every frame is wasted work: instead, each page is rendered from the
+    tile pages once, and every frame only the few pages in view are drawn, one textured quad each, however dense
+    the layers are. When the tiles change, `update` only marks the pages whose tiles changed to be re-rendered.
+
+    :var page_size: The width and height of the map cell covered by a page.
+    :var pixels_per_unit: The resolution of the pages' textures, in pixels per world unit.
+    :var pages: The pages, sorted by layer (in draw order) and then by cell.
+    """
+
+    page_size: float
+    pixels_per_unit: float
+    pages: list[PrerenderedPage]
+
+    _index: PageIndex[PrerenderedPage]
+    _tile_signatures: dict[int, tuple[TilePage, tuple[tuple[float, float, float, float, float, int], ...]]]
+
+    def __init__(self, page_size: float = DEFAULT_PAGE_SIZE, pixels_per_unit: float = DEFAULT_PIXELS_PER_UNIT) -> None:
+        self.page_size = page_size
+        self.pixels_per_unit = pixels_per_unit
+        self.pages = []
+        self._index = PageIndex(self.pages)
+        self._tile_signatures = {}
+
+    def update(self, tile_pages: list[TilePage]) -> None:
+        """
+        Set up the pages for a new set of tile pages (i.e. after the map's tiles changed.) Pages whose tiles are the
+        same as before are kept as they were rendered; the others are rendered again when next drawn. Tile pages are
+        expected not to change once built, so the tiles of a page that was already given are only looked at once.
+
+        :param tile_pages: The tile pages to pre-render.
+        """
+        sources: dict[tuple[TileLayer, tuple[int, int]], list[TilePage]] = {}
+        for tile_page in tile_pages:
+            # A tile that only touches a cell's edge isn't in it
+            min_x, min_y, max_x, max_y = tile_page.bounds
+            min_column, min_row = math.floor(min_x / self.page_size), math.floor(min_y / self.page_size)
+            max_column, max_row = math.ceil(max_x / self.page_size) - 1, math.ceil(max_y / self.page_size) - 1
+            for column in range(min_column, max_column + 1):
+                for row in range(min_row, max_row + 1):
+                    sources.setdefault((tile_page.layer, (column, row)), []).append(tile_page)
+
+        # Keyed by id, but holding on to the pages, so an id can't be reused by another page while it's in here
+        previous_signatures = self._tile_signatures
+        self._tile_signatures = {}
+        for tile_page in tile_pages:
+            cached = previous_signatures.get(id(tile_page))
+            if cached is None or cached[0] is not tile_page:
+                cached = tile_page, _tile_signature(tile_page)
+            self._tile_signatures[id(tile_page)] = cached
+        tile_signatures = {key: signature for key, (_, signature) in self._tile_signatures.items()}
+        previous = {(page.layer, page.cell): page for page in self.pages}
+        pages = []
+        for layer, cell in sorted(sources, key=lambda key: (key[0].value, key[1])):
+            cell_sources = sources[layer, cell]
+            signature = tuple(tile_signatures[id(tile_page)] for tile_page in cell_sources)
+            page = previous.get((layer, cell))
+            if page is None:
+                page = PrerenderedPage(
+                    layer=layer,
+                    cell=cell,
+                    bounds=(
+                        cell[0] * self.page_size,
+                        cell[1] * self.page_size,
+                        (cell[0] + 1) * self.page_size,
+                        (cell[1] + 1) * self.page_size,
+                    ),
+                    sources=cell_sources,
+                    signature=signature,
+                )
+            else:
+                page.dirty = page.dirty or page.signature != signature
+                page.sources = cell_sources
+                page.signature = signature
+            pages.append(page)
+
+        self.pages = pages
+        self._index = PageIndex(pages)
+
+    def query(self, view: Bounds) -> list[PrerenderedPage]:
+        """
+        Find the pages that overlap a view, in draw order.
+
+        :param view: The world-space bounds of the view.
+        """
+        return self._index.query(view)
+
+    def draw(self, pages: list[PrerenderedPage], layer: TileLayer) -> None:
+        """
+        Draw the pages of a render layer, rendering the ones that changed first.
+
+        :param pages: The pages to draw from.
+        :param layer: The render layer to draw.
+        """
+        for page in pages:
+            if page.layer == layer:
+                page.draw(self.pixels_per_unit)
+
+
+def _tile_signature(tile_page: TilePage) -> tuple[tuple[float, float, float, float, float, int], ...]:
+    return tuple(
+        (sprite.center_x, sprite.center_y, sprite.width, sprite.height, sprite.angle, id(sprite.texture))
+        for sprite in tile_page.sprite_list
+    )
@@ -0,0 +1,118 @@
+import arcade
+from arcade.types import Color
+
+from luna.utils.profiler import FRAME_SCOPE, Profiler
+
+# Number of scopes listed under the graph, slowest first
+MAX_LISTED_SCOPES = 12
+
+# How often the listed scope statistics are updated, in frames. Working them out every frame would show up in them.
+STATS_REFRESH_FRAMES = 15
+
+GRAPH_WIDTH = 600
+GRAPH_HEIGHT = 150
+# Frame time at the top of the graph, as a multiple of the frame budget
+GRAPH_MAX_BUDGETS = 2
+LINE_HEIGHT = 22
+
+BACKGROUND_COLOR = Color(0, 0, 0, 180)
+WITHIN_BUDGET_COLOR = arcade.color.GREEN
+OVER_BUDGET_COLOR = arcade.color.RED
+BUDGET_LINE_COLOR = arcade.color.YELLOW
+
+
+class ProfilerOverlay:
+    """
+    On-screen view of a profiler: a graph of the time each recent frame took against the frame budget, and the mean
+    and 99th percentile times of the slowest scopes. Drawn in screen space, in the top left of the window.
+
+    Showing the overlay enables the profiler, and hiding it disables the profiler again, so the game is only
+    profiled while the overlay is up.
+
+    :var profiler: The profiler whose timings are shown.
+    :var frame_budget_ms: The time the window has to draw each frame, in milliseconds. Frames that took longer are
+         shown as over budget.
+    :var visible: Whether the overlay is shown.
+    """
+
+    profiler: Profiler
+    frame_budget_ms: float
+    visible: bool
+
+    _lines: list[arcade.Text]
+    _refreshed_at: int
+
+    def __init__(self, profiler: Profiler, frame_time: float) -> None:
+        """
+        :param profiler: The profiler whose timings are shown.
+        :param frame_time: The time between the window's draws, in seconds (its draw rate.)
+        """
+        self.profiler = profiler
+        self.frame_budget_ms = frame_time * 1000
+        self.visible = False
+        self._lines = []
+        self._refreshed_at = -STATS_REFRESH_FRAMES
+
+    def toggle(self) -> None:
+        """
+        Show the overlay if it is hidden, otherwise hide it.
+        """
+        self.visible = not self.visible
+        self.profiler.enabled = self.visible
+        if self.visible:
+            self.profiler.reset()
+            self._refreshed_at = -STATS_REFRESH_FRAMES
+
+    def draw(self, window_height: float) -> None:
+        """
+        Draw the overlay, if it is shown.
+
+        :param window_height: The height of the window, to place the overlay at its top.
+        """
+        if not self.visible:
+            return
+
+        left = 10
+        top = window_height - 10
+        bottom = top - GRAPH_HEIGHT
+        list_height = (MAX_LISTED_SCOPES + 1) * LINE_HEIGHT
+        arcade.draw_lrbt_rectangle_filled(left, left + GRAPH_WIDTH, bottom - list_height, top, BACKGROUND_COLOR)
+
+        # One vertical bar per frame, newest on the right
+        frame_times = self.profiler.history(FRAME_SCOPE)
+        bar_width = GRAPH_WIDTH / self.profiler.frame_capacity
+        start = left + GRAPH_WIDTH - len(frame_times) * bar_width
+        budget_ms = self.frame_budget_ms
+        graph_max_ms = GRAPH_MAX_BUDGETS * budget_ms
+        within_budget = []
+        over_budget = []
+        for i, frame_time in enumerate(frame_times.tolist()):
+            x = start + (i + 0.5) * bar_width
+            bar_top = bottom + min(frame_time / graph_max_ms, 1) * GRAPH_HEIGHT
+            (over_budget if frame_time > budget_ms else within_budget).extend([(x, bottom), (x, bar_top)])
+        if within_budget:
+            arcade.draw_lines(within_budget, WITHIN_BUDGET_COLOR, bar_width)
+        if over_budget:
+            arcade.draw_lines(over_budget, OVER_BUDGET_COLOR, bar_width)
+        budget_y = bottom + GRAPH_HEIGHT / GRAPH_MAX_BUDGETS
+        arcade.draw_line(left, budget_y, left + GRAPH_WIDTH, budget_y, BUDGET_LINE_COLOR, 1)
+
+        if self.profiler.frames - self._refreshed_at >= STATS_REFRESH_FRAMES:
+            self._refresh_lines(left, bottom)
+        for line in self._lines:
+            line.draw()
+
+    def _refresh_lines(self, left: float, top: float) -> None:
+        self._refreshed_at = self.profiler.frames
+        texts = [f"{'scope':<32}{'mean ms':>10}{'p99 ms':>10}{'calls':>8}"] + [
+            f"{stats.name:<32}{stats.mean_ms:>10.3f}{stats.p99_ms:>10.3f}{stats.calls:>8.1f}"
+            for stats in self.profiler.stats()[:MAX_LISTED_SCOPES]
+        ]
+        while len(self._lines) < len(texts):
+            self._lines.append(
+                arcade.Text("", 0, 0, arcade.color.WHITE, font_size=12, font_name="Courier New", anchor_y="top")
+            )
+        del self._lines[len(texts):]
+        for i, (line, text) in enumerate(zip(self._lines, texts)):
+            line.text = text
+            line.position = (left + 5, top - 5 - i * LINE_HEIGHT)
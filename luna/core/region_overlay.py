@@ -0,0 +1,139 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import arcade
+import numpy
+from arcade.shape_list import ShapeElementList, create_triangles_filled_with_colors
+from arcade.types import Color
+
+from luna.core.map_chunk import Bounds, chunk_coordinate
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+
+# Outline color of each type of region in the debug overlay
+REGION_COLORS: dict[RegionType, Color] = {
+    RegionType.GROUND: arcade.color.GREEN,
+    RegionType.DEATH_ZONE: arcade.color.BLACK,
+    RegionType.WALL: arcade.color.RED,
+    RegionType.PLATFORM: arcade.color.YELLOW,
+    RegionType.CEILING: arcade.color.MAGENTA,
+}
+
+# Outline width of each geometry type in the debug overlay
+LINE_WIDTHS = {"polygon": 2, "line_string": 3}
+
+
+@dataclass
+class RegionOverlayPage:
+    """
+    The debug outlines of the regions in one square cell of the map, batched into one shape per RegionType color.
+
+    The outlines are computed up front, but only uploaded to the GPU (as a ShapeElementList) when the page is first
+    drawn, so pages can be built without a window.
+
+    :var cell: The (column, row) of the cell the page covers. A region belongs to the cell its bounds' center falls in.
+    :var bounds: The world-space bounds of the page's regions, which may stick out of the cell.
+    :var region_count: The number of regions in the page.
+    :var triangles: (N, 2) The outlines of each type of region, as triangle vertices.
+    """
+
+    cell: tuple[int, int]
+    bounds: Bounds
+    region_count: int
+    triangles: dict[RegionType, numpy.ndarray] = field(default_factory=dict)
+
+    _shapes: ShapeElementList | None = None
+
+    def draw(self) -> None:
+        """
+        Draw the page's outlines, in one batched draw call.
+        """
+        if self._shapes is None:
+            self._shapes = ShapeElementList()
+            for region_type, vertices in self.triangles.items():
+                self._shapes.append(
+                    create_triangles_filled_with_colors(vertices.tolist(), [REGION_COLORS[region_type]] * len(vertices))
+                )
+        self._shapes.draw()
+
+
+def outline_segments(region: Region) -> numpy.ndarray:
+    """
+    The line segments that outline a region: every edge of a polygon, or every segment of a line string.
+
+    :param region: The region to outline.
+    :return: (S, 2, 2) The start and end point of each segment.
+    """
+    points = numpy.asarray(region.region_points, dtype=float)
+    ends = numpy.roll(points, -1, axis=0) if region.geometry_type == "polygon" else points[1:]
+    return numpy.stack((points[:len(ends)], ends), axis=1)
+
+
+def thick_line_triangles(segments: numpy.ndarray, width: float) -> numpy.ndarray:
+    """
+    Turn line segments into thick lines, made of two triangles each.
+
+    :param segments: (S, 2, 2) The start and end point of each segment.
+    :param width: The width of the lines.
+    :return: (S * 6, 2) The vertices of the triangles.
+    """
+    starts = segments[:, 0]
+    ends = segments[:, 1]
+    direction = ends - starts
+    lengths = numpy.hypot(direction[:, 0], direction[:, 1])[:, None]
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        offset = numpy.where(lengths > 0, numpy.stack((-direction[:, 1], direction[:, 0]), axis=1) / lengths, 0)
+    offset *= width / 2
+    return numpy.stack(
+        (starts + offset, starts - offset, ends + offset, ends + offset, starts - offset, ends - offset), axis=1
+    ).reshape(-1, 2)
+
+
+def build_region_overlay(regions: Iterable[Region], page_size: float) -> list[RegionOverlayPage]:
+    """
+    Build the debug overlay of regions, partitioned into pages so that it can be culled like the map's tiles.
+
+    :param regions: The regions to outline.
+    :param page_size: The width and height of the map cell covered by a page.
+    :return: The pages, sorted by cell.
+    """
+    segments: dict[tuple[int, int], dict[tuple[RegionType, float], list[numpy.ndarray]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    bounds: dict[tuple[int, int], Bounds] = {}
+    counts: dict[tuple[int, int], int] = defaultdict(int)
+
+    for region in regions:
+        points = numpy.asarray(region.region_points, dtype=float)
+        min_x, min_y = points.min(axis=0).tolist()
+        max_x, max_y = points.max(axis=0).tolist()
+        cell = chunk_coordinate((min_x + max_x) / 2, (min_y + max_y) / 2, page_size)
+
+        segments[cell][region.designation, LINE_WIDTHS[region.geometry_type]].append(outline_segments(region))
+        counts[cell] += 1
+        if cell in bounds:
+            page_bounds = bounds[cell]
+            bounds[cell] = (
+                min(page_bounds[0], min_x),
+                min(page_bounds[1], min_y),
+                max(page_bounds[2], max_x),
+                max(page_bounds[3], max_y),
+            )
+        else:
+            bounds[cell] = (min_x, min_y, max_x, max_y)
+
+    pages = []
+    for cell in sorted(segments):
+        triangles: dict[RegionType, list[numpy.ndarray]] = defaultdict(list)
+        for (region_type, width), cell_segments in segments[cell].items():
+            triangles[region_type].append(thick_line_triangles(numpy.concatenate(cell_segments), width))
+        pages.append(
+            RegionOverlayPage(
+                cell=cell,
+                bounds=bounds[cell],
+                region_count=counts[cell],
+                triangles={region_type: numpy.concatenate(vertices) for region_type, vertices in triangles.items()},
+            )
+        )
+    return pages
@@ -0,0 +1,264 @@
+import enum
+import math
+from dataclasses import dataclass
+
+from luna.core.game_object import GameObject
+from luna.core.object_phase import ObjectPhase
+
+# Default distance from the focus within which game objects are simulated every step. Covers the screen, so
+# everything in view moves smoothly.
+DEFAULT_ACTIVE_RADIUS = 1280
+
+# Default distance from the focus within which game objects are simulated at a reduced rate; further away, they sleep.
+# Within the distance chunks are streamed in at (see `ChunkStreamer`), so nothing is simulated without ground under it.
+DEFAULT_REDUCED_RADIUS = 2048
+
+# Default number of steps between the updates of game objects simulated at a reduced rate
+DEFAULT_REDUCED_INTERVAL = 4
+
+# Default number of steps a game object stays active for after it is woken by an event, however far away it is
+DEFAULT_WAKE_TICKS = 120
+
+
+class Activity(enum.Enum):
+    """
+    How often a game object is simulated.
+
+    :var ACTIVE: Every simulation step.
+    :var REDUCED: Once every few steps, advancing by all the steps at once. Only for settled objects.
+    :var ASLEEP: Not at all: the object is frozen where it is until it is woken.
+    """
+
+    ACTIVE = 0
+    REDUCED = 1
+    ASLEEP = 2
+
+
+@dataclass
+class _TrackedObject:
+    game_object: GameObject
+    moves: bool
+    activity: Activity = Activity.ACTIVE
+    step_scale: int = 1
+    woken_until: int = 0
+    cell: tuple[int, int] | None = None
+
+
+class SimulationLod:
+    """
+    Simulation level of detail: only game objects near the focus (the player the camera follows) are simulated at the
+    full rate. Objects a little further away are updated once every `reduced_interval` steps, as long as they are
+    settled (see `GameObject.settled`), and objects further than `reduced_radius` away are put to sleep, until they
+    come back within range, or are woken by an event (see `wake`.)
+
+    Only the objects that are awake are visited every step. Sleeping objects are kept in a grid of cells, and only the
+    cells around the focus are checked for objects to wake, so the cost of a step follows the number of objects near
+    the focus rather than the number of objects in the map. Objects that take part in neither the update nor the
+    physics phase (see `ObjectPhase`) aren't simulated at all, and aren't tracked.
+
+    Objects are told how many steps to advance by with `GameObject.set_step_scale`.
+
+    :var active_radius: Distance from the focus within which objects are simulated every step. Set it to infinity
+                        to simulate everything at the full rate.
+    :var reduced_radius: Distance from the focus within which objects are simulated at a reduced rate.
+    :var reduced_interval: Number of steps between the updates of objects simulated at a reduced rate.
+    :var wake_ticks: Number of steps an object stays active for after it is woken by an event.
+    :var updated: The objects to update in the current step, with the number of steps each advances by.
+    :var moved: The objects that move (`ObjectPhase.PHYSICS`) in the current step.
+    :var awake_moving: All the awake objects that move, whether or not they move in the current step.
+    """
+
+    active_radius: float
+    reduced_radius: float
+    reduced_interval: int
+    wake_ticks: int
+    updated: list[tuple[GameObject, int]]
+    moved: list[GameObject]
+    awake_moving: list[GameObject]
+
+    _cell_size: float
+    _awake: dict[int, _TrackedObject]
+    _sleeping: dict[int, _TrackedObject]
+    _sleeping_cells: dict[tuple[int, int], dict[int, _TrackedObject]]
+    _tick: int
+
+    def __init__(
+        self,
+        active_radius: float = DEFAULT_ACTIVE_RADIUS,
+        reduced_radius: float = DEFAULT_REDUCED_RADIUS,
+        reduced_interval: int = DEFAULT_REDUCED_INTERVAL,
+        wake_ticks: int = DEFAULT_WAKE_TICKS,
+    ) -> None:
+        self.active_radius = active_radius
+        self.reduced_radius = reduced_radius
+        self.reduced_interval = reduced_interval
+        self.wake_ticks = wake_ticks
+        self.updated = []
+        self.moved = []
+        self.awake_moving = []
+        self._cell_size = reduced_radius if math.isfinite(reduced_radius) else DEFAULT_REDUCED_RADIUS
+        self._awake = {}
+        self._sleeping = {}
+        self._sleeping_cells = {}
+        self._tick = 0
+
+    def add(self, game_object: GameObject) -> None:
+        """
+        Start tracking a game object. It starts out active. Objects that aren't simulated are ignored.
+
+        :param game_object: The game object, which must have an id (see `ObjectRegistry`.)
+        """
+        if game_object.phases & (ObjectPhase.UPDATE | ObjectPhase.PHYSICS):
+            tracked = _TrackedObject(game_object=game_object, moves=ObjectPhase.PHYSICS in game_object.phases)
+            self._awake[game_object.object_id] = tracked
+            if tracked.moves:
+                self.awake_moving.append(game_object)
+
+    def remove(self, game_object: GameObject) -> None:
+        """
+        Stop tracking a game object. Does nothing if it isn't tracked.
+
+        :param game_object: The game object.
+        """
+        tracked = self._awake.pop(game_object.object_id, None)
+        if tracked is None:
+            tracked = self._sleeping.get(game_object.object_id)
+            if tracked is None:
+                return
+            self._remove_sleeping(tracked)
+        elif tracked.moves:
+            self.awake_moving.remove(game_object)
+
+    def activity(self, game_object: GameObject) -> Activity | None:
+        """
+        How often a game object is simulated.
+
+        :param game_object: The game object.
+        :return: Its activity, or None if it isn't tracked.
+        """
+        tracked = self._awake.get(game_object.object_id) or self._sleeping.get(game_object.object_id)
+        return tracked.activity if tracked else None
+
+    def wake(self, game_object: GameObject, ticks: int | None = None) -> None:
+        """
+        Wake a game object up (e.g. because something happened to it), and keep it active for a while, however far
+        from the focus it is. Does nothing if it isn't tracked.
+
+        :param game_object: The game object.
+        :param ticks: How many steps to keep it active for. Defaults to `wake_ticks`.
+        """
+        tracked = self._awake.get(game_object.object_id)
+        if tracked is None:
+            tracked = self._sleeping.get(game_object.object_id)
+            if tracked is None:
+                return
+            self._remove_sleeping(tracked)
+            self._wake(tracked)
+        tracked.woken_until = max(tracked.woken_until, self._tick + (self.wake_ticks if ticks is None else ticks))
+        self._set_activity(tracked, Activity.ACTIVE, 1)
+
+    def update(self, focus: tuple[float, float], tick: int) -> None:
+        """
+        Work out which game objects are simulated in a step, waking and putting objects to sleep as they come within
+        and go out of range. Fills in `updated` and `moved`.
+
+        :param focus: The world-space position to simulate around, i.e. the player's position.
+        :param tick: The number of the step.
+        """
+        self._tick = tick
+        focus_x, focus_y = focus
+
+        # Wake the sleeping objects that came back within range
+        radius = self.reduced_radius
+        if self._sleeping and not math.isfinite(radius):
+            for tracked in list(self._sleeping.values()):
+                self._remove_sleeping(tracked)
+                self._wake(tracked)
+        elif self._sleeping:
+            for column in range(self._cell(focus_x - radius), self._cell(focus_x + radius) + 1):
+                for row in range(self._cell(focus_y - radius), self._cell(focus_y + radius) + 1):
+                    cell = self._sleeping_cells.get((column, row))
+                    if not cell:
+                        continue
+                    for tracked in list(cell.values()):
+                        x, y = tracked.game_object.position
+                        if math.hypot(x - focus_x, y - focus_y) <= radius:
+                            self._remove_sleeping(tracked)
+                            self._wake(tracked)
+
+        updated = []
+        moved = []
+        for object_id, tracked in list(self._awake.items()):
+            x, y = tracked.game_object.position
+            distance = math.hypot(x - focus_x, y - focus_y)
+            if distance <= self.active_radius or tracked.woken_until > tick:
+                self._set_activity(tracked, Activity.ACTIVE, 1)
+            elif distance <= self.reduced_radius and not tracked.game_object.settled:
+                # Falling objects are simulated step by step until they land
+                self._set_activity(tracked, Activity.ACTIVE, 1)
+            elif distance <= self.reduced_radius:
+                # Spread the objects over the interval, so they don't all update in the same step
+                on_turn = (tick + object_id) % self.reduced_interval == 0
+                self._set_activity(tracked, Activity.REDUCED, self.reduced_interval if on_turn else 0)
+            else:
+                self._sleep(tracked)
+                continue
+
+            if tracked.step_scale:
+                if ObjectPhase.UPDATE in tracked.game_object.phases:
+                    updated.append((tracked.game_object, tracked.step_scale))
+                if tracked.moves:
+                    moved.append(tracked.game_object)
+
+        self.updated = updated
+        self.moved = moved
+
+    def counts(self) -> dict[Activity, int]:
+        """
+        The number of tracked game objects at each activity level.
+        """
+        counts = {activity: 0 for activity in Activity}
+        for tracked in self._awake.values():
+            counts[tracked.activity] += 1
+        counts[Activity.ASLEEP] = len(self._sleeping)
+        return counts
+
+    def _cell(self, coordinate: float) -> int:
+        return math.floor(coordinate / self._cell_size)
+
+    def _set_activity(self, tracked: _TrackedObject, activity: Activity, step_scale: int) -> None:
+        tracked.activity = activity
+        if tracked.step_scale != step_scale:
+            tracked.step_scale = step_scale
+            tracked.game_object.set_step_scale(step_scale)
+
+    def _sleep(self, tracked: _TrackedObject) -> None:
+        game_object = tracked.game_object
+        del self._awake[game_object.object_id]
+        if tracked.moves:
+            self.awake_moving.remove(game_object)
+            # Draw it where it stopped
+            game_object.previous_position = game_object.position
+            game_object.interpolate(1.0)
+        self._set_activity(tracked, Activity.ASLEEP, 0)
+
+        x, y = game_object.position
+        tracked.cell = self._cell(x), self._cell(y)
+        self._sleeping[game_object.object_id] = tracked
+        self._sleeping_cells.setdefault(tracked.cell, {})[game_object.object_id] = tracked
+
+    def _wake(self, tracked: _TrackedObject) -> None:
+        self._awake[tracked.game_object.object_id] = tracked
+        if tracked.moves:
+            self.awake_moving.append(tracked.game_object)
+        # Active until the next update works out how far away it is
+        self._set_activity(tracked, Activity.ACTIVE, 1)
+
+    def _remove_sleeping(self, tracked: _TrackedObject) -> None:
+        object_id = tracked.game_object.object_id
+        del self._sleeping[object_id]
+        cell = self._sleeping_cells[tracked.cell]
+        del cell[object_id]
+        if not cell:
+            del self._sleeping_cells[tracked.cell]
+        tracked.cell = None
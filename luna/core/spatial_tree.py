@@ -1,22 +1,407 @@
+from dataclasses import dataclass
+
+import numpy
+import shapely
 from shapely import STRtree
 from shapely.geometry.base import BaseGeometry
 
+from luna.collision.engine import pack_polygons
 from luna.core.region import Region
+from luna.core.region_type import RegionType
+
+_GEOMETRY_CONSTRUCTORS = {
+    "polygon": shapely.polygons,
+    "line_string": shapely.linestrings,
+}
+
+# Regions with fewer vertices than this aren't prepared: testing a triangle directly is cheaper than going through
+# the prepared geometry's index, and most regions are small convex pieces of level polygons
+PREPARE_MIN_VERTICES = 16
+
+# The predicates that `SpatialTree.evaluate` supports
+_PREDICATES = {
+    "intersects": shapely.intersects,
+    "overlaps": shapely.overlaps,
+    "touches": shapely.touches,
+    "crosses": shapely.crosses,
+    "contains": shapely.contains,
+    "covers": shapely.covers,
+    "within": shapely.within,
+}
+
+
+@dataclass
+class BulkQueryResult:
+    """
+    Result from `SpatialTree.query_bulk`. Each hit is one (query, region) pair, stored as parallel arrays.
+
+    :var query_indices: For each hit, the index of the query geometry that produced it.
+    :var region_indices: For each hit, the index of the region in the tree that was hit.
+    :var designations: For each hit, the `RegionType` value of the region that was hit.
+    """
+
+    query_indices: numpy.ndarray
+    region_indices: numpy.ndarray
+    designations: numpy.ndarray
+
+    def __len__(self) -> int:
+        return len(self.query_indices)
+
+    def mask(self, region_type: RegionType) -> numpy.ndarray:
+        """
+        Boolean mask over the hits selecting those that hit a region of the given type.
+
+        :param region_type: The type of region to select.
+        """
+        return self.designations == region_type.value
+
+    def filter(self, region_type: RegionType) -> "BulkQueryResult":
+        """
+        Only keep the hits on regions of the given type.
+
+        :param region_type: The type of region to keep.
+        """
+        mask = self.mask(region_type)
+        return BulkQueryResult(
+            query_indices=self.query_indices[mask],
+            region_indices=self.region_indices[mask],
+            designations=self.designations[mask],
+        )
 
 
 class SpatialTree:
     """
     Wraps STRtree in shapely for convenience.
+
+    Besides the geometries, the tree keeps the vertices of all its regions packed into one (M, K, 2) array (see
+    `pack_polygons`), so that collision code can work on the raw vertices of the regions it finds, along with other
+    per-region data derived from them. Complex geometries are prepared (see `shapely.prepare`), so that predicates
+    evaluated against the same static region over and over don't rebuild its internal index every time.
+
+    Trees can be combined (see `combine`) without rebuilding them: a combined tree is made of parts, each the STRtree
+    of one of the trees it was combined from, and queries only visit the parts whose bounds they overlap.
     """
 
-    _tree: STRtree
+    _parts: list[tuple[STRtree, int]]
+    _part_bounds: list[tuple[float, float, float, float]]
     _geometries: list[BaseGeometry]
+    _geometry_array: numpy.ndarray
     _regions: list[Region]
+    _designations: numpy.ndarray
+    _vertices: numpy.ndarray
+    _closed: numpy.ndarray
+    _bounds: numpy.ndarray
+    _edge_normals: numpy.ndarray
+    _line_directions: numpy.ndarray
+    _line_slopes: numpy.ndarray
 
-    def __init__(self, geometries: list[BaseGeometry], regions: list[Region]) -> None:
+    def __init__(
+        self, geometries: list[BaseGeometry], regions: list[Region], vertices: numpy.ndarray | None = None
+    ) -> None:
+        """
+        :param geometries: The geometry of each region.
+        :param regions: The regions to index.
+        :param vertices: The regions' packed vertices, if they were already packed.
+        """
         self._geometries = geometries
+        self._geometry_array = numpy.empty(len(geometries), dtype=object)
+        self._geometry_array[:] = geometries
+        complex_geometries = numpy.array([len(region.region_points) >= PREPARE_MIN_VERTICES for region in regions])
+        if complex_geometries.any():
+            shapely.prepare(self._geometry_array[complex_geometries])
         self._regions = regions
-        self._tree = STRtree(geometries)
+        self._designations = numpy.array([region.designation.value for region in regions], dtype=numpy.int8)
+        self._vertices = (
+            vertices if vertices is not None else pack_polygons([region.region_points for region in regions])
+        )
+        self._closed = numpy.array([region.geometry_type == "polygon" for region in regions], dtype=bool)
+        self._bounds = numpy.concatenate((self._vertices.min(axis=1), self._vertices.max(axis=1)), axis=1)
+        self._edge_normals = _edge_normals(self._vertices, self._closed)
+        self._line_directions, self._line_slopes = _line_directions(self._vertices, self._closed)
+        self._parts = [(STRtree(geometries), 0)]
+        self._part_bounds = _total_bounds(self._bounds)
+
+    @classmethod
+    def from_regions(cls, regions: list[Region]) -> "SpatialTree":
+        """
+        Create a spatial tree from regions, building the geometry for each.
+        Regions with the same geometry type and vertex count are converted to geometries in one vectorized call.
+
+        :param regions: The regions to index.
+        """
+        indexed_regions = [region for region in regions if region.geometry_type in _GEOMETRY_CONSTRUCTORS]
+
+        groups: dict[tuple[str, int], list[int]] = {}
+        for i, region in enumerate(indexed_regions):
+            groups.setdefault((region.geometry_type, len(region.region_points)), []).append(i)
+
+        geometries = numpy.empty(len(indexed_regions), dtype=object)
+        vertices = numpy.empty((len(indexed_regions), max((count for _, count in groups), default=1), 2))
+        for (geometry_type, count), indices in groups.items():
+            points = numpy.array([indexed_regions[i].region_points for i in indices], dtype=float)
+            geometries[indices] = _GEOMETRY_CONSTRUCTORS[geometry_type](points)
+            vertices[indices, :count] = points
+            vertices[indices, count:] = points[:, -1:]
+
+        return cls(list(geometries), indexed_regions, vertices)
+
+    @classmethod
+    def combine(cls, trees: list["SpatialTree"]) -> "SpatialTree":
+        """
+        Combine spatial trees into one over all of their regions, in order, e.g. the trees of the loaded chunks of a
+        streamed map. Nothing is rebuilt: the combined tree queries the trees' own STRtrees, and only their per-region
+        arrays are copied.
+
+        :param trees: The trees to combine.
+        """
+        trees = [tree for tree in trees if len(tree)]
+        if not trees:
+            return cls.from_regions([])
+        if len(trees) == 1:
+            return trees[0]
+
+        combined = cls.__new__(cls)
+        combined._geometries = [geometry for tree in trees for geometry in tree._geometries]
+        combined._geometry_array = numpy.concatenate([tree._geometry_array for tree in trees])
+        combined._regions = [region for tree in trees for region in tree._regions]
+        combined._designations = numpy.concatenate([tree._designations for tree in trees])
+        combined._closed = numpy.concatenate([tree._closed for tree in trees])
+        combined._bounds = numpy.concatenate([tree._bounds for tree in trees])
+        combined._line_directions = numpy.concatenate([tree._line_directions for tree in trees])
+        combined._line_slopes = numpy.concatenate([tree._line_slopes for tree in trees])
+
+        # Trees may have padded their regions' vertices to different counts
+        width = max(tree._vertices.shape[1] for tree in trees)
+        combined._vertices = numpy.concatenate([_pad_vertices(tree._vertices, width) for tree in trees])
+        combined._edge_normals = numpy.concatenate([_pad_edge_normals(tree._edge_normals, width) for tree in trees])
+
+        combined._parts = []
+        offset = 0
+        for tree in trees:
+            combined._parts.extend((part, part_offset + offset) for part, part_offset in tree._parts)
+            offset += len(tree)
+        combined._part_bounds = [bounds for tree in trees for bounds in tree._part_bounds]
+        return combined
+
+    def __len__(self) -> int:
+        return len(self._regions)
+
+    @property
+    def regions(self) -> list[Region]:
+        return self._regions
+
+    @property
+    def geometries(self) -> list[BaseGeometry]:
+        return self._geometries
+
+    @property
+    def vertices(self) -> numpy.ndarray:
+        """
+        (M, K, 2) The vertices of every region in the tree, padded by repeating each region's last vertex.
+        """
+        return self._vertices
+
+    @property
+    def closed(self) -> numpy.ndarray:
+        """
+        (M,) Whether each region is a closed polygon, as opposed to an open line string.
+        """
+        return self._closed
+
+    @property
+    def bounds(self) -> numpy.ndarray:
+        """
+        (M, 4) The (min_x, min_y, max_x, max_y) bounding box of every region in the tree.
+        """
+        return self._bounds
+
+    @property
+    def edge_normals(self) -> numpy.ndarray:
+        """
+        (M, K, 2) The unit normal of every edge of every region, where edge i goes from vertex i to vertex i + 1 (and
+        the last edge closes the polygon.) Polygon normals point outwards. Line string normals point to the left of
+        the line's direction, i.e. up for a line drawn from left to right. Degenerate edges, and the closing edge of
+        line strings, have a zero normal.
+        """
+        return self._edge_normals
+
+    @property
+    def line_directions(self) -> numpy.ndarray:
+        """
+        (M, 2) The unit vector from the first to the last vertex of every line string, or NaN for polygons.
+        """
+        return self._line_directions
+
+    @property
+    def line_slopes(self) -> numpy.ndarray:
+        """
+        (M,) The slope (rise over run) from the first to the last vertex of every line string, infinite for vertical
+        lines, or NaN for polygons.
+        """
+        return self._line_slopes
+
+    def bounds_overlap(
+        self, indices: numpy.ndarray, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> numpy.ndarray:
+        """
+        Cheaply check whether the bounding boxes of some regions overlap an axis-aligned box.
+
+        :param indices: The indices of the regions in the tree.
+        :return: A boolean mask over `indices`.
+        """
+        bounds = self._bounds[indices]
+        return (bounds[:, 0] <= max_x) & (bounds[:, 2] >= min_x) & (bounds[:, 1] <= max_y) & (bounds[:, 3] >= min_y)
+
+    def evaluate(self, predicate: str, indices: numpy.ndarray, geometry: BaseGeometry) -> numpy.ndarray:
+        """
+        Evaluate a predicate between some regions and a geometry, as `predicate(region, geometry)`, e.g. to check the
+        candidates found by `query_indices` against an exact shape. Regions whose bounding boxes don't overlap the
+        geometry's are rejected without evaluating the predicate, as none of the predicates can hold for them.
+
+        :param predicate: The name of the predicate, e.g. "intersects". See `_PREDICATES`.
+        :param indices: The indices of the regions in the tree.
+        :param geometry: The geometry to test the regions against.
+        :return: A boolean mask over `indices`.
+        """
+        if predicate not in _PREDICATES:
+            raise ValueError(f"Unknown predicate {predicate!r}, expected one of {list(_PREDICATES)}")
+        indices = numpy.asarray(indices, dtype=numpy.intp)
+        result = self.bounds_overlap(indices, *geometry.bounds)
+        result[result] = _PREDICATES[predicate](self._geometry_array[indices[result]], geometry)
+        return result
+
+    def query_indices(self, min_x: float, min_y: float, max_x: float, max_y: float) -> numpy.ndarray:
+        """
+        Find the regions whose bounding boxes intersect an axis-aligned box.
+
+        :return: The indices of the regions in the tree.
+        """
+        return self._query_parts(shapely.box(min_x, min_y, max_x, max_y), (min_x, min_y, max_x, max_y))
+
+    def query(self, geometry: BaseGeometry, predicate: str | None = None) -> list[tuple[BaseGeometry, Region]]:
+        """
+        Find the regions near a geometry.
+
+        :param geometry: The geometry to query with.
+        :param predicate: If given, only return the regions for which `predicate(geometry, region)` holds, e.g.
+                          "intersects" (see `STRtree.query`.) Otherwise, return every region whose bounding box
+                          intersects the geometry's.
+        """
+        indices = self._query_parts(geometry, geometry.bounds, predicate)
+        return [(self._geometries[idx], self._regions[idx]) for idx in indices]
+
+    def query_bulk(self, geometries: numpy.ndarray | list[BaseGeometry]) -> BulkQueryResult:
+        """
+        Query the tree with many geometries at once, in a single traversal.
+
+        :param geometries: The query geometries, e.g. one probe per game object.
+        :return: The (query, region) pairs whose bounding boxes intersect.
+        """
+        geometries = numpy.asarray(geometries, dtype=object)
+        hits = numpy.empty((2, 0), dtype=numpy.intp)
+        for tree, offset in self._parts:
+            part_hits = tree.query(geometries)
+            if part_hits.size:
+                part_hits[1] += offset
+                hits = numpy.concatenate((hits, part_hits), axis=1) if hits.size else part_hits
+        return BulkQueryResult(
+            query_indices=hits[0],
+            region_indices=hits[1],
+            designations=self._designations[hits[1]],
+        )
+
+    def query_bulk_bounds(self, bounds: numpy.ndarray) -> BulkQueryResult:
+        """
+        Query the tree with many axis-aligned bounding boxes at once.
+
+        :param bounds: An (N, 4) array of (min_x, min_y, max_x, max_y) boxes.
+        :return: The (query, region) pairs whose bounding boxes intersect.
+        """
+        bounds = numpy.asarray(bounds, dtype=float).reshape(-1, 4)
+        return self.query_bulk(shapely.box(bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3]))
+
+    def _query_parts(
+        self, geometry: BaseGeometry, bounds: tuple[float, float, float, float], predicate: str | None = None
+    ) -> numpy.ndarray:
+        if len(self._parts) == 1:
+            return self._parts[0][0].query(geometry, predicate=predicate)
+
+        # There are only a few parts, and this is called for every probe: plain Python beats numpy here
+        min_x, min_y, max_x, max_y = bounds
+        overlapping = [
+            part
+            for part, (part_min_x, part_min_y, part_max_x, part_max_y) in enumerate(self._part_bounds)
+            if part_min_x <= max_x and part_max_x >= min_x and part_min_y <= max_y and part_max_y >= min_y
+        ]
+        if len(overlapping) == 1:
+            tree, offset = self._parts[overlapping[0]]
+            return tree.query(geometry, predicate=predicate) + offset
+        return numpy.concatenate(
+            [numpy.empty(0, dtype=numpy.intp)]
+            + [
+                self._parts[part][0].query(geometry, predicate=predicate) + self._parts[part][1]
+                for part in overlapping
+            ]
+        )
+
+
+def build_type_indexes(regions: list[Region]) -> dict[RegionType, SpatialTree]:
+    """
+    Build a spatial index over the regions of each RegionType.
+
+    :param regions: The regions to index.
+    """
+    return {
+        region_type: SpatialTree.from_regions([region for region in regions if region.designation == region_type])
+        for region_type in RegionType
+    }
+
+
+def _total_bounds(bounds: numpy.ndarray) -> list[tuple[float, float, float, float]]:
+    if not len(bounds):
+        return [(numpy.inf, numpy.inf, -numpy.inf, -numpy.inf)]
+    return [(*bounds[:, :2].min(axis=0).tolist(), *bounds[:, 2:].max(axis=0).tolist())]
+
+
+def _pad_vertices(vertices: numpy.ndarray, width: int) -> numpy.ndarray:
+    # Regions are padded by repeating their last vertex
+    missing = width - vertices.shape[1]
+    if not missing:
+        return vertices
+    return numpy.concatenate((vertices, numpy.repeat(vertices[:, -1:], missing, axis=1)), axis=1)
+
+
+def _pad_edge_normals(normals: numpy.ndarray, width: int) -> numpy.ndarray:
+    # The padding edges, between repeats of the last vertex, are degenerate; the last edge is still the closing one
+    missing = width - normals.shape[1]
+    if not missing:
+        return normals
+    return numpy.concatenate(
+        (normals[:, :-1], numpy.zeros((len(normals), missing, 2), dtype=normals.dtype), normals[:, -1:]), axis=1
+    )
+
+
+def _edge_normals(vertices: numpy.ndarray, closed: numpy.ndarray) -> numpy.ndarray:
+    edges = numpy.roll(vertices, -1, axis=1) - vertices
+    # Left normals, which point outwards for clockwise polygons
+    normals = numpy.stack((-edges[..., 1], edges[..., 0]), axis=-1)
+
+    # Flip the normals of counter-clockwise polygons (positive signed area)
+    area = (vertices[..., 0] * numpy.roll(vertices[..., 1], -1, axis=1)).sum(axis=1) - (
+        numpy.roll(vertices[..., 0], -1, axis=1) * vertices[..., 1]
+    ).sum(axis=1)
+    normals[closed & (area > 0)] *= -1
+    normals[~closed, -1] = 0
+
+    lengths = numpy.hypot(normals[..., 0], normals[..., 1])[..., None]
+    return numpy.divide(normals, lengths, out=numpy.zeros_like(normals), where=lengths > 0)
+
 
-    def query(self, geometry: BaseGeometry) -> list[tuple[BaseGeometry, Region]]:
-        return [(self._geometries[idx], self._regions[idx]) for idx in self._tree.query(geometry)]
+def _line_directions(vertices: numpy.ndarray, closed: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    chords = vertices[:, -1] - vertices[:, 0]
+    lengths = numpy.hypot(chords[:, 0], chords[:, 1])[:, None]
+    directions = numpy.divide(chords, lengths, out=numpy.zeros_like(chords), where=lengths > 0)
+    slopes = numpy.divide(chords[:, 1], chords[:, 0], out=numpy.full(len(chords), numpy.inf), where=chords[:, 0] != 0)
+    directions[closed] = numpy.nan
+    slopes[closed] = numpy.nan
+    return directions, slopes
@@ -0,0 +1,374 @@
+"""
+The walkable surfaces of a map's ground, as a graph of connected edges.
+
+Ground is made of many separate regions: the convex pieces of each tile's polygons, and the segments of its polylines.
+The top edges of those regions form continuous surfaces wherever the regions share vertices, so an actor standing on
+the ground can follow the surface from edge to edge by looking up the next edge in the graph, instead of searching
+the world for the ground below it every frame.
+
+Edges are only connected when their end points are exactly equal, so the regions' vertices should be welded first
+(see `weld_vertices`.)
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy
+import shapely
+from arcade.types import Point
+
+from luna.core.region import Region
+from luna.core.spatial_tree import SpatialTree
+
+# Vertices closer than this to each other are welded into one
+WELD_TOLERANCE = 0.01
+
+
+@dataclass
+class SurfaceEdge:
+    """
+    One straight, walkable section of a surface, going from left to right.
+
+    :var start: The left end of the edge.
+    :var end: The right end of the edge.
+    :var region: The region the edge is the top of.
+    :var previous: The index of the edge continuing the surface to the left, if any.
+    :var next: The index of the edge continuing the surface to the right, if any.
+    :var contested: Whether another region overlaps the edge, e.g. a step placed on top of a floor. The surface
+                    alone doesn't tell what is below an actor standing on a contested edge.
+    """
+
+    start: Point
+    end: Point
+    region: Region
+    previous: int | None = None
+    next: int | None = None
+    contested: bool = False
+
+    def height_at(self, x: float) -> float:
+        """
+        The height of the edge at an X co-ordinate within its span.
+        """
+        (x0, y0), (x1, y1) = self.start, self.end
+        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+
+class SurfaceGraph:
+    """
+    The walkable edges of a set of regions, connected into surfaces.
+
+    An edge is walkable if it faces up: the top edges of polygons (except where another polygon is stacked on top
+    of them), and every segment of a line string that isn't vertical.
+
+    :var edges: The walkable edges.
+    """
+
+    edges: list[SurfaceEdge]
+
+    _region_edges: dict[int, list[int]]
+    # The edges that end at points shared with regions outside the graph (see `from_regions`), and those points
+    _border_edges: list[int]
+    _border_points: set[Point]
+
+    def __init__(
+        self, edges: list[SurfaceEdge], border_edges: list[int] | None = None, border_points: set[Point] | None = None
+    ) -> None:
+        self.edges = edges
+        self._region_edges = {}
+        for index, edge in enumerate(edges):
+            self._region_edges.setdefault(id(edge.region), []).append(index)
+        self._border_edges = border_edges or []
+        self._border_points = border_points or set()
+
+    @classmethod
+    def from_regions(cls, regions: list[Region], context: list[Region] | None = None) -> "SurfaceGraph":
+        """
+        Find the walkable edges of regions, and connect the edges that share end points.
+
+        :param regions: The regions, e.g. all the ground in a map.
+        :param context: Regions around them whose own edges aren't part of the graph, but which can still be stacked
+                        on or overlap the regions' edges, e.g. the ground of the neighbouring chunks of a streamed map.
+                        The edges that end where context regions have vertices are connected again when the graph is
+                        combined with the context's graph (see `combine`.)
+        """
+        context = context or []
+        edges = _walkable_edges(regions, context)
+        _link(edges, range(len(edges)))
+        _mark_contested(edges, regions + context)
+
+        context_points = {point for region in context for point in region.region_points}
+        border_edges = [
+            index for index, edge in enumerate(edges) if edge.start in context_points or edge.end in context_points
+        ]
+        border_points = {
+            point
+            for index in border_edges
+            for point in (edges[index].start, edges[index].end)
+            if point in context_points
+        }
+        return cls(edges, border_edges, border_points)
+
+    @classmethod
+    def combine(cls, graphs: list["SurfaceGraph"]) -> "SurfaceGraph":
+        """
+        Combine graphs into one, connecting the surfaces that continue from one graph into another, e.g. across the
+        borders of a streamed map's chunks. To be the same as the graph of all their regions, each graph should be
+        built with the regions around it as context (see `from_regions`.)
+
+        :param graphs: The graphs. Their edges are copied, so the graphs themselves are unchanged.
+        """
+        edges: list[SurfaceEdge] = []
+        border_edges: list[int] = []
+        border_points: set[Point] = set()
+        for graph in graphs:
+            offset = len(edges)
+            edges.extend(
+                SurfaceEdge(
+                    edge.start,
+                    edge.end,
+                    edge.region,
+                    None if edge.previous is None else edge.previous + offset,
+                    None if edge.next is None else edge.next + offset,
+                    edge.contested,
+                )
+                for edge in graph.edges
+            )
+            border_edges.extend(index + offset for index in graph._border_edges)
+            border_points.update(graph._border_points)
+
+        # Within each graph, the edges are already connected. Only the connections at the borders can change, where
+        # the surfaces can now continue into (or fork into) another graph's edges.
+        _link(edges, border_edges, border_points)
+        return cls(edges, border_edges, border_points)
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def edges_of(self, region: Region) -> list[int]:
+        """
+        The indices of the walkable edges of a region.
+        """
+        return self._region_edges.get(id(region), [])
+
+    def edge_under(self, region: Region, left: float, right: float) -> int | None:
+        """
+        Find the walkable edge of a region that is highest within a horizontal span.
+
+        :param region: The region.
+        :param left: The left end of the span.
+        :param right: The right end of the span.
+        :return: The index of the edge, or None if none of the region's walkable edges are within the span.
+        """
+        best = None
+        best_height = -math.inf
+        for index in self.edges_of(region):
+            height = _highest_within(self.edges[index], left, right)
+            if height is not None and height > best_height:
+                best, best_height = index, height
+        return best
+
+    def follow(self, edge: int, x: float) -> int | None:
+        """
+        Follow a surface from an edge to the edge that spans an X co-ordinate.
+
+        :param edge: The index of the edge to start from.
+        :param x: The X co-ordinate to find.
+        :return: The index of the edge spanning `x`, or None if the surface ends before reaching it.
+        """
+        edges = self.edges
+        current: int | None = edge
+        while current is not None and x < edges[current].start[0]:
+            current = edges[current].previous
+        while current is not None and x > edges[current].end[0]:
+            current = edges[current].next
+        return current
+
+    def surface_height(self, edge: int, left: float, right: float) -> float | None:
+        """
+        The height of the highest point of the surface within a horizontal span, following the surface both ways
+        from an edge within the span.
+
+        :param edge: The index of an edge within the span.
+        :param left: The left end of the span.
+        :param right: The right end of the span.
+        :return: The height, or None if the surface doesn't cover the whole span, or if any edge within the span is
+                 contested.
+        """
+        edges = self.edges
+        height = -math.inf
+        current: int | None = edge
+        while True:
+            current_edge = edges[current]
+            if current_edge.contested:
+                return None
+            height = max(height, _highest_within(current_edge, left, right))
+            if current_edge.start[0] <= left:
+                break
+            current = current_edge.previous
+            if current is None:
+                return None
+        current = edges[edge].next
+        if edges[edge].end[0] < right:
+            while True:
+                if current is None:
+                    return None
+                current_edge = edges[current]
+                if current_edge.contested:
+                    return None
+                height = max(height, _highest_within(current_edge, left, right))
+                if current_edge.end[0] >= right:
+                    break
+                current = current_edge.next
+        return height
+
+
+def weld_vertices(regions: list[Region], tolerance: float = WELD_TOLERANCE) -> int:
+    """
+    Snap vertices of regions that are within `tolerance` of each other to exactly the same point, so that regions
+    built separately (e.g. from neighbouring tiles) share their vertices exactly. Replaces the regions' points.
+
+    :param regions: The regions to weld.
+    :param tolerance: The distance within which vertices are welded.
+    :return: How many vertices were moved.
+    """
+    welded: dict[tuple[int, int], list[Point]] = {}
+    moved = 0
+    for region in regions:
+        points = []
+        for x, y in numpy.asarray(region.region_points, dtype=float).tolist():
+            cell_x, cell_y = round(x / tolerance), round(y / tolerance)
+            match = None
+            for neighbour in ((cell_x + dx, cell_y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)):
+                for candidate in welded.get(neighbour, []):
+                    if abs(candidate[0] - x) <= tolerance and abs(candidate[1] - y) <= tolerance:
+                        match = candidate
+                        break
+                if match:
+                    break
+            if match is None:
+                match = (x, y)
+                welded.setdefault((cell_x, cell_y), []).append(match)
+            elif match != (x, y):
+                moved += 1
+            points.append(match)
+        region.region_points = points
+    return moved
+
+
+def _link(edges: list[SurfaceEdge], indices: Iterable[int], points: set[Point] | None = None) -> None:
+    """
+    Connect edges that share end points, replacing their connections.
+
+    :param edges: All the edges.
+    :param indices: The indices of the edges to connect.
+    :param points: Only connect the edges at these points, keeping their connections at their other end points.
+                   Defaults to all points.
+    """
+    indices = list(indices)
+    starting_at: dict[Point, list[int]] = {}
+    for index in indices:
+        edge = edges[index]
+        if points is None or edge.start in points:
+            edge.previous = None
+            starting_at.setdefault(edge.start, []).append(index)
+    for index in indices:
+        edge = edges[index]
+        if points is None or edge.end in points:
+            following = starting_at.get(edge.end)
+            edge.next = None
+            if following:
+                # Where surfaces fork, the upper one is the one an actor stands on
+                edge.next = max(following, key=lambda candidate: _direction(edges[candidate]))
+                edges[edge.next].previous = index
+
+
+def _direction(edge: SurfaceEdge) -> float:
+    return math.atan2(edge.end[1] - edge.start[1], edge.end[0] - edge.start[0])
+
+
+def _highest_within(edge: SurfaceEdge, left: float, right: float) -> float | None:
+    """
+    The height of the highest point of an edge within a horizontal span, or None if the edge is outside it.
+    """
+    start_x, end_x = edge.start[0], edge.end[0]
+    if end_x < left or start_x > right:
+        return None
+    return max(edge.height_at(max(start_x, left)), edge.height_at(min(end_x, right)))
+
+
+def _walkable_edges(regions: list[Region], context: list[Region]) -> list[SurfaceEdge]:
+    polygon_tops = []
+    polygon_bottoms = set()
+    line_edges = []
+    for region in regions:
+        if region.geometry_type == "polygon":
+            tops, bottoms = _polygon_edges(region)
+            polygon_tops.extend((start, end, region) for start, end in tops)
+            polygon_bottoms.update(bottoms)
+        else:
+            points = [tuple(point) for point in numpy.asarray(region.region_points, dtype=float).tolist()]
+            for start, end in zip(points[:-1], points[1:]):
+                if start[0] != end[0]:
+                    start, end = sorted((start, end))
+                    line_edges.append((start, end, region))
+    for region in context:
+        if region.geometry_type == "polygon":
+            polygon_bottoms.update(_polygon_edges(region)[1])
+
+    # The top of a polygon that another polygon is on top of is inside the ground, not on top of it
+    return [
+        SurfaceEdge(start=start, end=end, region=region)
+        for start, end, region in polygon_tops
+        if (start, end) not in polygon_bottoms
+    ] + [SurfaceEdge(start=start, end=end, region=region) for start, end, region in line_edges]
+
+
+def _polygon_edges(region: Region) -> tuple[list[tuple[Point, Point]], list[tuple[Point, Point]]]:
+    """
+    The top and bottom edges of a polygon region, each going from left to right. Vertical edges are neither.
+    """
+    points = [tuple(point) for point in numpy.asarray(region.region_points, dtype=float).tolist()]
+    if _signed_area(points) < 0:
+        points.reverse()
+    tops = []
+    bottoms = []
+    # Going counter-clockwise, the top edges go from right to left and the bottom edges from left to right
+    for start, end in zip([points[-1], *points[:-1]], points):
+        if end[0] < start[0]:
+            tops.append((end, start))
+        elif start[0] < end[0]:
+            bottoms.append((start, end))
+    return tops, bottoms
+
+
+def _signed_area(points: list[Point]) -> float:
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, [*points[1:], points[0]])) / 2
+
+
+def _mark_contested(edges: list[SurfaceEdge], regions: list[Region]) -> None:
+    """
+    Mark the edges that another region overlaps anywhere but at the edge's end points.
+    """
+    if not edges or not regions:
+        return
+
+    tree = SpatialTree.from_regions(regions)
+    lines = shapely.linestrings([[edge.start, edge.end] for edge in edges])
+    hits = tree.query_bulk(lines)
+    others = numpy.array(
+        [
+            tree.regions[region] is not edges[edge].region
+            for edge, region in zip(hits.query_indices.tolist(), hits.region_indices.tolist())
+        ],
+        dtype=bool,
+    )
+    edge_indices = hits.query_indices[others]
+    region_geometries = numpy.array(tree.geometries, dtype=object)[hits.region_indices[others]]
+    end_points = shapely.multipoints([[edge.start, edge.end] for edge in edges])
+
+    overlaps = shapely.difference(
+        shapely.intersection(lines[edge_indices], region_geometries), end_points[edge_indices]
+    )
+    for edge in edge_indices[~shapely.is_empty(overlaps)].tolist():
+        edges[edge].contested = True
@@ -0,0 +1,15 @@
+import enum
+
+
+class TileLayer(enum.Enum):
+    """
+    The render layer a map tile is drawn in. Layers are drawn in the order they are declared.
+
+    :var BACKGROUND: Drawn first, behind the level geometry and game objects.
+    :var MIDDLE: Drawn behind the game objects. This is the default layer for tiles.
+    :var FOREGROUND: Drawn last, in front of the game objects.
+    """
+
+    BACKGROUND = 0
+    MIDDLE = 1
+    FOREGROUND = 2
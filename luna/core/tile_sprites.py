@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+from arcade import SpriteList, TextureAtlas
+
+from luna.core.map_chunk import Bounds, chunk_coordinate
+from luna.core.map_tile import MapTile
+from luna.core.tile_layer import TileLayer
+
+# Default width and height of the map cell covered by one tile page
+DEFAULT_PAGE_SIZE = 1024
+
+
+@dataclass
+class TilePage:
+    """
+    The tiles of one render layer in one square cell of the map, batched into a single SpriteList.
+    Pages are the unit of culling: a page is drawn (in one draw call) if any part of it is on screen.
+
+    :var layer: The render layer of the page's tiles.
+    :var cell: The (column, row) of the cell the page covers. A tile belongs to the cell its center falls in.
+    :var bounds: The world-space bounds of the page's tiles, which may stick out of the cell.
+    :var sprite_list: The page's tiles, in map order.
+    """
+
+    layer: TileLayer
+    cell: tuple[int, int]
+    bounds: Bounds
+    sprite_list: SpriteList
+
+    def __len__(self) -> int:
+        return len(self.sprite_list)
+
+
+def build_tile_pages(
+    tiles: Iterable[MapTile], page_size: float = DEFAULT_PAGE_SIZE, atlas: TextureAtlas | None = None
+) -> list[TilePage]:
+    """
+    Batch map tiles into static pages, one per render layer and map cell, so that each visible part of a layer is
+    drawn in a single draw call instead of one draw per tile.
+
+    The sprite lists are lazy: nothing is uploaded to the GPU until they are first drawn, so they can be built
+    without a window (e.g. on a loading thread, or in tests.)
+
+    Within a layer, pages are drawn one after the other, so overlapping tiles from different pages are drawn in page
+    order rather than map order.
+
+    :param tiles: The tiles to batch.
+    :param page_size: The width and height of the map cell covered by a page.
+    :param atlas: The texture atlas the pages share. Defaults to the window's default atlas.
+    :return: The pages, sorted by layer (in draw order) and then by cell.
+    """
+    pages: dict[tuple[TileLayer, tuple[int, int]], TilePage] = {}
+    for tile in tiles:
+        cell = chunk_coordinate(tile.position[0], tile.position[1], page_size)
+        bounds = tile.bounds
+        page = pages.get((tile.layer, cell))
+        if page is None:
+            page = pages[tile.layer, cell] = TilePage(
+                layer=tile.layer, cell=cell, bounds=bounds, sprite_list=SpriteList(lazy=True, atlas=atlas)
+            )
+        else:
+            page.bounds = (
+                min(page.bounds[0], bounds[0]),
+                min(page.bounds[1], bounds[1]),
+                max(page.bounds[2], bounds[2]),
+                max(page.bounds[3], bounds[3]),
+            )
+        page.sprite_list.append(tile.to_sprite())
+
+    return [pages[key] for key in sorted(pages, key=lambda key: (key[0].value, key[1]))]
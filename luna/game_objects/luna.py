@@ -1,41 +1,28 @@
-from dataclasses import dataclass
-
 import arcade
 import pyglet
-import shapely
 from arcade.experimental.input import ActionState
 from pyglet.math import Vec2
-from shapely import LineString, Point, Polygon
-import shapely.ops
-from shapely.geometry.base import BaseGeometry
+from shapely import Polygon
 
+from luna.collision.probes import ProbeResult, cast_down, cast_horizontal
 from luna.core.game_object import GameObject
 from luna.core.input_action import InputAction
-from luna.core.region import Region
+from luna.core.object_phase import ObjectPhase
 from luna.core.region_type import RegionType
+from luna.core.surface_graph import SurfaceGraph
 from luna.entities.character import Character
 from luna.managers.state_manager import StateManager
+from luna.physics.body_store import BodyStore
 from luna.utils.logging import LOGGER
 
 
-@dataclass
-class EffectiveGround:
-    region: Region
-    line: LineString
-    distance_down: float
-
-
-@dataclass
-class EffectiveWall:
-    region: Region
-    line: LineString
-    distance: float
-
-
 class Luna(GameObject):
     """
     Luna in the game world.
 
+    Luna's movement is simulated by the body store of the map she is in (see `BodyStore`); she only keeps a handle to
+    her body, and resolves its collisions with the level.
+
     :var character: The associated character data for Luna.
     :var state_manager: The state manager for the game.
     """
@@ -43,6 +30,8 @@ class Luna(GameObject):
     character: Character
     state_manager: StateManager
 
+    phases = ObjectPhase.UPDATE | ObjectPhase.DRAW | ObjectPhase.INPUT | ObjectPhase.PHYSICS
+
     _ACCELERATION = 5000
     _MAX_SPEED = 600
     _TERMINAL_VELOCITY = -5000
@@ -50,199 +39,231 @@ class Luna(GameObject):
     _bounding_box_width: float = 50
     _bounding_box_height: float = 160
 
-    _inertia: Vec2 = Vec2(0, 500)
-    _horizontal_input: float = 0
+    _INITIAL_INERTIA = (0, 500)
     _jump_strength: float = 800
 
-    _on_ground: bool = False
-    _effective_ground: EffectiveGround | None = None
-    _delta_inertia = Vec2(0, 0)
-    _previous_position = Vec2(0, 0)
+    # How far above her feet, and how far below them, Luna looks for ground
+    _GROUND_PROBE_HEIGHT = 80
+    _GROUND_PROBE_DEPTH = 920
+
+    # Ground whose top is within this distance of the surface Luna follows counts as part of it
+    _SURFACE_MARGIN = 0.01
+
+    # How far inside her bounding box Luna starts looking for walls, and how far out she looks
+    _WALL_PROBE_INSET = 80
+    _WALL_PROBE_DEPTH = 240
+
+    _bodies: BodyStore
+    _body: int
+
+    # Probe results, reused every frame
+    _ground: ProbeResult
+    _wall: ProbeResult
 
-    _debug_draws = []
+    # The edge of the ground surface Luna is standing on (see `SurfaceGraph`), if she's following one, and the graph
+    # it belongs to (see `Map.surface_graph_of`.)
+    _surface_edge: int | None = None
+    _surface_graph: SurfaceGraph | None = None
 
     def __init__(self, state_manager: StateManager) -> None:
         super().__init__()
         self.name = "Luna"
         self.character = state_manager.character
         self.state_manager = state_manager
+        self._bodies = state_manager.current_map.bodies
+        self._body = self._bodies.create(
+            position=(0, 0),
+            size=(self._bounding_box_width, self._bounding_box_height),
+            velocity=self._INITIAL_INERTIA,
+            max_speed=self._MAX_SPEED,
+            terminal_velocity=self._TERMINAL_VELOCITY,
+            acceleration=self._ACCELERATION,
+        )
+        self._ground = ProbeResult()
+        self._wall = ProbeResult()
+
+    @property
+    def position(self) -> Vec2:
+        x, y = self._bodies.position[self._body].tolist()
+        return Vec2(x, y)
+
+    @position.setter
+    def position(self, position: Vec2) -> None:
+        self._bodies.position[self._body] = position
+
+    @property
+    def gravity(self) -> float:
+        return float(self._bodies.gravity[self._body])
+
+    @gravity.setter
+    def gravity(self, gravity: float) -> None:
+        self._bodies.gravity[self._body] = gravity
+
+    @property
+    def on_ground(self) -> bool:
+        return bool(self._bodies.on_ground[self._body])
+
+    def on_despawn(self) -> None:
+        super().on_despawn()
+        self._bodies.remove(self._body)
+
+    @property
+    def settled(self) -> bool:
+        return self.on_ground
+
+    def set_step_scale(self, step_scale: int) -> None:
+        self._bodies.step_scale[self._body] = step_scale
 
     def update(self, delta_time: float) -> None:
+        """
+        Resolve Luna's collisions with the level. Her body is moved before this, and settled onto the ground after
+        it, by the body store (see `GameObjectManager.step`.)
+        """
         super().update(delta_time)
-        self._debug_draws.clear()
-        self.update_position(delta_time)
+        self.resolve_collisions()
 
     def on_action(self, action: InputAction, state: ActionState) -> None:
         LOGGER.debug(f"Got action {action} with state {state} for Luna")
+        bodies = self._bodies
+        body = self._body
         if action == InputAction.JUMP and state == ActionState.PRESSED:
-            if self._on_ground:
-                self._inertia += Vec2(0, self._jump_strength)
-                self._on_ground = False
+            if bodies.on_ground[body]:
+                bodies.velocity[body, 1] += self._jump_strength
+                bodies.on_ground[body] = False
         elif action == InputAction.LEFT:
             if state == ActionState.PRESSED:
-                self._horizontal_input = -1
+                bodies.horizontal_input[body] = -1
             elif state == ActionState.RELEASED:
-                self._horizontal_input = max(self._horizontal_input, 0)
+                bodies.horizontal_input[body] = max(bodies.horizontal_input[body], 0)
         elif action == InputAction.RIGHT:
             if state == ActionState.PRESSED:
-                self._horizontal_input = 1
+                bodies.horizontal_input[body] = 1
             elif state == ActionState.RELEASED:
-                self._horizontal_input = min(self._horizontal_input, 0)
+                bodies.horizontal_input[body] = min(bodies.horizontal_input[body], 0)
 
     def draw(self) -> None:
-
-        for dd in self._debug_draws:
-            dd()
-
+        if self._ground.hit:
+            distance_down = self._ground.distance - self._GROUND_PROBE_HEIGHT
+            shadow_alpha = min(255, max(0, int(180 - distance_down * 1)))
+            arcade.draw_ellipse_filled(
+                self.render_position[0],
+                self.render_position[1] - distance_down,
+                self._bounding_box_width * (1 + max(0.0, distance_down * 0.005)),
+                10,
+                arcade.color.Color(0, 0, 0, shadow_alpha),
+            )
 
         state_color = arcade.color.BLUE
-        if not self._on_ground:
+        if not self.on_ground:
             state_color = arcade.color.YELLOW
         arcade.draw_lrbt_rectangle_filled(
-            self.position[0] - self._bounding_box_width // 2,
-            self.position[0] + self._bounding_box_width // 2,
-            self.position[1],
-            self.position[1] + self._bounding_box_height,
+            self.render_position[0] - self._bounding_box_width // 2,
+            self.render_position[0] + self._bounding_box_width // 2,
+            self.render_position[1],
+            self.render_position[1] + self._bounding_box_height,
             state_color,
         )
 
-    def update_position(self, delta_time: float) -> None:
-        self._previous_position = self.position
-
-        # add gravity
-        if not self._on_ground:
-            self._inertia = self._inertia + Vec2(0, self.gravity * delta_time)
-
-        # cap speed
-        if self._inertia.x < -self._MAX_SPEED:
-            self._inertia = Vec2(-self._MAX_SPEED, self._inertia.y)
-        elif self._inertia.x > self._MAX_SPEED:
-            self._inertia = Vec2(self._MAX_SPEED, self._inertia.y)
-        if self._inertia.y < self._TERMINAL_VELOCITY:
-            self._inertia = Vec2(self._inertia.x, self._TERMINAL_VELOCITY)
-
-        self._delta_inertia = self._inertia * delta_time
-        self.position += self._inertia * delta_time
-
+    def resolve_collisions(self) -> None:
+        """
+        Push Luna out of walls, and report the ground below her to her body.
+        """
         # Collisions with walls
         self.resolve_wall_collisions()
 
-        # find the nearest ground beneath us
-        self._effective_ground = self.find_ground_below()
-        if self._effective_ground:
-            shadow_alpha = min(255, max(0, int(180 - self._effective_ground.distance_down * 1)))
-            self._debug_draws.append(
-                lambda: arcade.draw_ellipse_filled(
-                    self.position[0],
-                    self.position[1] - self._effective_ground.distance_down,
-                    self._bounding_box_width * (1 + max(0.0, self._effective_ground.distance_down * 0.005)),
-                    10,
-                    arcade.color.Color(0, 0, 0, shadow_alpha),
-                )
-            )
-            # See if we are falling into this ground, not just finding ourselves under it
-            amount_moved = abs(self.position - self._previous_position)
-            if self._inertia.y < 0 and -amount_moved <= self._effective_ground.distance_down <= 0:
-                self._on_ground = True
-                self._inertia = Vec2(self._inertia.x, 0)
-
-        if not self._effective_ground or self._effective_ground.distance_down > 20:
-            self._on_ground = False
-
-        if self._on_ground and self._effective_ground:
-            movement_friction = self._effective_ground.region.friction
-            # snap to ground.
-            self.position = self.position - Vec2(0, self._effective_ground.distance_down)
-        else:
-            movement_friction = 0.25
-
-        # add input inertia
-        self._inertia = self._inertia + Vec2(self._horizontal_input * movement_friction * self._ACCELERATION * delta_time, 0)
-
-        # slow down if not giving input
-        if not self._horizontal_input:
-            # decelerate due to friction
-            deceleration_amount = movement_friction * self._ACCELERATION * delta_time
-            if self._on_ground:
-                # apply against ground direction
-                if deceleration_amount > abs(self._inertia):
-                    self._inertia = Vec2(0, 0)
-                else:
-                    self._inertia = self._inertia - self._inertia.normalize() * deceleration_amount
-            else:
-                # only apply to horizontal
-                if deceleration_amount > abs(self._inertia.x):
-                    self._inertia = Vec2(0, self._inertia.y)
-                else:
-                    if self._inertia.x > 0:
-                        self._inertia = Vec2(self._inertia.x - deceleration_amount, self._inertia.y)
-                    else:
-                        self._inertia = Vec2(self._inertia.x + deceleration_amount, self._inertia.y)
-
-    def find_ground_below(self) -> EffectiveGround | None:
-        ground_check_polygon_y_offset = 80
-        left_point = Point(self.position[0] - self._bounding_box_width // 2, self.position[1] + ground_check_polygon_y_offset)
-        right_point = Point(self.position[0] + self._bounding_box_width // 2, self.position[1] + ground_check_polygon_y_offset)
-
-        ground_check_poly = Polygon([
-            (left_point.x, left_point.y),
-            (right_point.x, right_point.y),
-            (right_point.x, right_point.y - 1000),
-            (left_point.x, left_point.y - 1000),
-        ])
+        # While on the ground, follow its surface; otherwise find the nearest ground beneath us
+        ground = self.follow_ground_surface() if self.on_ground else None
+        if ground is None:
+            ground = self.find_ground_below()
+            self._surface_edge = None
+            if ground:
+                x = float(self._bodies.position[self._body, 0])
+                half_width = self._bounding_box_width / 2
+                self._surface_graph = self.state_manager.current_map.surface_graph_of(ground.region)
+                if self._surface_graph is not None:
+                    self._surface_edge = self._surface_graph.edge_under(ground.region, x - half_width, x + half_width)
+        if ground:
+            self._bodies.set_ground(self._body, ground.distance - self._GROUND_PROBE_HEIGHT, ground.region.friction)
+
+    def follow_ground_surface(self) -> ProbeResult | None:
+        """
+        Find the ground below Luna by following the surface she was standing on, which is much cheaper than searching
+        for it with `find_ground_below`. Only works while the surface is connected all the way under her, and no other
+        ground may be between it and the top of the ground probe.
+
+        :return: The ground, as `find_ground_below` would find it, or None if it can't be found by following the
+                 surface. The result is reused by the next call.
+        """
+        graph = self._surface_graph
+        if self._surface_edge is None:
+            return None
+        # The graph is replaced when the map's regions change, or gone when a streamed chunk is unloaded
+        if self.state_manager.current_map.surface_graph_of(graph.edges[self._surface_edge].region) is not graph:
+            return None
+        x, y = self._bodies.position[self._body].tolist()
+        edge = graph.follow(self._surface_edge, x)
+        if edge is None:
+            return None
 
-        # Find the nearest ground
-        nearest_ground: BaseGeometry | None = None
-        nearest_distance = float("inf")
-        dd = None
-        for geom, region in self.state_manager.current_map.spatial_tree.query(ground_check_poly):
-            if region.designation == RegionType.GROUND:
-                intersection = ground_check_poly.intersection(geom)
-                if intersection:
-                    luna_collision_base = LineString([left_point, right_point])
-                    distance = shapely.distance(luna_collision_base, intersection)
-
-                    if distance < nearest_distance:
-                        nearest_distance = distance
-                        nearest_ground = geom
-        if dd:
-            self._debug_draws.append(dd)
-
-        if nearest_ground:
-            return EffectiveGround(region=region, line=nearest_ground, distance_down=nearest_distance - ground_check_polygon_y_offset)
-        else:
+        half_width = self._bounding_box_width / 2
+        height = graph.surface_height(edge, x - half_width, x + half_width)
+        distance = y + self._GROUND_PROBE_HEIGHT - height if height is not None else -1
+        if not 0 <= distance <= self._GROUND_PROBE_HEIGHT + self._GROUND_PROBE_DEPTH:
             return None
 
+        # The surface only knows the ground connected to it. Any other ground within the band above it, up to the top
+        # of the probe, would have been found by `find_ground_below`: if there may be some, probe for it instead
+        region = graph.edges[edge].region
+        ground_index = self.state_manager.current_map.spatial_index(RegionType.GROUND)
+        nearby = ground_index.query_indices(
+            x - half_width, height + self._SURFACE_MARGIN, x + half_width, y + self._GROUND_PROBE_HEIGHT
+        )
+        if any(ground_index.regions[index] is not region for index in nearby.tolist()):
+            return None
+
+        self._surface_edge = edge
+        self._ground.hit = True
+        self._ground.distance = distance
+        self._ground.region = graph.edges[edge].region
+        return self._ground
+
+    def find_ground_below(self) -> ProbeResult | None:
+        """
+        Find the nearest ground below Luna's feet (or slightly above them, if she sank into it.)
+
+        :return: The probe result, whose distance is measured from `_GROUND_PROBE_HEIGHT` above her feet, or None if
+                 there is no ground below her. The result is reused by the next call.
+        """
+        x, y = self._bodies.position[self._body].tolist()
+        ground_index = self.state_manager.current_map.spatial_index(RegionType.GROUND)
+        cast_down(
+            ground_index,
+            x,
+            y + self._GROUND_PROBE_HEIGHT,
+            self._bounding_box_width,
+            self._GROUND_PROBE_HEIGHT + self._GROUND_PROBE_DEPTH,
+            self._ground,
+        )
+        return self._ground if self._ground.hit else None
+
     def resolve_wall_collisions(self) -> None:
         # check left and right
         #self.resolve_wall_collisions_direction(-1)
         self.resolve_wall_collisions_direction(1)
 
     def resolve_wall_collisions_direction(self, direction: int) -> None:
-        x_offset = 80
-        x_edge = self.position[0] + direction * self._bounding_box_width // 2 - direction * x_offset
-
-        bottom_edge = self.position[1]
-        top_edge = self.position[1] + self._bounding_box_height
-
-        wall_check_poly = Polygon([
-            (x_edge, bottom_edge),
-            (x_edge, top_edge),
-            (x_edge + direction * x_offset * 3, top_edge),
-            (x_edge + direction * x_offset * 3, bottom_edge),
-        ])
-
-        for geom, region in self.state_manager.current_map.spatial_tree.query(wall_check_poly):
-            if region.designation == RegionType.WALL:
-                intersection = wall_check_poly.intersection(geom)
-                if intersection:
-                    poly_far_edge = LineString([(x_edge, bottom_edge), (x_edge, top_edge)])
-                    a, b = shapely.ops.nearest_points(poly_far_edge, intersection)
-                    horizontal_distance = abs(b.x - a.x)
-                    true_horizontal_distance = horizontal_distance - x_offset
-                    if -x_offset / 2 <= true_horizontal_distance <= 0:
-                        self._inertia = Vec2(0, self._inertia.y)
-                        self.position = self.position + Vec2(true_horizontal_distance * direction, 0)
+        x, y = self._bodies.position[self._body].tolist()
+        x_offset = self._WALL_PROBE_INSET
+        x_edge = x + direction * self._bounding_box_width // 2 - direction * x_offset
+
+        wall_index = self.state_manager.current_map.spatial_index(RegionType.WALL)
+        if cast_horizontal(
+            wall_index, x_edge, y, self._bounding_box_height, direction, self._WALL_PROBE_DEPTH, self._wall
+        ):
+            true_horizontal_distance = self._wall.distance - x_offset
+            if -x_offset / 2 <= true_horizontal_distance <= 0:
+                self._bodies.velocity[self._body, 0] = 0
+                self._bodies.position[self._body, 0] += true_horizontal_distance * direction
 
     def compute_hitbox(self) -> Polygon:
         hitbox = Polygon([
@@ -1,7 +1,11 @@
 from luna.core.game_object import GameObject
+from luna.core.object_phase import ObjectPhase
 
 
 class SpawnPoint(GameObject):
+    # Only marks a position in the map
+    phases = ObjectPhase.NONE
+
     def __init__(self) -> None:
         super().__init__()
         self.name = "Spawn Point"
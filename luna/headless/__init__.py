@@ -0,0 +1,35 @@
+"""
+Running the game's simulation without a window, GPU or input devices. See `luna.headless.runner` for the runner, and
+run it from the repository root with:
+
+    python -m luna.headless --map luna/data/maps/test_map.tmj --actors 50 --ticks 2400
+
+arcade and pyglet decide whether they need a display when they are imported, so `configure_headless` has to be called
+before anything imports them. Importing this package doesn't configure anything by itself.
+"""
+
+import os
+import sys
+
+
+def configure_headless() -> bool:
+    """
+    Configure arcade and pyglet to run without a display. Sets the `ARCADE_HEADLESS` environment variable (which
+    processes started afterwards inherit) and pyglet's headless option.
+
+    :return: Whether they were configured. False if arcade was already imported, in which case it is left as it is.
+    """
+    if "arcade" in sys.modules:
+        return False
+
+    os.environ.setdefault("ARCADE_HEADLESS", "1")
+    import pyglet
+
+    pyglet.options["headless"] = True
+    if sys.platform.startswith("linux"):
+        # pyglet's Linux input module refers to the Xlib window module, which isn't imported in headless mode
+        try:
+            import pyglet.window.xlib  # noqa: F401
+        except ImportError:
+            pass
+    return True
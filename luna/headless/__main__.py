@@ -0,0 +1,9 @@
+import sys
+
+from luna.headless import configure_headless
+
+configure_headless()
+
+from luna.headless.runner import main  # noqa: E402
+
+sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Headless simulation runner, for measuring how many actors a map can simulate without a window, GPU or input devices.
+
+Run from the repository root, which configures arcade to run headless first (see `luna.headless`):
+
+    python -m luna.headless --map luna/data/maps/test_map.tmj --actors 50 --ticks 2400
+
+Loads the map, spawns the requested number of Luna actors next to the spawn point, feeds each of them a scripted
+stream of input actions and runs the simulation in fixed steps, as fast as possible. Reports the simulation speed
+(ticks per second), the p50 and p99 latency of a tick, and how much memory was allocated while running.
+
+With `--profile trace.json`, the run is also profiled (see `luna.utils.profiler`): every tick is a profiler frame, the
+slowest scopes are reported, and all the scopes are written to a Chrome trace.
+"""
+
+import argparse
+import gc
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+from arcade.experimental.input import ActionState
+from pyglet.math import Vec2
+from rich.console import Console
+from rich.table import Table
+
+from luna.core.game_object import SpawnParameters
+from luna.core.input_action import InputAction
+from luna.core.input_log import InputEvent
+from luna.entities.character import Character
+from luna.game_objects.luna import Luna
+from luna.managers.game_object_manager import FIXED_TIMESTEP, GameObjectManager
+from luna.managers.state_manager import StateManager
+from luna.utils.map_loader import MapLoader
+from luna.utils.profiler import PROFILER, ScopeStats
+
+DEFAULT_MAP = "luna/data/maps/test_map.tmj"
+
+# Horizontal distance between the actors spawned next to the spawn point
+ACTOR_SPACING = 60
+
+# Length of one cycle of the scripted input, in ticks
+SCRIPT_PERIOD = 240
+
+
+@dataclass
+class HeadlessReport:
+    """
+    Results of a headless simulation run.
+
+    :var actors: The number of actors simulated.
+    :var ticks: The number of simulation steps run.
+    :var elapsed: The total time spent running simulation steps, in seconds.
+    :var ticks_per_second: How many simulation steps were run per second of real time.
+    :var p50_us: The median time of a simulation step, in microseconds.
+    :var p99_us: The 99th percentile time of a simulation step, in microseconds.
+    :var allocated_blocks: How many more memory blocks were allocated after the run than before it.
+    :var gc_collections: How many garbage collections ran during the run.
+    :var traced_peak_bytes: The peak memory allocated during the run, if allocations were traced.
+    :var scopes: The timing statistics of the profiler scopes, per tick, if the run was profiled.
+    """
+
+    actors: int
+    ticks: int
+    elapsed: float
+    ticks_per_second: float
+    p50_us: float
+    p99_us: float
+    allocated_blocks: int
+    gc_collections: int
+    traced_peak_bytes: int | None = None
+    scopes: list[ScopeStats] | None = None
+
+
+def scripted_input(ticks: int, actor_index: int) -> list[InputEvent]:
+    """
+    A repeating input script that exercises running, turning and jumping: run right, jump, stop, run left, jump, stop.
+    Each actor's script is offset by a few ticks, so they don't all do the same thing at once.
+
+    :param ticks: The number of ticks to script.
+    :param actor_index: Which actor the script is for.
+    :return: The input events, in tick order.
+    """
+    pattern = [
+        (0, InputAction.RIGHT, ActionState.PRESSED),
+        (40, InputAction.JUMP, ActionState.PRESSED),
+        (41, InputAction.JUMP, ActionState.RELEASED),
+        (100, InputAction.RIGHT, ActionState.RELEASED),
+        (120, InputAction.LEFT, ActionState.PRESSED),
+        (160, InputAction.JUMP, ActionState.PRESSED),
+        (161, InputAction.JUMP, ActionState.RELEASED),
+        (220, InputAction.LEFT, ActionState.RELEASED),
+    ]
+    offset = (actor_index * 7) % SCRIPT_PERIOD
+    events = [
+        InputEvent(tick=cycle + offset + tick, action=action, state=state)
+        for cycle in range(0, ticks, SCRIPT_PERIOD)
+        for tick, action, state in pattern
+    ]
+    return [event for event in events if event.tick < ticks]
+
+
+def spawn_actors(manager: GameObjectManager, count: int) -> list[Luna]:
+    """
+    Get `count` actors into the manager's map: the player, and more Lunas lined up to the right of it.
+
+    :param manager: The game object manager that runs the map.
+    :param count: The total number of actors, including the player.
+    :return: The actors.
+    """
+    player = manager.get_player()
+    actors = [player]
+    for i in range(1, count):
+        actor = Luna(manager.state_manager)
+        manager.map.spawn(actor, SpawnParameters(position=player.position + Vec2(i * ACTOR_SPACING, 0)))
+        actors.append(actor)
+    return actors
+
+
+def run_simulation(
+    map_filename: str,
+    actors: int,
+    ticks: int,
+    trace_allocations: bool = False,
+    timestep: float = FIXED_TIMESTEP,
+    profile_trace: str | None = None,
+) -> HeadlessReport:
+    """
+    Load a map, spawn actors into it and run the simulation for a fixed number of ticks, with scripted input.
+
+    :param map_filename: The Tiled map to load.
+    :param actors: The number of actors to simulate.
+    :param ticks: The number of simulation steps to run.
+    :param trace_allocations: Whether to trace allocations with tracemalloc, to report peak memory use. This slows the
+                              simulation down a lot, so the timings are not comparable with untraced runs.
+    :param timestep: The length of one simulation step, in seconds.
+    :param profile_trace: If set, the run is profiled, and the profiler's scopes are written to this file as a Chrome
+                          trace. Profiling slows the simulation down a little.
+    :return: The results of the run.
+    """
+    game_map = MapLoader(load_textures=False).load_map(map_filename)
+    manager = GameObjectManager(StateManager(current_map=game_map, character=Character()), timestep=timestep)
+    actor_list = spawn_actors(manager, actors)
+
+    # Merge the actors' scripts into one queue, in tick order
+    script = sorted(
+        ((event.tick, index, event) for index in range(len(actor_list)) for event in scripted_input(ticks, index)),
+        key=lambda entry: (entry[0], entry[1]),
+    )
+    script_position = 0
+
+    samples = []
+    gc.collect()
+    gc_collections = sum(stats["collections"] for stats in gc.get_stats())
+    allocated_blocks = sys.getallocatedblocks()
+    if trace_allocations:
+        tracemalloc.start()
+    if profile_trace:
+        PROFILER.reset()
+        PROFILER.frame_capacity = max(ticks, 1)
+        PROFILER.enabled = True
+
+    for tick in range(ticks):
+        start = time.perf_counter_ns()
+        while script_position < len(script) and script[script_position][0] <= tick:
+            _, index, event = script[script_position]
+            manager.send_action(actor_list[index], event.action, event.state)
+            script_position += 1
+        manager.step()
+        samples.append(time.perf_counter_ns() - start)
+        PROFILER.end_frame()
+
+    scopes = None
+    if profile_trace:
+        PROFILER.enabled = False
+        scopes = PROFILER.stats()
+        PROFILER.export_chrome_trace(profile_trace)
+
+    traced_peak_bytes = None
+    if trace_allocations:
+        traced_peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    allocated_blocks = sys.getallocatedblocks() - allocated_blocks
+    gc_collections = sum(stats["collections"] for stats in gc.get_stats()) - gc_collections
+
+    elapsed = sum(samples) / 1e9
+    samples.sort()
+    return HeadlessReport(
+        actors=len(actor_list),
+        ticks=ticks,
+        elapsed=elapsed,
+        ticks_per_second=ticks / elapsed if elapsed else float("inf"),
+        p50_us=statistics.median(samples) / 1e3 if samples else 0.0,
+        p99_us=samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1e3 if samples else 0.0,
+        allocated_blocks=allocated_blocks,
+        gc_collections=gc_collections,
+        traced_peak_bytes=traced_peak_bytes,
+        scopes=scopes,
+    )
+
+
+def print_report(console: Console, report: HeadlessReport) -> None:
+    table = Table(title="Headless simulation")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    for name, value in asdict(report).items():
+        if value is None or name == "scopes":
+            continue
+        table.add_row(name, f"{value:,.2f}" if isinstance(value, float) else f"{value:,}")
+    console.print(table)
+
+    if report.scopes:
+        scope_table = Table(title="Profiler scopes, per tick")
+        for column in ("Scope", "Mean (ms)", "p99 (ms)", "Max (ms)", "Calls"):
+            scope_table.add_column(column, justify="left" if column == "Scope" else "right")
+        for stats in report.scopes:
+            scope_table.add_row(
+                stats.name, f"{stats.mean_ms:.4f}", f"{stats.p99_ms:.4f}", f"{stats.max_ms:.4f}", f"{stats.calls:.1f}"
+            )
+        console.print(scope_table)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--map", default=DEFAULT_MAP, help="The Tiled map to simulate")
+    parser.add_argument("--actors", type=int, default=1, help="Number of actors to simulate")
+    parser.add_argument("--ticks", type=int, default=1200, help="Number of simulation steps to run")
+    parser.add_argument(
+        "--trace-allocations", action="store_true", help="Trace peak memory use (slows the simulation down)"
+    )
+    parser.add_argument("--profile", metavar="TRACE", help="Profile the run, and write a Chrome trace to this file")
+    args = parser.parse_args(argv)
+
+    report = run_simulation(
+        args.map, args.actors, args.ticks, trace_allocations=args.trace_allocations, profile_trace=args.profile
+    )
+    print_report(Console(), report)
+    return 0
@@ -3,12 +3,13 @@ import arcade
 from luna.managers.game_manager import GameManager
 from luna.utils.logging import configure_logging
 
-arcade.enable_timings()
-arcade.load_font("luna/metropolis.regular.otf")
+FONT_PATH = "luna/metropolis.regular.otf"
 
 
 def main() -> None:
     configure_logging()
+    arcade.enable_timings()
+    arcade.load_font(FONT_PATH)
     GameManager().start()
     arcade.run()
 
@@ -9,6 +9,9 @@ from luna.managers.state_manager import StateManager
 from luna.utils.map_loader import MapLoader
 from luna.views.play_view import PlayView
 
+# Time between the window's updates and draws, in seconds: the game runs at 120 frames per second
+FRAME_TIME = 1 / 120
+
 
 class GameManager:
     class GameWindow(Window):
@@ -17,8 +20,8 @@ class GameManager:
                 width,
                 height,
                 title,
-                update_rate=1 / 120,
-                draw_rate=1 / 120,
+                update_rate=FRAME_TIME,
+                draw_rate=FRAME_TIME,
                 fullscreen=False,
             )
 
@@ -36,11 +39,11 @@ class GameManager:
         width, height = self.options_manager.options.resolution
         self.window = self.GameWindow(width, height, "Luna")
 
-        test_map = MapLoader().load_map("luna/data/maps/test_map.tmj")
+        test_map = MapLoader(pack_atlas=True, prerender_layers=True).load_streaming_map("luna/data/maps/test_map.tmj")
 
         self.state_manager = StateManager(current_map=test_map, character=Character())
         self.input_manager = InputManager()
-        self.screen_manager = ScreenManager(self.window, PlayView(self.input_manager, self.state_manager))
+        self.screen_manager = ScreenManager(self.window, PlayView(self.input_manager, self.state_manager, FRAME_TIME))
 
     def start(self) -> None:
         self.screen_manager.start()
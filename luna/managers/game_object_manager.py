@@ -1,26 +1,87 @@
-from luna.core.game_object import SpawnParameters
+from functools import cache
+from typing import TYPE_CHECKING
+
+from arcade.experimental.input import ActionState
+
+from luna.core.game_object import GameObject, SpawnParameters
+from luna.core.input_action import InputAction
+from luna.core.input_log import InputEvent, InputLog
 from luna.core.map import Map
+from luna.core.object_phase import ObjectPhase
 from luna.game_objects.luna import Luna
 from luna.game_objects.spawn_point import SpawnPoint
-from luna.managers.input_manager import InputManager
 from luna.managers.state_manager import StateManager
+from luna.utils.logging import LOGGER
+from luna.utils.profiler import PROFILER
+
+if TYPE_CHECKING:
+    # Not imported at runtime: input devices aren't available when running headless
+    from luna.managers.input_manager import InputManager
+
+# Length of one simulation step, in seconds
+FIXED_TIMESTEP = 1 / 120
+
+# The most simulation steps to run for one frame. If more steps are due than this (e.g. after a long hitch), the
+# leftover time is dropped and the game slows down for a moment, instead of spending even longer catching up.
+MAX_SUBSTEPS = 8
 
 
 class GameObjectManager:
     """
     Handles logic that applies to all game objects as well as the interactions between them.
 
+    The simulation runs in fixed steps of `timestep` seconds, independent of the frame rate: every frame, `advance`
+    runs as many steps as fit in the time that passed, and game objects are drawn at their positions interpolated
+    between the last two steps. Input actions are applied at the start of the next step, and recorded with the step
+    they were applied at, so a run can be replayed exactly.
+
+    Each part of a step only runs over the game objects that take part in it (see `ObjectPhase`), as indexed by the
+    map's registry, so inert objects aren't visited at all. Of those, only the ones near the player are simulated
+    every step; see `SimulationLod`.
+
     :var map: The map that the game objects exist in.
-    :var input_manager: The input manager for the game.
+    :var input_manager: The input manager for the game, or None when running without a window.
+    :var timestep: The length of one simulation step, in seconds.
+    :var max_substeps: The most simulation steps to run for one frame.
+    :var tick: The number of simulation steps run so far.
+    :var input_log: All the input actions applied to the simulation so far.
+    :var replay: If set, input actions are replayed from this log instead of taken from the input manager.
     """
 
     map: Map
-    input_manager: InputManager
+    input_manager: "InputManager | None"
     state_manager: StateManager
+    timestep: float
+    max_substeps: int
+    tick: int
+    input_log: InputLog
+    replay: InputLog | None
+
+    _accumulator: float
+    _pending_actions: list[tuple[InputAction, ActionState]]
+    _replay_position: int
 
-    def __init__(self, state_manager: StateManager, input_manager: InputManager) -> None:
+    def __init__(
+        self,
+        state_manager: StateManager,
+        input_manager: "InputManager | None" = None,
+        timestep: float = FIXED_TIMESTEP,
+        max_substeps: int = MAX_SUBSTEPS,
+        replay: InputLog | None = None,
+    ) -> None:
         self.input_manager = input_manager
         self.state_manager = state_manager
+        self.timestep = timestep
+        self.max_substeps = max_substeps
+        self.tick = 0
+        self.input_log = InputLog()
+        self.replay = replay
+        self._accumulator = 0.0
+        self._pending_actions = []
+        self._replay_position = 0
+
+        if self.input_manager:
+            self.input_manager.register_action_handler(self.on_action)
 
         self.load_map(state_manager.current_map)
 
@@ -33,14 +94,126 @@ class GameObjectManager:
         self.map = game_map
         self._on_load_map()
 
-    def update(self, delta_time: float) -> None:
+    @property
+    def interpolation_alpha(self) -> float:
+        """
+        How far the simulation is between its last step (0) and its next step (1).
+        """
+        return self._accumulator / self.timestep
+
+    def on_action(self, action: InputAction, state: ActionState) -> None:
+        """
+        Queue an input action, to be applied at the start of the next simulation step. Ignored while replaying.
+
+        :param action: The action.
+        :param state: Whether the action was pressed or released.
+        """
+        if self.replay is None:
+            self._pending_actions.append((action, state))
+
+    def advance(self, delta_time: float) -> int:
+        """
+        Advance the simulation by the time that passed since the last frame, and interpolate the game objects'
+        render positions.
+
+        :param delta_time: Time since the last frame.
+        :return: The number of simulation steps that were run.
+        """
+        self._accumulator += delta_time
+        steps = 0
+        while self._accumulator >= self.timestep and steps < self.max_substeps:
+            self.step()
+            self._accumulator -= self.timestep
+            steps += 1
+
+        if self._accumulator >= self.timestep:
+            LOGGER.debug(f"Simulation fell behind, dropping {self._accumulator - self.timestep:.3f}s")
+            self._accumulator %= self.timestep
+
+        self.interpolate(self.interpolation_alpha)
+        return steps
+
+    def step(self) -> None:
+        """
+        Run one fixed simulation step.
+        """
+        with PROFILER.scope("GameObjectManager.step"):
+            # Make sure the map around the player is loaded before anything moves in it
+            focus = self.get_player_position()
+            with PROFILER.scope("Map.stream"):
+                self.map.stream(focus)
+
+            self._apply_input()
+            simulation_lod = self.map.simulation_lod
+            with PROFILER.scope("SimulationLod.update"):
+                simulation_lod.update(focus, self.tick)
+            for game_object in simulation_lod.moved:
+                game_object.previous_position = game_object.position
+
+            # Move all the bodies at once, let their game objects resolve collisions, then settle the bodies on the
+            # ground
+            with PROFILER.scope("BodyStore.integrate"):
+                self.map.bodies.integrate(self.timestep)
+            if PROFILER.enabled:
+                for game_object, step_scale in simulation_lod.updated:
+                    with PROFILER.scope(_update_scope_name(type(game_object))):
+                        game_object.update(self.timestep * step_scale)
+            else:
+                for game_object, step_scale in simulation_lod.updated:
+                    game_object.update(self.timestep * step_scale)
+            with PROFILER.scope("BodyStore.settle"):
+                self.map.bodies.settle(self.timestep)
+            self.tick += 1
+
+    def run_headless(self, ticks: int) -> None:
         """
-        Update all game objects.
+        Run simulation steps back to back, as fast as possible, without waiting for frames. Useful for soak tests and
+        for replaying input logs.
 
-        :param delta_time: Time since the last update.
+        :param ticks: The number of simulation steps to run.
         """
-        for game_object in self.map.objects:
-            game_object.update(delta_time)
+        for _ in range(ticks):
+            self.step()
+        self.interpolate(1.0)
+
+    def interpolate(self, alpha: float) -> None:
+        """
+        Update the render positions of all the awake game objects that move.
+
+        :param alpha: How far between their previous (0) and current (1) positions to render the game objects.
+        """
+        for game_object in self.map.simulation_lod.awake_moving:
+            game_object.interpolate(alpha)
+
+    def _apply_input(self) -> None:
+        """
+        Apply the input actions for the current step: the queued ones, or the ones from the replay log.
+        """
+        if self.replay is None:
+            actions, self._pending_actions = self._pending_actions, []
+        else:
+            actions = []
+            events = self.replay.events
+            while self._replay_position < len(events) and events[self._replay_position].tick <= self.tick:
+                actions.append((events[self._replay_position].action, events[self._replay_position].state))
+                self._replay_position += 1
+
+        receivers = self.map.registry.in_phase(ObjectPhase.INPUT)
+        for action, state in actions:
+            self.input_log.events.append(InputEvent(tick=self.tick, action=action, state=state))
+            for receiver in receivers:
+                self.send_action(receiver, action, state)
+
+    def send_action(self, game_object: GameObject, action: InputAction, state: ActionState) -> None:
+        """
+        Send an input action to a game object, waking it up if it is asleep (see `SimulationLod.wake`.)
+
+        :param game_object: The game object.
+        :param action: The action.
+        :param state: Whether the action was pressed or released.
+        """
+        self.map.simulation_lod.wake(game_object)
+        game_object.on_action(action, state)
 
     def _on_load_map(self) -> None:
         """
@@ -54,17 +227,23 @@ class GameObjectManager:
         """
 
         # For right now just create her at the first spawn point
-        for map_object in self.map.objects:
-            if isinstance(map_object, SpawnPoint):
-                luna = Luna(self.state_manager)
-                self.map.spawn(luna, SpawnParameters(position=map_object.position))
-                self.input_manager.register_game_object(luna)
-                return
+        spawn_point = self.map.registry.first(SpawnPoint)
+        if spawn_point is None:
+            raise RuntimeError("No spawn point found in map")
+
+        self.map.spawn(Luna(self.state_manager), SpawnParameters(position=spawn_point.position))
 
-        raise RuntimeError("No spawn point found in map")
+    def get_player(self) -> Luna:
+        player = self.map.registry.first(Luna)
+        if player is None:
+            raise RuntimeError("No player found in map")
+        return player
 
     def get_player_position(self) -> tuple[float, float]:
-        for game_object in self.map.objects:
-            if isinstance(game_object, Luna):
-                return game_object.position
-        raise RuntimeError("No player found in map")
+        return self.get_player().position
+
+
+@cache
+def _update_scope_name(object_type: type[GameObject]) -> str:
+    # Built once per class rather than for every object in every step
+    return f"{object_type.__name__}.update"
@@ -1,3 +1,5 @@
+from typing import Callable
+
 from arcade import ControllerManager
 from arcade.experimental import input
 
@@ -45,8 +47,16 @@ class InputManager:
 
         :param game_object: The game object to register.
         """
+        self.register_action_handler(game_object.on_action)
+
+    def register_action_handler(self, handler: Callable[[InputAction, input.ActionState], None]) -> None:
+        """
+        Register a function to be called with every input action.
+
+        :param handler: The function to call with the action and whether it was pressed or released.
+        """
 
-        def game_object_on_action(action: str, state: input.ActionState) -> None:
-            game_object.on_action(InputAction(action), state)
+        def on_action(action: str, state: input.ActionState) -> None:
+            handler(InputAction(action), state)
 
-        self._internal_input_manager.register_action_handler(game_object_on_action)
+        self._internal_input_manager.register_action_handler(on_action)
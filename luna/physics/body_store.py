@@ -0,0 +1,247 @@
+import numpy
+
+# Friction applied to bodies that are in the air
+AIR_FRICTION = 0.25
+
+# Bodies whose ground is further below them than this are in the air
+GROUND_SNAP_DISTANCE = 20
+
+# Number of bodies a new store has room for. The arrays grow as needed.
+DEFAULT_CAPACITY = 16
+
+
+class BodyStore:
+    """
+    All the kinematic bodies of a map, stored as a structure of arrays: every property of every body lives in one
+    contiguous NumPy array, indexed by the body's handle. Physics is applied to all bodies at once, in vectorized
+    passes, instead of per game object.
+
+    A simulation step is split in two passes around collision detection:
+
+      1. `integrate` applies gravity and speed caps, and moves the bodies by their velocity.
+      2. The bodies' owners resolve their collisions, and report the ground below them with `set_ground`.
+      3. `settle` lands bodies on the ground (or takes them off it), snaps them to it, and applies their input
+         acceleration and friction.
+
+    Bodies can be advanced by more or less than one step at a time (see `step_scale`), so that the simulation LOD can
+    put far away bodies to sleep, or simulate them at a reduced rate.
+
+    Arrays are reallocated when the store grows, so don't keep references to them across `create` calls.
+
+    :var position: (N, 2) The position of each body: the middle of the bottom of its bounding box.
+    :var previous_position: (N, 2) The position of each body before the last `integrate`.
+    :var velocity: (N, 2) The velocity of each body, in units per second.
+    :var size: (N, 2) The width and height of each body's bounding box.
+    :var gravity: (N,) The vertical acceleration of each body while it is in the air.
+    :var max_speed: (N,) The highest horizontal speed of each body.
+    :var terminal_velocity: (N,) The lowest (i.e. fastest falling) vertical speed of each body.
+    :var acceleration: (N,) How fast each body speeds up and slows down, before friction.
+    :var horizontal_input: (N,) Which way each body is trying to move: -1 (left), 0 or 1 (right).
+    :var on_ground: (N,) Whether each body is standing on the ground.
+    :var ground_distance: (N,) How far below each body its ground is, or NaN if it has none. Reset by `integrate`.
+    :var ground_friction: (N,) The friction of each body's ground.
+    :var friction: (N,) The friction that applied to each body in the last `settle`.
+    :var step_scale: (N,) How many steps each body advances by per step: 1 normally, 0 to freeze it where it is (its
+                     ground isn't checked either), or more to catch up on steps it skipped.
+    :var alive: (N,) Whether each slot holds a body.
+    """
+
+    position: numpy.ndarray
+    previous_position: numpy.ndarray
+    velocity: numpy.ndarray
+    size: numpy.ndarray
+    gravity: numpy.ndarray
+    max_speed: numpy.ndarray
+    terminal_velocity: numpy.ndarray
+    acceleration: numpy.ndarray
+    horizontal_input: numpy.ndarray
+    on_ground: numpy.ndarray
+    ground_distance: numpy.ndarray
+    ground_friction: numpy.ndarray
+    friction: numpy.ndarray
+    step_scale: numpy.ndarray
+    alive: numpy.ndarray
+
+    _count: int
+    _free: list[int]
+
+    # The array attributes, with the shape of one body's entry and the dtype
+    _ARRAYS = {
+        "position": ((2,), float),
+        "previous_position": ((2,), float),
+        "velocity": ((2,), float),
+        "size": ((2,), float),
+        "gravity": ((), float),
+        "max_speed": ((), float),
+        "terminal_velocity": ((), float),
+        "acceleration": ((), float),
+        "horizontal_input": ((), float),
+        "on_ground": ((), bool),
+        "ground_distance": ((), float),
+        "ground_friction": ((), float),
+        "friction": ((), float),
+        "step_scale": ((), float),
+        "alive": ((), bool),
+    }
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        for name, (shape, dtype) in self._ARRAYS.items():
+            setattr(self, name, numpy.zeros((capacity, *shape), dtype=dtype))
+        self._count = 0
+        self._free = []
+
+    def __len__(self) -> int:
+        return self._count - len(self._free)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.alive)
+
+    def create(
+        self,
+        position: tuple[float, float],
+        size: tuple[float, float],
+        velocity: tuple[float, float] = (0, 0),
+        gravity: float = 0,
+        max_speed: float = numpy.inf,
+        terminal_velocity: float = -numpy.inf,
+        acceleration: float = 0,
+    ) -> int:
+        """
+        Add a body to the store.
+
+        :return: The handle of the new body.
+        """
+        if self._free:
+            handle = self._free.pop()
+        else:
+            if self._count == self.capacity:
+                self._grow()
+            handle = self._count
+            self._count += 1
+
+        self.position[handle] = position
+        self.previous_position[handle] = position
+        self.velocity[handle] = velocity
+        self.size[handle] = size
+        self.gravity[handle] = gravity
+        self.max_speed[handle] = max_speed
+        self.terminal_velocity[handle] = terminal_velocity
+        self.acceleration[handle] = acceleration
+        self.horizontal_input[handle] = 0
+        self.on_ground[handle] = False
+        self.ground_distance[handle] = numpy.nan
+        self.ground_friction[handle] = 0
+        self.friction[handle] = AIR_FRICTION
+        self.step_scale[handle] = 1
+        self.alive[handle] = True
+        return handle
+
+    def remove(self, handle: int) -> None:
+        """
+        Remove a body from the store. Its handle may be reused by a body created later.
+
+        :param handle: The handle of the body to remove.
+        """
+        if not self.alive[handle]:
+            raise ValueError(f"No body with handle {handle}")
+        self.alive[handle] = False
+        self.velocity[handle] = 0
+        self.horizontal_input[handle] = 0
+        self._free.append(handle)
+
+    def set_ground(self, handle: int, distance: float, friction: float) -> None:
+        """
+        Report the ground below a body, for the next `settle`.
+
+        :param handle: The handle of the body.
+        :param distance: How far below the body the ground is. Negative if the body sank into it.
+        :param friction: The friction of the ground.
+        """
+        self.ground_distance[handle] = distance
+        self.ground_friction[handle] = friction
+
+    def integrate(self, delta_time: float) -> None:
+        """
+        Apply gravity and speed caps to all bodies, and move them by their velocity.
+
+        :param delta_time: The length of the simulation step.
+        """
+        count = self._count
+        velocity = self.velocity[:count]
+        # The slots of removed bodies don't move
+        step_time = delta_time * self.step_scale[:count] * self.alive[:count]
+
+        airborne = ~self.on_ground[:count]
+        velocity[airborne, 1] += self.gravity[:count][airborne] * step_time[airborne]
+
+        max_speed = self.max_speed[:count]
+        numpy.clip(velocity[:, 0], -max_speed, max_speed, out=velocity[:, 0])
+        numpy.maximum(velocity[:, 1], self.terminal_velocity[:count], out=velocity[:, 1])
+
+        self.previous_position[:count] = self.position[:count]
+        self.position[:count] += velocity * step_time[:, None]
+        self.ground_distance[:count] = numpy.nan
+
+    def settle(self, delta_time: float) -> None:
+        """
+        Land bodies that fell onto their ground and snap bodies on the ground to it, then apply input acceleration and
+        friction to all bodies.
+
+        :param delta_time: The length of the simulation step.
+        """
+        count = self._count
+        position = self.position[:count]
+        velocity = self.velocity[:count]
+        on_ground = self.on_ground[:count]
+        ground_distance = self.ground_distance[:count]
+        step_time = delta_time * self.step_scale[:count] * self.alive[:count]
+        # Frozen bodies (and the slots of removed bodies) had no ground reported for them, and stay as they are
+        frozen = step_time == 0
+
+        # Land on the ground if we fell into it this step, not just found ourselves under it
+        has_ground = ~numpy.isnan(ground_distance)
+        moved = position - self.previous_position[:count]
+        amount_moved = numpy.hypot(moved[:, 0], moved[:, 1])
+        with numpy.errstate(invalid="ignore"):
+            landing = has_ground & (velocity[:, 1] < 0) & (-amount_moved <= ground_distance) & (ground_distance <= 0)
+            on_ground |= landing
+            velocity[landing, 1] = 0
+            on_ground &= (has_ground & (ground_distance <= GROUND_SNAP_DISTANCE)) | frozen
+
+        # Snap to the ground
+        snapping = on_ground & ~frozen
+        position[snapping, 1] -= ground_distance[snapping]
+        friction = numpy.where(on_ground, self.ground_friction[:count], AIR_FRICTION)
+        self.friction[:count] = friction
+
+        # Input acceleration
+        acceleration = self.acceleration[:count]
+        horizontal_input = self.horizontal_input[:count]
+        velocity[:, 0] += horizontal_input * friction * acceleration * step_time
+
+        # Slow down when not giving input: along the ground when on it, otherwise only horizontally
+        deceleration = friction * acceleration * step_time
+        idle = horizontal_input == 0
+
+        speed = numpy.hypot(velocity[:, 0], velocity[:, 1])
+        idle_on_ground = idle & on_ground
+        stop = idle_on_ground & (deceleration > speed)
+        slow = idle_on_ground & ~stop & (speed > 0)
+        velocity[stop] = 0
+        velocity[slow] -= velocity[slow] / speed[slow, None] * deceleration[slow, None]
+
+        horizontal_speed = numpy.abs(velocity[:, 0])
+        idle_in_air = idle & ~on_ground
+        stop = idle_in_air & (deceleration > horizontal_speed)
+        slow = idle_in_air & ~stop
+        velocity[stop, 0] = 0
+        velocity[slow, 0] -= numpy.sign(velocity[slow, 0]) * deceleration[slow]
+
+    def _grow(self) -> None:
+        capacity = max(1, self.capacity * 2)
+        for name in self._ARRAYS:
+            array = getattr(self, name)
+            grown = numpy.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
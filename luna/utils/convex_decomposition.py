@@ -0,0 +1,143 @@
+"""
+Decomposition of level geometry into as few convex pieces as possible, so that maps have fewer regions to index and
+test against.
+
+Polygons are first triangulated by ear clipping, then merged back into convex pieces with the Hertel-Mehlhorn
+algorithm: every diagonal added by the triangulation is removed, in turn, if the two pieces on either side of it
+still form a convex polygon. The result has at most four times as many pieces as an optimal convex decomposition.
+"""
+
+from arcade.earclip import earclip
+from arcade.types import Point, PointList
+
+# Cross products within this fraction of the product of the edge lengths are considered zero, i.e. the edges collinear
+_COLLINEAR_TOLERANCE = 1e-9
+
+
+def convex_decomposition(points: PointList) -> list[list[Point]]:
+    """
+    Split a simple polygon into convex pieces.
+
+    :param points: The vertices of the polygon, in either winding order.
+    :return: The vertices of each piece, in counter-clockwise order.
+    """
+    return merge_triangles(earclip(points))
+
+
+def merge_triangles(triangles: list[PointList]) -> list[list[Point]]:
+    """
+    Merge the triangles of a triangulated polygon into convex pieces (Hertel-Mehlhorn.) Triangles are connected
+    through the edges they share, which must have exactly the same vertices.
+
+    :param triangles: The triangles, in any winding order.
+    :return: The vertices of each piece, in counter-clockwise order, without collinear vertices.
+    """
+    pieces: dict[int, list[Point]] = {}
+    # The piece on the left of each directed edge
+    edge_owners: dict[tuple[Point, Point], int] = {}
+    for index, triangle in enumerate(triangles):
+        piece = [tuple(point) for point in triangle]
+        if _signed_area(piece) < 0:
+            piece.reverse()
+        pieces[index] = piece
+        for start, end in _edges(piece):
+            edge_owners[start, end] = index
+
+    diagonals = [(start, end) for start, end in edge_owners if (end, start) in edge_owners and start < end]
+    for start, end in diagonals:
+        first = edge_owners[start, end]
+        second = edge_owners[end, start]
+        if first == second:
+            continue
+        merged = _merge_across(pieces[first], pieces[second], start, end)
+        if merged is None:
+            continue
+
+        del pieces[second]
+        pieces[first] = merged
+        del edge_owners[start, end], edge_owners[end, start]
+        for edge in _edges(merged):
+            edge_owners[edge] = first
+
+    return [remove_collinear(piece, closed=True) for piece in pieces.values()]
+
+
+def remove_collinear(points: PointList, closed: bool = False) -> list[Point]:
+    """
+    Remove the vertices that lie on a straight line between their neighbours, without changing the shape.
+
+    :param points: The vertices of a line string, or of a polygon if `closed` is set.
+    :param closed: Whether the points are a polygon, whose last vertex connects to the first.
+    :return: The remaining vertices, in the same order.
+    """
+    kept = [tuple(point) for point in points]
+    count = len(kept)
+    i = 0 if closed else 1
+    while count > (3 if closed else 2) and i < (count if closed else count - 1):
+        previous, point, following = kept[i - 1], kept[i], kept[(i + 1) % count]
+        if _is_straight(previous, point, following):
+            # The previous vertex's straightness doesn't change, as its new neighbour is on the same line
+            del kept[i]
+            count -= 1
+        else:
+            i += 1
+    return kept
+
+
+def _edges(piece: list[Point]) -> list[tuple[Point, Point]]:
+    return [(piece[i], piece[(i + 1) % len(piece)]) for i in range(len(piece))]
+
+
+def _signed_area(piece: PointList) -> float:
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(piece, [*piece[1:], piece[0]])) / 2
+
+
+def _cross(origin: Point, a: Point, b: Point) -> float:
+    return (a[0] - origin[0]) * (b[1] - origin[1]) - (a[1] - origin[1]) * (b[0] - origin[0])
+
+
+def _is_convex_corner(previous: Point, point: Point, following: Point) -> bool:
+    """
+    Whether a counter-clockwise polygon turns left (or goes straight on) at `point`.
+    """
+    return _cross(previous, point, following) >= -_tolerance(previous, point, following)
+
+
+def _is_straight(previous: Point, point: Point, following: Point) -> bool:
+    """
+    Whether `point` lies on the straight line from `previous` to `following`, between them.
+    """
+    if abs(_cross(previous, point, following)) > _tolerance(previous, point, following):
+        return False
+    incoming = (point[0] - previous[0], point[1] - previous[1])
+    outgoing = (following[0] - point[0], following[1] - point[1])
+    return incoming[0] * outgoing[0] + incoming[1] * outgoing[1] > 0
+
+
+def _tolerance(previous: Point, point: Point, following: Point) -> float:
+    incoming = abs(point[0] - previous[0]) + abs(point[1] - previous[1])
+    outgoing = abs(following[0] - point[0]) + abs(following[1] - point[1])
+    return _COLLINEAR_TOLERANCE * incoming * outgoing
+
+
+def _merge_across(first: list[Point], second: list[Point], start: Point, end: Point) -> list[Point] | None:
+    """
+    Merge two counter-clockwise pieces that share the diagonal from `start` to `end` (which is `first`'s edge from
+    `start` to `end`, and `second`'s edge from `end` to `start`.)
+
+    :return: The merged piece, or None if it wouldn't be convex.
+    """
+    # Walk `first` from `end` all the way round to `start`, then `second` from `start` round to `end`
+    i = first.index(end)
+    j = second.index(start)
+    first_part = first[i:] + first[:i]
+    second_part = second[j:] + second[:j]
+    merged = first_part + second_part[1:-1]
+
+    # Only the corners at the ends of the diagonal change
+    k = len(first_part) - 1
+    if not _is_convex_corner(merged[k - 1], merged[k], merged[(k + 1) % len(merged)]):
+        return None
+    if not _is_convex_corner(merged[-1], merged[0], merged[1]):
+        return None
+    return merged
@@ -1,11 +1,12 @@
 import logging
 
-from rich.logging import RichHandler
-
 LOGGER = logging.getLogger("luna")
 
 
 def configure_logging() -> None:
+    # Rich is only needed once logging is set up, not by everything that logs
+    from rich.logging import RichHandler
+
     log_format = "%(message)s"
     logging.basicConfig(level=logging.WARNING, format=log_format, datefmt="[%X]", handlers=[RichHandler()])
 
@@ -0,0 +1,209 @@
+"""
+Cooked map cache, so maps don't have to be parsed and triangulated from their Tiled source on every load.
+
+A cooked map is a single binary file:
+
+  * An 8 byte magic string, followed by the cache format version and the header length (both little endian uint32.)
+  * A JSON header describing the source files the map was cooked from, the arrays in the file, and any data that
+    doesn't fit in an array (texture paths, object spawns.)
+  * The raw array data, each array aligned to `_ALIGNMENT` bytes.
+
+Arrays are loaded as read-only memory maps of the file, so loading a cooked map copies (almost) nothing.
+The cache is invalidated when the version changes, or when any of the source files (the map, its tilesets and
+templates, and the tile images) changed: a file whose modification time and size are unchanged is assumed to be
+unchanged, otherwise its contents are hashed and compared.
+"""
+
+import hashlib
+import json
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy
+
+from luna.utils.logging import LOGGER
+
+# Bump whenever the cooked output changes, i.e. how a map's regions or tiles are built from its source (e.g. vertex
+# welding, or the tile point transform), not just when the file format does. Otherwise existing caches keep serving
+# the old output.
+MAP_CACHE_VERSION = 4
+MAP_CACHE_SUFFIX = ".cooked"
+
+_MAGIC = b"LUNAMAP\0"
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGNMENT = 64
+
+# The fields of `CookedMap` that are stored as arrays
+_ARRAY_FIELDS = (
+    "region_vertices",
+    "region_offsets",
+    "region_types",
+    "region_geometry_types",
+    "region_friction",
+    "tile_transforms",
+    "tile_layers",
+)
+
+# The geometry types a region can have, by the index stored in `CookedMap.region_geometry_types`
+GEOMETRY_TYPES = ["polygon", "line_string"]
+
+
+@dataclass
+class CookedSpawn:
+    """
+    A game object spawn stored in a cooked map.
+
+    :var object_type: The name of the object type, as used in `OBJ_TYPE_MAP`.
+    :var position: Where to spawn the object, in Luna co-ordinates.
+    """
+
+    object_type: str
+    position: tuple[float, float]
+
+
+@dataclass
+class CookedMap:
+    """
+    All the data from a loaded map, flattened into arrays so it can be stored in the map cache.
+
+    :var region_vertices: (V, 2) The vertices of all the regions, one region after the other.
+    :var region_offsets: (R + 1,) Region i's vertices are `region_vertices[region_offsets[i]:region_offsets[i + 1]]`.
+    :var region_types: (R,) The `RegionType` value of each region.
+    :var region_geometry_types: (R,) The geometry type of each region, as an index into `GEOMETRY_TYPES`.
+    :var region_friction: (R,) The friction of each region.
+    :var tile_transforms: (T, 5) The x, y, width, height and rotation of each tile.
+    :var tile_layers: (T,) The `TileLayer` value of each tile.
+    :var tile_textures: The texture file of each tile.
+    :var spawns: The game objects to spawn into the map.
+    """
+
+    region_vertices: numpy.ndarray
+    region_offsets: numpy.ndarray
+    region_types: numpy.ndarray
+    region_geometry_types: numpy.ndarray
+    region_friction: numpy.ndarray
+    tile_transforms: numpy.ndarray
+    tile_layers: numpy.ndarray
+    tile_textures: list[str] = field(default_factory=list)
+    spawns: list[CookedSpawn] = field(default_factory=list)
+
+
+def map_cache_path(map_filename: str | Path) -> Path:
+    """
+    Where the cooked version of a map is stored: next to the source, with `MAP_CACHE_SUFFIX` added.
+
+    :param map_filename: The source map file.
+    """
+    path = Path(map_filename)
+    return path.with_name(path.name + MAP_CACHE_SUFFIX)
+
+
+def write_map_cache(cache_path: Path, cooked_map: CookedMap, sources: list[Path]) -> None:
+    """
+    Write a cooked map to the cache.
+
+    :param cache_path: The file to write the cooked map to.
+    :param cooked_map: The map data.
+    :param sources: The files the map was loaded from. If any of them change, the cache is invalidated.
+    """
+    arrays = {}
+    offset = 0
+    for name in _ARRAY_FIELDS:
+        array = numpy.ascontiguousarray(getattr(cooked_map, name))
+        arrays[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps(
+        {
+            "sources": [_describe_source(source) for source in sources],
+            "arrays": arrays,
+            "tile_textures": cooked_map.tile_textures,
+            "spawns": [{"object_type": spawn.object_type, "position": spawn.position} for spawn in cooked_map.spawns],
+        }
+    ).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    # Write to a temporary file first so a half-written cache is never picked up
+    temporary_path = cache_path.with_name(cache_path.name + ".tmp")
+    with open(temporary_path, "wb") as file:
+        file.write(_PREAMBLE.pack(_MAGIC, MAP_CACHE_VERSION, len(header)))
+        file.write(header)
+        for name in _ARRAY_FIELDS:
+            file.seek(data_start + arrays[name]["offset"])
+            file.write(numpy.ascontiguousarray(getattr(cooked_map, name)).tobytes())
+    temporary_path.replace(cache_path)
+
+
+def read_map_cache(cache_path: Path) -> CookedMap | None:
+    """
+    Read a cooked map from the cache.
+
+    :param cache_path: The file the cooked map was written to.
+    :return: The cooked map, or None if there is no up to date cooked map.
+    """
+    if not cache_path.exists():
+        return None
+
+    with open(cache_path, "rb") as file:
+        preamble = file.read(_PREAMBLE.size)
+        if len(preamble) != _PREAMBLE.size:
+            return None
+        magic, version, header_length = _PREAMBLE.unpack(preamble)
+        if magic != _MAGIC or version != MAP_CACHE_VERSION:
+            LOGGER.debug(f"Map cache {cache_path} is from a different version, ignoring it")
+            return None
+        header = json.loads(file.read(header_length).decode("utf-8"))
+
+    if not all(_is_source_unchanged(source) for source in header["sources"]):
+        LOGGER.debug(f"Map cache {cache_path} is out of date, ignoring it")
+        return None
+
+    data_start = _align(_PREAMBLE.size + header_length)
+    arrays = {
+        name: _map_array(cache_path, data_start + description["offset"], description)
+        for name, description in header["arrays"].items()
+    }
+    return CookedMap(
+        **arrays,
+        tile_textures=header["tile_textures"],
+        spawns=[CookedSpawn(spawn["object_type"], tuple(spawn["position"])) for spawn in header["spawns"]],
+    )
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _map_array(cache_path: Path, offset: int, description: dict[str, Any]) -> numpy.ndarray:
+    dtype = numpy.dtype(description["dtype"])
+    shape = tuple(description["shape"])
+    if 0 in shape:
+        # Empty arrays can't be memory mapped
+        return numpy.empty(shape, dtype=dtype)
+    return numpy.memmap(cache_path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _describe_source(path: Path) -> dict[str, Any]:
+    stat = path.stat()
+    return {
+        "path": str(path.resolve()),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": _hash_file(path),
+    }
+
+
+def _is_source_unchanged(source: dict[str, Any]) -> bool:
+    path = Path(source["path"])
+    if not path.exists():
+        return False
+    stat = path.stat()
+    if stat.st_mtime_ns == source["mtime_ns"] and stat.st_size == source["size"]:
+        return True
+    return bool(_hash_file(path) == source["sha256"])
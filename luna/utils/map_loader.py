@@ -1,11 +1,18 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import Any, Iterable, Sequence
 
 import arcade
+import numpy
 import pytiled_parser
 import shapely
-from arcade.earclip import earclip
+from arcade import TextureAtlas
+from arcade.types import Point, PointList
 from pyglet.math import Vec2
-from pytiled_parser import ObjectLayer, TiledMap
+from pytiled_parser import ObjectLayer, Properties, TiledMap
 from pytiled_parser.tiled_object import (
     Tile as ObjectTile,
     TiledObject,
@@ -16,45 +23,208 @@ from pytiled_parser.tiled_object import (
 from pytiled_parser.tileset import Tile
 from shapely import STRtree
 
+from luna.core.chunk_streamer import ChunkStreamer
 from luna.core.game_object import SpawnParameters
 from luna.core.map import Map
+from luna.core.map_chunk import (
+    DEFAULT_CHUNK_SIZE,
+    Bounds,
+    ChunkCoordinate,
+    ChunkSource,
+    MapChunk,
+    chunk_coordinate,
+)
 from luna.core.map_tile import MapTile
 from luna.core.region import Region
+from luna.core.region_overlay import build_region_overlay
 from luna.core.region_type import RegionType
-from luna.core.spatial_tree import SpatialTree
+from luna.core.spatial_tree import SpatialTree, build_type_indexes
+from luna.core.surface_graph import SurfaceGraph, weld_vertices
+from luna.core.tile_layer import TileLayer
+from luna.core.tile_sprites import DEFAULT_PAGE_SIZE, build_tile_pages
+from luna.utils.convex_decomposition import convex_decomposition, remove_collinear
 from luna.utils.logging import LOGGER
+from luna.utils.map_cache import (
+    GEOMETRY_TYPES,
+    CookedMap,
+    CookedSpawn,
+    map_cache_path,
+    read_map_cache,
+    write_map_cache,
+)
 from luna.utils.map_constants import OBJ_TYPE_MAP
-from luna.utils.tiled_utils import tile_point_to_absolute_luna_point
+from luna.utils.texture_cache import TextureCache
+from luna.utils.tiled_utils import tile_points_to_absolute_luna_points
 
 LAYER_NAME_LEVEL = "LevelLayer"
 LAYER_NAME_OBJECTS = "ObjectLayer"
 
+# Custom property (on a level layer, or on a single tile in it) that sets which render layer its tiles are drawn in:
+# "background", "middle" (the default) or "foreground"
+PROPERTY_RENDER_LAYER = "render_layer"
+
+# Maps with fewer tile placements than this are built on the calling thread: starting a pool of processes takes longer
+# than building their geometry
+PARALLEL_MIN_PLACEMENTS = 256
+
+# Number of tile placements whose geometry is built by each task sent to the process pool
+PLACEMENTS_PER_BATCH = 64
+
+# A tile placed in a level layer: the placement, the tile from the tileset, and the render layer it is drawn in
+Placement = tuple[ObjectTile, Tile, TileLayer]
+
 
 class MapLoader:
     """
     Class that handles loading Tiled maps into Map files.
+
+    :var load_textures: Whether to load the map's tiles. Without them, the map has no graphics, but can be loaded and
+                        simulated without a window or the tile images (e.g. for headless simulation.)
+    :var pack_atlas: Whether to pack all the tile images of a loaded map into one texture atlas, which its tiles are
+                     drawn from (see `Map.texture_atlas`.) Needs a window.
+    :var prerender_layers: Whether loaded maps pre-render their tile layers (see `Map.prerender_layers`.)
+    :var textures: The tile textures loaded so far, shared by all the maps this loader loads.
+    :var workers: How many processes to build a big map's geometry in, and how many threads to decode its textures
+                  in. With 1, maps are loaded entirely on the calling thread.
     """
 
+    load_textures: bool
+    pack_atlas: bool
+    prerender_layers: bool
+    textures: TextureCache
+    workers: int
+
     _map: Map
     _tiled_map: TiledMap
     _tile_gids: dict[int, Tile]
+    _tile_transforms: list[tuple[float, float, float, float, float]]
+    _tile_layers: list[int]
+    _tile_textures: list[str]
+    _spawns: list[CookedSpawn]
 
-    def __init__(self) -> None:
-        self._map = Map()
+    def __init__(
+        self,
+        load_textures: bool = True,
+        pack_atlas: bool = False,
+        prerender_layers: bool = False,
+        workers: int | None = None,
+    ) -> None:
+        """
+        :param workers: Defaults to the number of CPUs.
+        """
+        self.load_textures = load_textures
+        self.pack_atlas = pack_atlas
+        self.prerender_layers = prerender_layers
+        self.textures = TextureCache()
+        self.workers = workers or os.cpu_count() or 1
         self._tile_gids = {}
+        self._start_map()
 
-    def load_map(self, map_filename: str) -> Map:
+    def load_map(self, map_filename: str, use_cache: bool = True) -> Map:
         """
         Load a map from a file.
 
         :param map_filename: The file to load the map from.
+        :param use_cache: Whether to load the map from the cooked map cache if it is up to date, and to update the
+                          cache if it isn't.
         :return: The map object.
         """
-        self._map = Map()
+        self._start_map()
+
+        cache_path = map_cache_path(map_filename)
+        if use_cache:
+            cooked_map = read_map_cache(cache_path)
+            if cooked_map:
+                self._load_cooked_map(cooked_map)
+                self._pack_texture_atlas()
+                self._map.build_spatial_indexes()
+                self._map.build_tile_pages()
+                self._map.build_region_overlay()
+                LOGGER.debug(f"Map load complete (cached): {map_filename}")
+                return self._map
+
+        self._load_source_map(map_filename)
+
+        # create spatial trees and batch the tiles for rendering
+        self._pack_texture_atlas()
+        self._map.build_spatial_indexes()
+        self._map.build_tile_pages()
+        self._map.build_region_overlay()
+
+        if use_cache:
+            self._write_map_cache(map_filename, self._cook_map())
+
+        LOGGER.debug(f"Map load complete: {map_filename}")
+        return self._map
+
+    def load_streaming_map(
+        self, map_filename: str, chunk_size: float = DEFAULT_CHUNK_SIZE, use_cache: bool = True
+    ) -> Map:
+        """
+        Load a map from a file for streaming: the map's tiles and regions are split into square chunks, which are only
+        built once the camera gets close to them (see `Map.stream`). Game objects are spawned right away.
 
+        Chunks are built from the map's cooked data (see `CookedMap`), so a streamed map is made of exactly the same
+        regions and tiles as the map loaded all at once. If the map cache is out of date, the whole map's geometry is
+        built (in the process pool, for big maps) and welded first, but its tiles are left to their chunks.
+
+        :param map_filename: The file to load the map from.
+        :param chunk_size: The width and height of a chunk.
+        :param use_cache: Whether to read the map's cooked data from the map cache if it is up to date, and to update
+                          the cache if it isn't.
+        :return: The map object, with no chunks loaded yet.
+        """
+        self._start_map()
+
+        cache_path = map_cache_path(map_filename)
+        cooked_map = read_map_cache(cache_path) if use_cache else None
+        if cooked_map:
+            self._spawn_cooked(cooked_map.spawns)
+        else:
+            self._load_source_map(map_filename, build_tiles=False)
+            cooked_map = self._cook_map()
+            # The map's content is loaded chunk by chunk
+            self._map.regions = []
+            if use_cache:
+                self._write_map_cache(map_filename, cooked_map)
+
+        sources = _chunk_sources(cooked_map, chunk_size)
+        if self.pack_atlas and self.load_textures:
+            # Chunks are built on a worker thread, so load all their images up front to pack them here
+            self.textures.preload(cooked_map.tile_textures, self.workers)
+            self._pack_texture_atlas()
+
+        self._map.build_spatial_indexes()
+        self._map.chunk_streamer = ChunkStreamer(
+            sources,
+            partial(
+                build_chunk,
+                cooked_map=cooked_map,
+                textures=self.textures if self.load_textures else None,
+                page_size=self._map.tile_page_size,
+                atlas=self._map.texture_atlas,
+            ),
+        )
+
+        LOGGER.debug(f"Map load complete (streaming, {len(sources)} chunks): {map_filename}")
+        return self._map
+
+    def _start_map(self) -> None:
+        self._map = Map(prerender_layers=self.prerender_layers)
+        self._tile_transforms = []
+        self._tile_layers = []
+        self._tile_textures = []
+        self._spawns = []
+
+    def _load_source_map(self, map_filename: str, build_tiles: bool = True) -> None:
+        """
+        Load a map from its Tiled source: spawn its objects, and build its regions and (unless `build_tiles` is
+        False, or the loader doesn't load textures) its tiles.
+        """
         self._tiled_map = pytiled_parser.parse_map(Path(map_filename))
         self._tile_gids = self._load_tile_gids()
 
+        placements: list[Placement] = []
         for layer in self._tiled_map.layers:
             if not isinstance(layer, ObjectLayer):
                 # We only care about ObjectLayers, at least for now
@@ -62,25 +232,92 @@ class MapLoader:
 
             if layer.class_ == LAYER_NAME_LEVEL:
                 # This layer is reserved for level geometry objects
-                self._load_level_layer(layer)
+                placements.extend(self._level_placements(layer))
             elif layer.class_ == LAYER_NAME_OBJECTS:
                 self._load_object_layer(layer)
+        self._load_placements(placements, build_tiles and self.load_textures)
 
-        # create spatial tree
-        geometries = []
-        regions = []
-        for region in self._map.regions:
-            if region.geometry_type == "polygon":
-                geometries.append(shapely.Polygon(region.region_points))
-                regions.append(region)
-            elif region.geometry_type == "line_string":
-                geometries.append(shapely.LineString(region.region_points))
-                regions.append(region)
+        # Make the geometry of neighbouring tiles share vertices, so their surfaces connect
+        weld_vertices(self._map.regions)
 
-        self._map.spatial_tree = SpatialTree(geometries, regions)
+    def _write_map_cache(self, map_filename: str, cooked_map: CookedMap) -> None:
+        cache_path = map_cache_path(map_filename)
+        try:
+            write_map_cache(cache_path, cooked_map, self._find_map_sources(Path(map_filename)))
+        except OSError as e:
+            LOGGER.warning(f"Could not write map cache {cache_path}: {e}")
 
-        LOGGER.debug(f"Map load complete: {map_filename}")
-        return self._map
+    def _cook_map(self) -> CookedMap:
+        """
+        Flatten the loaded map into a CookedMap for the map cache.
+        """
+        regions = self._map.regions
+        vertex_counts = [len(region.region_points) for region in regions]
+        return CookedMap(
+            region_vertices=numpy.array(
+                [point for region in regions for point in region.region_points], dtype=float
+            ).reshape(-1, 2),
+            region_offsets=numpy.concatenate(([0], numpy.cumsum(vertex_counts, dtype=numpy.int64))),
+            region_types=numpy.array([region.designation.value for region in regions], dtype=numpy.int8),
+            region_geometry_types=numpy.array(
+                [GEOMETRY_TYPES.index(region.geometry_type) for region in regions], dtype=numpy.int8
+            ),
+            region_friction=numpy.array([region.friction for region in regions], dtype=float),
+            tile_transforms=numpy.array(self._tile_transforms, dtype=float).reshape(-1, 5),
+            tile_layers=numpy.array(self._tile_layers, dtype=numpy.int8),
+            tile_textures=self._tile_textures,
+            spawns=self._spawns,
+        )
+
+    def _load_cooked_map(self, cooked_map: CookedMap) -> None:
+        """
+        Load a map from the map cache.
+        """
+        self._map.regions.extend(_cooked_regions(cooked_map, numpy.arange(len(cooked_map.region_types))))
+        if self.load_textures:
+            self.textures.preload(cooked_map.tile_textures, self.workers)
+            self._map.tiles.extend(_cooked_tiles(cooked_map, numpy.arange(len(cooked_map.tile_layers)), self.textures))
+        self._spawn_cooked(cooked_map.spawns)
+
+    def _spawn_cooked(self, spawns: list[CookedSpawn]) -> None:
+        for spawn in spawns:
+            self._map.spawn(OBJ_TYPE_MAP[spawn.object_type](), SpawnParameters(position=Vec2(*spawn.position)))
+
+    def _pack_texture_atlas(self) -> None:
+        if self.pack_atlas and self.load_textures:
+            self._map.texture_atlas = self.textures.pack_atlas()
+
+    @staticmethod
+    def _find_map_sources(map_path: Path) -> list[Path]:
+        """
+        Find all the files a map is loaded from: the map itself, the external tilesets and templates it uses, and the
+        tilesets' images.
+        """
+        sources = [map_path]
+        images = []
+
+        def find_references(node: Any, key: str) -> list[str]:
+            if isinstance(node, dict):
+                references = [node[key]] if isinstance(node.get(key), str) else []
+                return references + [ref for value in node.values() for ref in find_references(value, key)]
+            if isinstance(node, list):
+                return [ref for value in node for ref in find_references(value, key)]
+            return []
+
+        map_data = json.loads(map_path.read_text())
+        for tileset in map_data.get("tilesets", []):
+            if "source" in tileset:
+                tileset_path = map_path.parent / tileset["source"]
+                sources.append(tileset_path)
+                # An external tileset's images are relative to the tileset
+                tileset_data = json.loads(tileset_path.read_text())
+                images.extend(tileset_path.parent / image for image in find_references(tileset_data, "image"))
+            else:
+                images.extend(map_path.parent / image for image in find_references(tileset, "image"))
+        for template in sorted(set(find_references(map_data.get("layers", []), "template"))):
+            sources.append(map_path.parent / template)
+
+        return sources + sorted(set(images))
 
     def _load_tile_gids(self) -> dict[int, Tile]:
         """
@@ -105,106 +342,66 @@ class MapLoader:
         for tiled_obj in layer.tiled_objects:
             if tiled_obj.name in OBJ_TYPE_MAP:
                 new_object = OBJ_TYPE_MAP[tiled_obj.name]()
-                self._map.spawn(new_object, self._to_spawn_parameters(tiled_obj))
-
-    def _load_level_layer(self, layer: ObjectLayer) -> None:
-        for tiled_obj in layer.tiled_objects:
-            if isinstance(tiled_obj, ObjectTile):
-                geometry_tile: Tile = self._tile_gids[tiled_obj.gid]
-                self._map.tiles.append(
-                    MapTile(
-                        position=tile_point_to_absolute_luna_point(
-                            tile_position=(tiled_obj.coordinates.x, tiled_obj.coordinates.y),
-                            tile_size=(tiled_obj.size.width, tiled_obj.size.height),
-                            tile_rotation=tiled_obj.rotation,
-                            tile_point=(tiled_obj.size.width / 2, tiled_obj.size.height / 2),
-                        ),
-                        size=(tiled_obj.size.width, tiled_obj.size.height),
-                        rotation=tiled_obj.rotation,
-                        texture=arcade.load_texture(geometry_tile.image),
+                spawn_parameters = self._to_spawn_parameters(tiled_obj)
+                self._map.spawn(new_object, spawn_parameters)
+                self._spawns.append(
+                    CookedSpawn(
+                        object_type=tiled_obj.name,
+                        position=(spawn_parameters.position.x, spawn_parameters.position.y),
                     )
                 )
 
-                # and all regions defined inside this tile
-                if geometry_tile.objects and isinstance(geometry_tile.objects, ObjectLayer):
-                    # Geometry object has collision information
-                    geometry_objects = geometry_tile.objects
-                    for geometry_object in geometry_objects.tiled_objects:
-                        self._add_level_geometry(tiled_obj, geometry_object)
-
-    def _add_level_geometry(self, object_tile: ObjectTile, geometry_object: TiledObject) -> None:
-        points = []
-        geometry_type = ""
-        x = geometry_object.coordinates.x
-        y = geometry_object.coordinates.y
-
-        if isinstance(geometry_object, Polygon):
-            for point in geometry_object.points:
-                points.append((x + point.x, y + point.y))
-            geometry_type = "polygon"
-        elif isinstance(geometry_object, Rectangle):
-            width = geometry_object.size.width
-            height = geometry_object.size.height
-            points.append((x, y))
-            points.append((x + width, y))
-            points.append((x + width, y + height))
-            points.append((x, y + height))
-            geometry_type = "polygon"
-        elif isinstance(geometry_object, Polyline):
-            for point in geometry_object.points:
-                points.append((x + point.x, y + point.y))
-            geometry_type = "line_string"
-        else:
-            raise ValueError(f"Unsupported geometry object type {type(geometry_object)}")
-
-        points = [
-            tile_point_to_absolute_luna_point(
-                tile_position=(object_tile.coordinates.x, object_tile.coordinates.y),
-                tile_size=(object_tile.size.width, object_tile.size.height),
-                tile_point=(x, y),
-                tile_rotation=object_tile.rotation,
-            )
-            for x, y in points
+    def _level_placements(self, layer: ObjectLayer) -> list[Placement]:
+        """
+        Find the tiles placed in a level layer.
+        """
+        return [
+            (tiled_obj, self._tile_gids[tiled_obj.gid], _to_tile_layer(layer, tiled_obj))
+            for tiled_obj in layer.tiled_objects
+            if isinstance(tiled_obj, ObjectTile)
         ]
 
-        if geometry_type == "polygon":
-            # Triangulate polygon to ensure regions are convex
-            triangles = earclip(points)
-            for triangle in triangles:
-                geometry_region = Region(
-                    region_points=triangle,
-                    geometry_type="polygon",
-                    designation=self._to_region_type(geometry_object.class_),
-                )
-                self._map.regions.append(geometry_region)
-        else:
-            for i in range(len(points) - 1):
-                geometry_region = Region(
-                    region_points=[points[i], points[i + 1]],
-                    geometry_type="line_string",
-                    designation=self._to_region_type(geometry_object.class_),
+    def _load_placements(self, placements: list[Placement], build_tiles: bool = True) -> None:
+        """
+        Build the regions of the tiles placed in the map's level layers, and record the tiles for the map cache.
+
+        On big maps this is a pipeline: the regions are built in a pool of processes, in batches of placements, while
+        the textures are decoded on a pool of threads. The results are merged in the order of the placements, so the
+        map is the same however it was loaded.
+
+        :param placements: The tile placements.
+        :param build_tiles: Whether to build the tiles too, loading their textures.
+        """
+        executor = None
+        if self.workers > 1 and len(placements) >= PARALLEL_MIN_PLACEMENTS:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            pairs = [(object_tile, tile) for object_tile, tile, _ in placements]
+            batch_regions: Iterable[list[Region]] = []
+            if executor:
+                # Starts building every batch right away, while the textures load below
+                batches = [pairs[i:i + PLACEMENTS_PER_BATCH] for i in range(0, len(pairs), PLACEMENTS_PER_BATCH)]
+                batch_regions = executor.map(build_placement_regions, batches)
+
+            if build_tiles:
+                self.textures.preload((tile.image for _, tile, _ in placements), self.workers)
+            centres = _tile_centres([object_tile for object_tile, _, _ in placements])
+            for (object_tile, tile, layer), centre in zip(placements, centres):
+                if build_tiles:
+                    self._map.tiles.append(build_map_tile(object_tile, tile, layer, self.textures, centre))
+                self._tile_transforms.append(
+                    (*centre, object_tile.size.width, object_tile.size.height, object_tile.rotation)
                 )
-                self._map.regions.append(geometry_region)
-
-    def _to_region_type(self, geometry_class: str) -> RegionType:
-        """
-        Converts a Tiled class to the respective RegionType.
-        :param geometry_class: The Tiled class
-        :return: The corresponding RegionType
-        """
-        match geometry_class:
-            case "Ground":
-                return RegionType.GROUND
-            case "Platform":
-                return RegionType.PLATFORM
-            case "Wall":
-                return RegionType.WALL
-            case "Ceiling":
-                return RegionType.CEILING
-            case "DeathZone":
-                return RegionType.DEATH_ZONE
-            case _:
-                raise ValueError(f"Unsupported geometry class {geometry_class}")
+                self._tile_layers.append(layer.value)
+                self._tile_textures.append(str(tile.image))
+
+            if not executor:
+                batch_regions = [build_placement_regions(pairs)]
+            for regions in batch_regions:
+                self._map.regions.extend(regions)
+        finally:
+            if executor:
+                executor.shutdown()
 
     def _to_spawn_parameters(self, tiled_obj: TiledObject) -> SpawnParameters:
         """
@@ -214,3 +411,352 @@ class MapLoader:
         return SpawnParameters(
             position=Vec2(tiled_obj.coordinates.x, -tiled_obj.coordinates.y),
         )
+
+
+def build_chunk(
+    source: ChunkSource,
+    cooked_map: CookedMap,
+    textures: TextureCache | None = None,
+    page_size: float = DEFAULT_PAGE_SIZE,
+    atlas: TextureAtlas | None = None,
+) -> MapChunk:
+    """
+    Build a chunk of a streamed map from the map's cooked data, along with its spatial indexes, tile pages, region
+    overlay and surface graph. Run on the chunk streamer's worker thread.
+
+    :param source: The chunk's source.
+    :param cooked_map: The map's cooked data.
+    :param textures: The cache to load the tiles' textures from. Without one, the chunk has no tiles.
+    :param page_size: The width and height of the map cell covered by a tile or region overlay page.
+    :param atlas: The texture atlas the tile pages share. Defaults to the window's default atlas.
+    """
+    chunk = MapChunk(coordinate=source.coordinate, regions=_cooked_regions(cooked_map, source.regions))
+    if textures is not None:
+        chunk.tiles = _cooked_tiles(cooked_map, source.tiles, textures)
+
+    chunk.spatial_tree = SpatialTree.from_regions(chunk.regions)
+    chunk.spatial_indexes = build_type_indexes(chunk.regions)
+    chunk.tile_pages = build_tile_pages(chunk.tiles, page_size, atlas)
+    chunk.region_pages = build_region_overlay(chunk.regions, page_size)
+    chunk.surface_graph = SurfaceGraph.from_regions(
+        chunk.spatial_indexes[RegionType.GROUND].regions, context=_cooked_regions(cooked_map, source.context)
+    )
+    return chunk
+
+
+def build_placement_regions(placements: list[tuple[ObjectTile, Tile]]) -> list[Region]:
+    """
+    Create the regions for all the collision geometry defined inside a batch of tiles placed in a map, in order. The
+    geometry of the whole batch is transformed to world space in one pass. Run in the map loading process pool.
+
+    :param placements: The placements of the tiles in the map, with their tiles from the tileset.
+    """
+    shapes = []
+    # The placement of the tile each shape is defined in, which it is transformed by
+    shape_tiles = []
+    for object_tile, tile in placements:
+        if tile.objects and isinstance(tile.objects, ObjectLayer):
+            # Geometry object has collision information
+            for geometry_object in tile.objects.tiled_objects:
+                shapes.append(_tile_space_geometry(geometry_object))
+                shape_tiles.append(object_tile)
+    if not shapes:
+        return []
+
+    world_points = _transform_tile_points(shape_tiles, [points for points, _, _ in shapes])
+
+    regions: list[Region] = []
+    for (_, geometry_type, designation), points in zip(shapes, world_points):
+        regions.extend(_build_level_geometry(points.tolist(), geometry_type, designation))
+    return regions
+
+
+def build_tile_regions(object_tile: ObjectTile, tile: Tile) -> list[Region]:
+    """
+    Create the regions for all the collision geometry defined inside a tile placed in a map.
+
+    :param object_tile: The placement of the tile in the map.
+    :param tile: The tile from the tileset.
+    """
+    return build_placement_regions([(object_tile, tile)])
+
+
+def build_map_tile(
+    object_tile: ObjectTile,
+    tile: Tile,
+    layer: TileLayer = TileLayer.MIDDLE,
+    textures: TextureCache | None = None,
+    position: Point | None = None,
+) -> MapTile:
+    """
+    Create the MapTile for a tile placed in a map.
+
+    :param object_tile: The placement of the tile in the map.
+    :param tile: The tile from the tileset.
+    :param layer: The render layer to draw the tile in.
+    :param textures: The cache to load the tile's texture from. Without one, the texture is loaded directly.
+    :param position: The world-space centre of the tile, if already worked out (see `_tile_centres`.)
+    """
+    if position is None:
+        position = _tile_centres([object_tile])[0]
+    return MapTile(
+        position=position,
+        size=(object_tile.size.width, object_tile.size.height),
+        rotation=object_tile.rotation,
+        texture=textures.load(tile.image) if textures is not None else arcade.load_texture(tile.image),
+        layer=layer,
+    )
+
+
+def _transform_tile_points(object_tiles: list[ObjectTile], tile_points: list[PointList]) -> list[numpy.ndarray]:
+    """
+    Transform points within many placed tiles to world space, in one pass.
+
+    :param object_tiles: The placements of the tiles in the map.
+    :param tile_points: The points within each tile (i.e. `tile_points[i]` are within `object_tiles[i]`.)
+    :return: The world-space points, split up the same way.
+    """
+    counts = [len(points) for points in tile_points]
+    world_points = tile_points_to_absolute_luna_points(
+        tile_position=numpy.repeat(
+            [(object_tile.coordinates.x, object_tile.coordinates.y) for object_tile in object_tiles], counts, axis=0
+        ),
+        tile_size=numpy.repeat(
+            [(object_tile.size.width, object_tile.size.height) for object_tile in object_tiles], counts, axis=0
+        ),
+        tile_points=numpy.array([point for points in tile_points for point in points], dtype=float),
+        tile_rotation=numpy.repeat([object_tile.rotation for object_tile in object_tiles], counts),
+    )
+    return numpy.split(world_points, numpy.cumsum(counts)[:-1])
+
+
+def _tile_centres(object_tiles: list[ObjectTile]) -> list[Point]:
+    """
+    The world-space centres of tiles placed in a map.
+    """
+    if not object_tiles:
+        return []
+    centres = _transform_tile_points(
+        object_tiles, [[(object_tile.size.width / 2, object_tile.size.height / 2)] for object_tile in object_tiles]
+    )
+    return [(x, y) for ((x, y),) in (centre.tolist() for centre in centres)]
+
+
+def _cooked_regions(cooked_map: CookedMap, indices: Sequence[int]) -> list[Region]:
+    """
+    Create regions from a cooked map. Region points are converted from the cache's memory mapped vertex array into
+    the point tuples that parsed maps have.
+
+    :param cooked_map: The cooked map.
+    :param indices: The indices of the regions to create.
+    """
+    indices = numpy.asarray(indices, dtype=numpy.int64)
+    starts = cooked_map.region_offsets[indices]
+    counts = cooked_map.region_offsets[indices + 1] - starts
+    # Gather all the regions' vertices in one go, and split them up again by their new offsets
+    offsets = numpy.concatenate(([0], numpy.cumsum(counts)))
+    rows = numpy.arange(offsets[-1]) + numpy.repeat(starts - offsets[:-1], counts)
+    vertices = list(map(tuple, cooked_map.region_vertices[rows].tolist()))
+    offsets = offsets.tolist()
+
+    regions = []
+    for i, (designation, geometry_type, friction) in enumerate(
+        zip(
+            cooked_map.region_types[indices].tolist(),
+            cooked_map.region_geometry_types[indices].tolist(),
+            cooked_map.region_friction[indices].tolist(),
+        )
+    ):
+        region = Region(
+            region_points=vertices[offsets[i]:offsets[i + 1]],
+            geometry_type=GEOMETRY_TYPES[geometry_type],
+            designation=RegionType(designation),
+        )
+        region.friction = friction
+        regions.append(region)
+    return regions
+
+
+def _cooked_tiles(cooked_map: CookedMap, indices: Sequence[int], textures: TextureCache) -> list[MapTile]:
+    """
+    Create tiles from a cooked map.
+
+    :param cooked_map: The cooked map.
+    :param indices: The indices of the tiles to create.
+    :param textures: The cache to load the tiles' textures from.
+    """
+    indices = numpy.asarray(indices, dtype=numpy.int64)
+    return [
+        MapTile(
+            position=(x, y),
+            size=(width, height),
+            rotation=rotation,
+            texture=textures.load(cooked_map.tile_textures[index]),
+            layer=TileLayer(layer),
+        )
+        for index, (x, y, width, height, rotation), layer in zip(
+            indices.tolist(), cooked_map.tile_transforms[indices].tolist(), cooked_map.tile_layers[indices].tolist()
+        )
+    ]
+
+
+def _chunk_sources(cooked_map: CookedMap, chunk_size: float) -> dict[ChunkCoordinate, ChunkSource]:
+    """
+    Split a cooked map into chunks. Each region and tile belongs to the chunk that the centre of its bounds is in.
+    """
+    region_bounds = _cooked_region_bounds(cooked_map)
+    sources: dict[ChunkCoordinate, ChunkSource] = {}
+    for index, bounds in enumerate(region_bounds.tolist()):
+        _chunk_source_of(sources, bounds, chunk_size).regions.append(index)
+    for index, bounds in enumerate(_cooked_tile_bounds(cooked_map).tolist()):
+        _chunk_source_of(sources, bounds, chunk_size).tiles.append(index)
+
+    # A chunk's surfaces continue into, and can be covered by, the ground of other chunks that touches its own
+    ground = numpy.flatnonzero(cooked_map.region_types == RegionType.GROUND.value)
+    ground_tree = STRtree(shapely.box(*region_bounds[ground].T))
+    for source in sources.values():
+        own_ground = [index for index in source.regions if cooked_map.region_types[index] == RegionType.GROUND.value]
+        if own_ground:
+            own_bounds = region_bounds[own_ground]
+            own_box = shapely.box(*own_bounds[:, :2].min(axis=0), *own_bounds[:, 2:].max(axis=0))
+            touching = ground[ground_tree.query(own_box)]
+            source.context = sorted(set(touching.tolist()).difference(source.regions))
+    return sources
+
+
+def _chunk_source_of(sources: dict[ChunkCoordinate, ChunkSource], bounds: Bounds, chunk_size: float) -> ChunkSource:
+    """
+    Find the chunk that content with the given bounds belongs to, creating it if needed, and grow the chunk's bounds
+    to contain the content.
+    """
+    coordinate = chunk_coordinate((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2, chunk_size)
+    source = sources.get(coordinate)
+    if source is None:
+        source = sources[coordinate] = ChunkSource(coordinate=coordinate, bounds=tuple(bounds))
+    else:
+        source.bounds = (
+            min(source.bounds[0], bounds[0]),
+            min(source.bounds[1], bounds[1]),
+            max(source.bounds[2], bounds[2]),
+            max(source.bounds[3], bounds[3]),
+        )
+    return source
+
+
+def _cooked_region_bounds(cooked_map: CookedMap) -> numpy.ndarray:
+    """
+    (R, 4) The world-space bounds of each region in a cooked map.
+    """
+    starts = cooked_map.region_offsets[:-1]
+    if not len(starts):
+        return numpy.empty((0, 4))
+    vertices = numpy.asarray(cooked_map.region_vertices)
+    return numpy.hstack((numpy.minimum.reduceat(vertices, starts), numpy.maximum.reduceat(vertices, starts)))
+
+
+def _cooked_tile_bounds(cooked_map: CookedMap) -> numpy.ndarray:
+    """
+    (T, 4) The world-space bounds of each tile in a cooked map.
+    """
+    x, y, width, height, rotation = numpy.asarray(cooked_map.tile_transforms).T
+    angle = numpy.radians(rotation)
+    cos, sin = numpy.abs(numpy.cos(angle)), numpy.abs(numpy.sin(angle))
+    # The tiles are rotated about their centres
+    half_width = (width * cos + height * sin) / 2
+    half_height = (width * sin + height * cos) / 2
+    return numpy.column_stack((x - half_width, y - half_height, x + half_width, y + half_height))
+
+
+def _tile_space_geometry(geometry_object: TiledObject) -> tuple[list[Point], str, RegionType]:
+    """
+    The points of a collision geometry object within its tile, with its geometry type and region type.
+    """
+    points = []
+    x = geometry_object.coordinates.x
+    y = geometry_object.coordinates.y
+
+    if isinstance(geometry_object, Polygon):
+        for point in geometry_object.points:
+            points.append((x + point.x, y + point.y))
+        geometry_type = "polygon"
+    elif isinstance(geometry_object, Rectangle):
+        width = geometry_object.size.width
+        height = geometry_object.size.height
+        points.append((x, y))
+        points.append((x + width, y))
+        points.append((x + width, y + height))
+        points.append((x, y + height))
+        geometry_type = "polygon"
+    elif isinstance(geometry_object, Polyline):
+        for point in geometry_object.points:
+            points.append((x + point.x, y + point.y))
+        geometry_type = "line_string"
+    else:
+        raise ValueError(f"Unsupported geometry object type {type(geometry_object)}")
+    return points, geometry_type, _to_region_type(geometry_object.class_)
+
+
+def _build_level_geometry(points: PointList, geometry_type: str, designation: RegionType) -> list[Region]:
+    """
+    Create the regions for a collision geometry object, from its world-space points.
+    """
+    regions = []
+    if geometry_type == "polygon":
+        # Split the polygon into convex pieces, as regions must be convex
+        for piece in convex_decomposition(points):
+            geometry_region = Region(
+                region_points=piece,
+                geometry_type="polygon",
+                designation=designation,
+            )
+            regions.append(geometry_region)
+    else:
+        # One region per straight section of the line
+        points = remove_collinear(points)
+        for i in range(len(points) - 1):
+            geometry_region = Region(
+                region_points=[points[i], points[i + 1]],
+                geometry_type="line_string",
+                designation=designation,
+            )
+            regions.append(geometry_region)
+    return regions
+
+
+def _to_tile_layer(layer: ObjectLayer, object_tile: ObjectTile) -> TileLayer:
+    """
+    Find the render layer of a tile placed in a level layer, from the `PROPERTY_RENDER_LAYER` custom property of the
+    tile or, if it doesn't have one, of the level layer.
+    """
+    properties: Properties = {**(layer.properties or {}), **(object_tile.properties or {})}
+    render_layer = properties.get(PROPERTY_RENDER_LAYER, "middle")
+    match render_layer:
+        case "background":
+            return TileLayer.BACKGROUND
+        case "middle":
+            return TileLayer.MIDDLE
+        case "foreground":
+            return TileLayer.FOREGROUND
+        case _:
+            raise ValueError(f"Unsupported render layer {render_layer}")
+
+
+def _to_region_type(geometry_class: str) -> RegionType:
+    """
+    Converts a Tiled class to the respective RegionType.
+    :param geometry_class: The Tiled class
+    :return: The corresponding RegionType
+    """
+    match geometry_class:
+        case "Ground":
+            return RegionType.GROUND
+        case "Platform":
+            return RegionType.PLATFORM
+        case "Wall":
+            return RegionType.WALL
+        case "Ceiling":
+            return RegionType.CEILING
+        case "DeathZone":
+            return RegionType.DEATH_ZONE
+        case _:
+            raise ValueError(f"Unsupported geometry class {geometry_class}")
@@ -0,0 +1,261 @@
+"""
+Frame profiler, for finding out which part of the game blows the frame budget.
+
+Hot paths are wrapped in named timing scopes:
+
+    with PROFILER.scope("Map.draw.tiles"):
+        ...
+
+Every frame, the time spent in each scope is added up, and at the end of the frame (`Profiler.end_frame`) the totals
+go into a ring buffer holding the last few seconds of frames, from which the mean and 99th percentile time of each
+scope are worked out. Every single scope is also kept as a trace event, which can be exported for Chrome's trace
+viewer (chrome://tracing, or https://ui.perfetto.dev) to see exactly when each scope ran.
+
+The profiler is disabled until it is needed: a disabled scope costs a method call and an attribute check. Scopes are
+meant to be used on the main thread.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import ContextManager
+
+import numpy
+
+# Number of frames kept in the ring buffer (5 seconds at the game's 120 frames per second)
+DEFAULT_FRAME_CAPACITY = 600
+
+# Number of individual scope timings kept for exporting as a trace. The oldest are dropped first.
+DEFAULT_EVENT_CAPACITY = 200_000
+
+# Name of the scope covering each whole frame, from the end of the previous frame to the end of this one
+FRAME_SCOPE = "frame"
+
+# A single run of a scope: its name, when it started and how long it took (both in nanoseconds), and its thread
+TraceEvent = tuple[str, int, int, int]
+
+
+@dataclass
+class ScopeStats:
+    """
+    Timing statistics of one scope, over the frames in the profiler's ring buffer.
+
+    :var name: The name of the scope.
+    :var mean_ms: The mean time spent in the scope per frame, in milliseconds.
+    :var p99_ms: The 99th percentile time spent in the scope per frame, in milliseconds.
+    :var max_ms: The most time spent in the scope in one frame, in milliseconds.
+    :var calls: The mean number of times the scope ran per frame.
+    """
+
+    name: str
+    mean_ms: float
+    p99_ms: float
+    max_ms: float
+    calls: float
+
+
+class _Scope:
+    """
+    Times one run of a scope, and records it with the profiler when it ends.
+    """
+
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter_ns()
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        self._profiler.record(self._name, self._start, time.perf_counter_ns() - self._start)
+
+
+class _DisabledScope:
+    """
+    Stands in for a scope while the profiler is disabled. Does nothing.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        pass
+
+
+_DISABLED_SCOPE = _DisabledScope()
+
+
+class Profiler:
+    """
+    Collects the timings of named scopes, per frame.
+
+    :var enabled: Whether scopes are timed. Scopes started while disabled aren't recorded.
+    :var frame_capacity: Number of frames kept in the ring buffer.
+    :var frames: Number of frames recorded since the profiler was last reset.
+    """
+
+    enabled: bool
+    frame_capacity: int
+    frames: int
+
+    # Per scope: the total time (in nanoseconds) and number of runs in each frame of the ring buffer
+    _frame_times: dict[str, numpy.ndarray]
+    _frame_calls: dict[str, numpy.ndarray]
+    # Per scope: the total time and number of runs so far in the frame in progress
+    _current: dict[str, list[int]]
+    _frame_start: int | None
+    _events: deque[TraceEvent]
+    _lock: threading.Lock
+
+    def __init__(
+        self, frame_capacity: int = DEFAULT_FRAME_CAPACITY, event_capacity: int = DEFAULT_EVENT_CAPACITY
+    ) -> None:
+        self.enabled = False
+        self.frame_capacity = frame_capacity
+        self._events = deque(maxlen=event_capacity)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget all the recorded timings.
+        """
+        with self._lock:
+            self.frames = 0
+            self._frame_times = {}
+            self._frame_calls = {}
+            self._current = {}
+            self._frame_start = None
+            self._events.clear()
+
+    def scope(self, name: str) -> ContextManager[None]:
+        """
+        Time a block of code, if the profiler is enabled.
+
+        :param name: The name of the scope. Every run of a scope with the same name in a frame is added up.
+        """
+        return _Scope(self, name) if self.enabled else _DISABLED_SCOPE
+
+    def record(self, name: str, start: int, duration: int) -> None:
+        """
+        Record one run of a scope.
+
+        :param name: The name of the scope.
+        :param start: When the scope started, from `time.perf_counter_ns`.
+        :param duration: How long the scope took, in nanoseconds.
+        """
+        with self._lock:
+            totals = self._current.get(name)
+            if totals is None:
+                totals = self._current[name] = [0, 0]
+            totals[0] += duration
+            totals[1] += 1
+            self._events.append((name, start, duration, threading.get_ident()))
+
+    def end_frame(self) -> None:
+        """
+        Finish the frame in progress: move its scope totals into the ring buffer. Also records the whole frame's time,
+        since the end of the previous frame, as the `FRAME_SCOPE` scope.
+        """
+        if not self.enabled:
+            self._frame_start = None
+            return
+
+        now = time.perf_counter_ns()
+        if self._frame_start is not None:
+            self.record(FRAME_SCOPE, self._frame_start, now - self._frame_start)
+        self._frame_start = now
+
+        with self._lock:
+            slot = self.frames % self.frame_capacity
+            for times in self._frame_times.values():
+                times[slot] = 0
+            for calls in self._frame_calls.values():
+                calls[slot] = 0
+            for name, (total, count) in self._current.items():
+                if name not in self._frame_times:
+                    self._frame_times[name] = numpy.zeros(self.frame_capacity, dtype=numpy.int64)
+                    self._frame_calls[name] = numpy.zeros(self.frame_capacity, dtype=numpy.int64)
+                self._frame_times[name][slot] = total
+                self._frame_calls[name][slot] = count
+            self._current = {}
+            self.frames += 1
+
+    def history(self, name: str) -> numpy.ndarray:
+        """
+        The time spent in a scope in each frame of the ring buffer, oldest first.
+
+        :param name: The name of the scope.
+        :return: The times, in milliseconds.
+        """
+        count = min(self.frames, self.frame_capacity)
+        times = self._frame_times.get(name)
+        if times is None:
+            return numpy.zeros(count)
+        # Roll the ring buffer so its oldest frame comes first
+        return numpy.roll(times, -(self.frames % self.frame_capacity))[-count:] / 1e6 if count else numpy.zeros(0)
+
+    def stats(self) -> list[ScopeStats]:
+        """
+        The timing statistics of every scope, over the frames in the ring buffer, slowest (by mean) first.
+        """
+        count = min(self.frames, self.frame_capacity)
+        if count == 0:
+            return []
+
+        stats = []
+        for name in self._frame_times:
+            times = self.history(name)
+            stats.append(
+                ScopeStats(
+                    name=name,
+                    mean_ms=float(times.mean()),
+                    p99_ms=float(numpy.percentile(times, 99)),
+                    max_ms=float(times.max()),
+                    calls=float(self._frame_calls[name].sum()) / count,
+                )
+            )
+        return sorted(stats, key=lambda scope_stats: scope_stats.mean_ms, reverse=True)
+
+    def export_chrome_trace(self, path: str | Path) -> int:
+        """
+        Write the recorded scopes to a file in the Chrome trace event format, as complete ("X") events.
+
+        :param path: The file to write.
+        :return: The number of events written.
+        """
+        with self._lock:
+            events = list(self._events)
+
+        process_id = os.getpid()
+        trace_events = [
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": start / 1e3,
+                "dur": duration / 1e3,
+                "pid": process_id,
+                "tid": thread_id,
+            }
+            for name, start, duration, thread_id in events
+        ]
+        Path(path).write_text(json.dumps({"traceEvents": trace_events, "displayTimeUnit": "ms"}))
+        return len(trace_events)
+
+
+PROFILER = Profiler()
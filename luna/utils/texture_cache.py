@@ -0,0 +1,136 @@
+"""
+Texture cache for loading maps, so each distinct tile image is decoded once, however many times it is placed.
+"""
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+import arcade
+from arcade import Texture, TextureAtlas
+
+from luna.utils.logging import LOGGER
+
+# (resolved image path, x, y, width, height) of a texture. A zero width and height means the whole image.
+TextureKey = tuple[str, int, int, int, int]
+
+# Extra space allowed in an atlas for the padding around its textures and the packing not being perfect
+_ATLAS_SLACK = 1.25
+
+
+class TextureCache:
+    """
+    The textures loaded for a map, one per distinct image (or sub-rectangle of an image.) Safe to use from the chunk
+    streaming worker thread.
+
+    :var loads: How many textures the cache had to load, i.e. its cache misses.
+    :var hits: How many textures were found in the cache.
+    """
+
+    loads: int
+    hits: int
+
+    _textures: dict[TextureKey, Texture]
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self.hits = 0
+        self._textures = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._textures)
+
+    @property
+    def textures(self) -> list[Texture]:
+        """
+        The distinct textures in the cache, in the order they were loaded.
+        """
+        return list(self._textures.values())
+
+    def load(self, path: str | Path, x: int = 0, y: int = 0, width: int = 0, height: int = 0) -> Texture:
+        """
+        Get the texture for an image file, loading it if it isn't in the cache yet.
+
+        :param path: The image file.
+        :param x: The left of the sub-rectangle of the image to use.
+        :param y: The top of the sub-rectangle of the image to use.
+        :param width: The width of the sub-rectangle, or 0 to use the whole image.
+        :param height: The height of the sub-rectangle, or 0 to use the whole image.
+        """
+        key = _texture_key(path, x, y, width, height)
+        with self._lock:
+            texture = self._textures.get(key)
+            if texture is not None:
+                self.hits += 1
+                return texture
+
+        # Decode outside the lock, so threads loading different images don't wait for each other
+        texture = _load_texture(key)
+        with self._lock:
+            # Another thread may have loaded the same image in the meantime: keep the texture it added
+            cached = self._textures.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self._textures[key] = texture
+            self.loads += 1
+            return texture
+
+    def preload(self, paths: Iterable[str | Path], workers: int = 1) -> None:
+        """
+        Load the whole images of many files at once, decoding the ones that aren't in the cache yet on a pool of
+        threads. The textures are added to the cache in the order of `paths`, however long each one takes to decode.
+
+        :param paths: The image files.
+        :param workers: How many images to decode at the same time.
+        """
+        keys = list(dict.fromkeys(_texture_key(path) for path in paths))
+        with self._lock:
+            missing = [key for key in keys if key not in self._textures]
+        if not missing:
+            return
+
+        if workers > 1 and len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="texture-loader") as executor:
+                textures = list(executor.map(_load_texture, missing))
+        else:
+            textures = [_load_texture(key) for key in missing]
+
+        with self._lock:
+            for key, texture in zip(missing, textures):
+                if key not in self._textures:
+                    self._textures[key] = texture
+                    self.loads += 1
+
+    def pack_atlas(self, atlas: TextureAtlas | None = None) -> TextureAtlas:
+        """
+        Pack every texture in the cache into one texture atlas, so all the tiles using them can be drawn without
+        switching textures. Needs an OpenGL context, i.e. a window.
+
+        :param atlas: The atlas to add the textures to. Defaults to a new atlas, just big enough for the textures.
+        :return: The atlas.
+        """
+        textures = self.textures
+        if atlas is None:
+            area = sum((texture.width + 2) * (texture.height + 2) for texture in textures) * _ATLAS_SLACK
+            widest = max((max(texture.width, texture.height) for texture in textures), default=1)
+            size = 2 ** math.ceil(math.log2(max(math.sqrt(area), widest, 1)))
+            atlas = TextureAtlas((size, size))
+
+        for texture in textures:
+            atlas.add(texture)
+        LOGGER.debug(f"Packed {len(textures)} textures into a {atlas.width}x{atlas.height} atlas")
+        return atlas
+
+
+def _texture_key(path: str | Path, x: int = 0, y: int = 0, width: int = 0, height: int = 0) -> TextureKey:
+    return str(Path(path).resolve()), x, y, width, height
+
+
+def _load_texture(key: TextureKey) -> Texture:
+    path, x, y, width, height = key
+    return arcade.load_texture(path, x=x, y=y, width=width, height=height)
@@ -9,9 +9,17 @@ The Y-coordinate is flipped:
 """
 
 import math
+from typing import TYPE_CHECKING
 
+import numpy
 import pyglet.math
-from arcade.types import Point, Size2D
+
+if TYPE_CHECKING:
+    # Importing arcade sets up its whole graphics stack, which converting co-ordinates doesn't need
+    from arcade.types import Point, Size2D
+
+# round_epsilon's rounding, as a scale: values are rounded to whole multiples of 1 / _ROUNDING_SCALE
+_ROUNDING_SCALE = 1e10
 
 
 def round_epsilon(x: float) -> float:
@@ -23,7 +31,29 @@ def round_epsilon(x: float) -> float:
     return round(x, 10)
 
 
-def tiled_to_luna(point: Point) -> Point:
+def round_epsilon_array(values: numpy.ndarray) -> numpy.ndarray:
+    """
+    Round an array of floats to 10 decimal places, with exactly the same results as `round_epsilon`.
+
+    Scaling, rounding to integers and scaling back is exact, except where the scaled value is too big to have a
+    fraction, or so close to halfway between two integers that the scaling's own rounding error could have moved it
+    across. Those few values are rounded with `round_epsilon` instead.
+
+    :param values: The floats to round.
+    :return: A new array of the rounded floats.
+    """
+    values = numpy.asarray(values, dtype=float)
+    with numpy.errstate(over="ignore", invalid="ignore"):
+        scaled = values * _ROUNDING_SCALE
+        rounded = numpy.rint(scaled) / _ROUNDING_SCALE
+        magnitude = numpy.abs(scaled)
+        inexact = (numpy.abs(scaled - numpy.floor(scaled) - 0.5) <= magnitude * 2.0**-51) | ~(magnitude < 2.0**52)
+    for index in numpy.flatnonzero(inexact).tolist():
+        rounded.flat[index] = round_epsilon(float(values.flat[index]))
+    return rounded
+
+
+def tiled_to_luna(point: "Point") -> "Point":
     """
     Convert a point from Tiled co-ordinate space to Luna co-ordinate space.
     :param point: The point to convert.
@@ -32,9 +62,22 @@ def tiled_to_luna(point: Point) -> Point:
     return round_epsilon(point[0]), -round_epsilon(point[1])
 
 
+def tiled_to_luna_array(points: numpy.ndarray) -> numpy.ndarray:
+    """
+    Convert an array of points from Tiled co-ordinate space to Luna co-ordinate space, with exactly the same results
+    as `tiled_to_luna`.
+
+    :param points: (N, 2) The points to convert.
+    :return: (N, 2) A new array of the points in Luna co-ordinate space.
+    """
+    luna_points = round_epsilon_array(points)
+    luna_points[:, 1] *= -1
+    return luna_points
+
+
 def tile_point_to_absolute_luna_point(
-    tile_position: Point, tile_size: Size2D[float], tile_point: Point, tile_rotation: float
-) -> Point:
+    tile_position: "Point", tile_size: "Size2D[float]", tile_point: "Point", tile_rotation: float
+) -> "Point":
     """
     Points within a tile are relative. Apply translation and rotation to the point to get the world coordinate.
 
@@ -54,3 +97,41 @@ def tile_point_to_absolute_luna_point(
     tiled_world_pos = tile_position[0] + rotated_origin_to_point_vec.x, tile_position[1] + rotated_origin_to_point_vec.y
     # convert to Luna's co-ordinate space
     return tiled_to_luna(tiled_world_pos)
+
+
+def tile_points_to_absolute_luna_points(
+    tile_position: "Point | numpy.ndarray",
+    tile_size: "Size2D[float] | numpy.ndarray",
+    tile_points: numpy.ndarray,
+    tile_rotation: float | numpy.ndarray,
+) -> numpy.ndarray:
+    """
+    Convert many points within tiles to world co-ordinates in one pass, with exactly the same results as
+    `tile_point_to_absolute_luna_point`. The tile can be the same for every point, or given per point, to convert the
+    points of many tiles at once.
+
+    :var tile_position: (2,) or (N, 2) The position of the tile (from Tiled.) Corresponds to the bottom left corner
+                        of the tile.
+    :var tile_size: (2,) or (N, 2) The size of the tile (from Tiled.)
+    :var tile_points: (N, 2) The points within the tile to convert. Origin is the top left of the tile.
+    :var tile_rotation: A float, or (N,), the (clockwise) rotation of the tile, in degrees.
+
+    :return: (N, 2) The points in Luna world space.
+    """
+    tile_points = numpy.asarray(tile_points, dtype=float).reshape(-1, 2)
+    tile_position = numpy.asarray(tile_position, dtype=float)
+    tile_size = numpy.asarray(tile_size, dtype=float)
+
+    # Rotate with the same operations as pyglet's Vec2.rotate, in the same order, so the results are bit for bit the
+    # same. Tiles share a few rotations, so the sines and cosines are worked out once per rotation.
+    rotations, inverse = numpy.unique(numpy.asarray(tile_rotation, dtype=float).reshape(-1), return_inverse=True)
+    angles = [math.radians(rotation) for rotation in rotations.tolist()]
+    sin = numpy.array([math.sin(angle) for angle in angles])[inverse.reshape(-1)]
+    cos = numpy.array([math.cos(angle) for angle in angles])[inverse.reshape(-1)]
+    x = tile_points[:, 0]
+    y = tile_points[:, 1] - tile_size[..., 1]
+
+    tiled_world_points = numpy.empty_like(tile_points)
+    tiled_world_points[:, 0] = tile_position[..., 0] + (cos * x - sin * y)
+    tiled_world_points[:, 1] = tile_position[..., 1] + (sin * x + cos * y)
+    return tiled_to_luna_array(tiled_world_points)
@@ -2,10 +2,20 @@ import arcade
 import pyglet.shapes
 from arcade.camera import Camera2D
 
+from luna.core.profiler_overlay import ProfilerOverlay
 from luna.core.view import View
 from luna.managers.game_object_manager import GameObjectManager
 from luna.managers.input_manager import InputManager
 from luna.managers.state_manager import StateManager
+from luna.utils.logging import LOGGER
+from luna.utils.profiler import PROFILER
+
+# Key that shows and hides the profiler overlay (and turns profiling on and off with it)
+KEY_TOGGLE_PROFILER = arcade.key.F3
+
+# Key that exports the profiler's recorded scopes as a Chrome trace, to `TRACE_FILENAME`
+KEY_EXPORT_TRACE = arcade.key.F4
+TRACE_FILENAME = "luna_trace.json"
 
 
 class PlayView(View):
@@ -15,34 +25,50 @@ class PlayView(View):
     :var state_manager: The state manager, which stores the state of the game.
     :var game_object_manager: The game object manager, which handles game object logic.
     :var camera: The camera through which the world is viewed.
+    :var profiler_overlay: The on-screen frame profiler.
     """
 
     state_manager: StateManager
     game_object_manager: GameObjectManager
     camera: Camera2D
+    profiler_overlay: ProfilerOverlay
 
-    def __init__(self, input_manager: InputManager, state_manager: StateManager) -> None:
+    def __init__(self, input_manager: InputManager, state_manager: StateManager, frame_time: float) -> None:
+        """
+        :param input_manager: The input manager.
+        :param state_manager: The state manager.
+        :param frame_time: The time between the window's draws, in seconds, i.e. the frame budget.
+        """
         super().__init__(input_manager)
         self.state_manager = state_manager
         self.game_object_manager = GameObjectManager(self.state_manager, self.input_manager)
         self.camera = Camera2D()
+        self.profiler_overlay = ProfilerOverlay(PROFILER, frame_time)
 
     def on_draw(self) -> None:
         self.clear(color=arcade.color.BLACK)
 
         with self.camera.activate():
-            # Draw the level (incl. game objects)
-            self.state_manager.current_map.draw()
+            # Draw the level (incl. game objects), skipping everything outside the camera's view
+            self.state_manager.current_map.draw(
+                view=(self.camera.left, self.camera.bottom, self.camera.right, self.camera.top)
+            )
 
             # draw the origin
             arcade.draw_circle_filled(0, 0, 10, arcade.color.WHITE)
             pyglet.shapes.Star(0, 0, 10, 5, 5, color=(255, 0, 0)).draw()
 
         self.draw_fps()
+        self.profiler_overlay.draw(self.window.height)
+        PROFILER.end_frame()
 
     def draw_fps(self) -> None:
+        stats = self.state_manager.current_map.culling_stats
         arcade.draw_text(
-            f"FPS = {int(arcade.get_fps())} | Camera = {self.camera.position[0]:.2f}, {self.camera.position[1]:.2f}",
+            f"FPS = {int(arcade.get_fps())} | Camera = {self.camera.position[0]:.2f}, {self.camera.position[1]:.2f}"
+            f" | Drawn tiles {stats.tiles_drawn}/{stats.tiles_drawn + stats.tiles_culled},"
+            f" regions {stats.regions_drawn}/{stats.regions_drawn + stats.regions_culled},"
+            f" objects {stats.objects_drawn}/{stats.objects_drawn + stats.objects_culled}",
             10,
             10,
             arcade.color.WHITE,
@@ -53,9 +79,17 @@ class PlayView(View):
         )
 
     def on_update(self, delta_time: float) -> None:
-        delta_time = min(delta_time, 0.03333)  # process only up to 1/30th of a second per update
-
-        self.game_object_manager.update(delta_time)
+        # Run the simulation in fixed steps, however long the frame took
+        with PROFILER.scope("GameObjectManager.advance"):
+            self.game_object_manager.advance(delta_time)
 
         # Update camera after everything else has been updated/moved around.
-        self.camera.position = self.game_object_manager.get_player_position()
+        with PROFILER.scope("camera.update"):
+            self.camera.position = self.game_object_manager.get_player().render_position
+
+    def on_key_press(self, symbol: int, modifiers: int) -> None:
+        if symbol == KEY_TOGGLE_PROFILER:
+            self.profiler_overlay.toggle()
+        elif symbol == KEY_EXPORT_TRACE:
+            events = PROFILER.export_chrome_trace(TRACE_FILENAME)
+            LOGGER.info(f"Exported {events} profiler events to {TRACE_FILENAME}")
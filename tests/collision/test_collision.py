@@ -1,4 +1,5 @@
 import timeit
+from typing import Callable
 
 from arcade.types import PointList
 from pyglet.math import Vec2
@@ -233,3 +234,7 @@ def test_experimental() -> None:
     ])
     map: Map = MapLoader().load_map("../../luna/data/maps/test_map.tmj")
     collision.experimental_collision(character, map, movement)
+
+
+def test_importing_doesnt_import_distance3d(imported_packages: Callable[[str], set[str]]) -> None:
+    assert "distance3d" not in imported_packages("luna.collision.collision")
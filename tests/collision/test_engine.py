@@ -0,0 +1,97 @@
+import numpy
+import pytest
+from pyglet.math import Vec2
+
+from luna.collision import engine
+
+
+def test_pack_polygons() -> None:
+    packed = engine.pack_polygons([[(0, 0), (1, 0), (1, 1)], [(5, 5), (6, 6)]])
+
+    assert packed.shape == (2, 3, 2)
+    # shorter polygons are padded with their last vertex
+    assert packed[1].tolist() == [[5, 5], [6, 6], [6, 6]]
+
+
+def test_sweep_against_batch() -> None:
+    polygon = [(0, 0), (0, 1), (1, 1), (1, 0)]  # unit square with bottom left corner at origin
+    others = engine.pack_polygons(
+        [
+            [(4, 0), (5, 0), (5, 1)],  # triangle in the path, 3 units away
+            [(2, 0.5), (3, 0.5)],  # horizontal line segment in the path, 1 unit away
+            [(0, 5), (1, 5), (1, 6)],  # triangle well above the path
+            [(0.5, 0.5), (1.5, 0.5), (1.5, 1.5)],  # triangle already overlapping the square
+        ]
+    )
+
+    result = engine.sweep_polygon_against(polygon, Vec2(10, 0), others)
+
+    assert result.overlapping.tolist() == [False, False, False, True]
+    assert result.time_of_impact[:3].tolist() == [0.3, 0.1, numpy.inf]
+    assert result.push_out[:3].tolist() == [[0, 0], [0, 0], [0, 0]]
+    assert result.penetration[3] > 0
+
+
+def test_move_into_first_hit() -> None:
+    polygon = [(0, 0), (0, 1), (1, 1), (1, 0)]
+    others = engine.pack_polygons(
+        [
+            [(4, 0), (5, 0), (5, 1)],
+            [(2, 0.5), (3, 0.5)],
+        ]
+    )
+
+    result = engine.move_polygon_into_polygons(polygon, Vec2(10, 0), others)
+
+    assert result.collision
+    assert result.new_movement_vector == Vec2(1, 0)
+
+
+def test_move_out_of_overlap() -> None:
+    polygon = [(0, 0), (0, 1), (1, 1), (1, 0)]
+    # ground that the square has sunk 0.25 units into
+    others = engine.pack_polygons([[(-5, 0.25), (5, 0.25), (5, -1)], [(-5, 0.25), (5, -1), (-5, -1)]])
+
+    result = engine.move_polygon_into_polygons(polygon, Vec2(0, -1), others)
+
+    assert result.collision
+    assert result.new_movement_vector == Vec2(0, 0.25)
+
+
+def test_no_candidates() -> None:
+    polygon = [(0, 0), (0, 1), (1, 1), (1, 0)]
+
+    result = engine.move_polygon_into_polygons(polygon, Vec2(3, 4), numpy.empty((0, 3, 2)))
+
+    assert not result.collision
+    assert result.new_movement_vector == Vec2(3, 4)
+
+
+def test_few_candidates_match_the_batched_sweep(monkeypatch: pytest.MonkeyPatch) -> None:
+    random = numpy.random.default_rng(0)
+
+    def random_polygon() -> list[tuple[float, float]]:
+        x, y = random.integers(-4, 4, size=2).tolist()
+        kind = random.integers(3)
+        if kind == 0:
+            # Boxes on a grid, which touch and tie on depths
+            return [(x, y), (x, y + 1), (x + 2, y + 1), (x + 2, y)]
+        if kind == 1:
+            return [(x, y), (x + random.uniform(0.5, 3), y + random.uniform(-1, 1))]
+        triangle = [(x + random.uniform(-2, 2), y + random.uniform(-2, 2)) for _ in range(3)]
+        (x0, y0), (x1, y1), (x2, y2) = triangle
+        # Clockwise, like the map's convex pieces
+        return triangle if (x1 - x0) * (y2 - y0) - (y1 - y0) * (x2 - x0) < 0 else triangle[::-1]
+
+    for _ in range(2000):
+        polygon = random_polygon()
+        movement = Vec2(*random.choice([-2, 0, 1, 3.5], size=2).tolist())
+        others = engine.pack_polygons([random_polygon() for _ in range(random.integers(1, 5))])
+
+        few = engine.move_polygon_into_polygons(polygon, movement, others)
+        monkeypatch.setattr(engine, "SCALAR_CANDIDATE_LIMIT", 0)
+        batched = engine.move_polygon_into_polygons(polygon, movement, others)
+        monkeypatch.undo()
+
+        assert few.collision == batched.collision
+        assert tuple(few.new_movement_vector) == pytest.approx(tuple(batched.new_movement_vector), abs=1e-9)
@@ -0,0 +1,55 @@
+from luna.collision.probes import ProbeResult, cast_down, cast_horizontal
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+from luna.core.spatial_tree import SpatialTree
+
+
+def _tree() -> SpatialTree:
+    return SpatialTree.from_regions(
+        [
+            Region([(0, 0), (100, 0), (100, 10)], "polygon", RegionType.GROUND),  # sloped triangle
+            Region([(-50, -40), (50, -40)], "line_string", RegionType.GROUND),  # flat ledge below it
+            Region([(200, 0), (200, 100), (210, 100), (210, 0)], "polygon", RegionType.WALL),
+        ]
+    )
+
+
+def test_cast_down_finds_nearest_ground() -> None:
+    tree = _tree()
+    result = ProbeResult()
+
+    # The box covers x 40 to 60, where the top of the triangle is at y 4 to 6
+    assert cast_down(tree, 50, 20, 20, 100, result)
+    assert result.distance == 14
+    assert result.region is tree.regions[0]
+
+    # Left of the triangle, only the ledge is below
+    assert cast_down(tree, -20, 20, 10, 100, result)
+    assert result.distance == 60
+    assert result.region is tree.regions[1]
+
+    # The ledge is out of reach
+    assert not cast_down(tree, -20, 20, 10, 50, result)
+    assert not result.hit
+    assert result.region is None
+
+
+def test_cast_down_from_inside_ground() -> None:
+    result = ProbeResult()
+    assert cast_down(_tree(), 205, 50, 0, 10, result)
+    assert result.distance == 0
+
+
+def test_cast_horizontal_finds_walls() -> None:
+    tree = _tree()
+    result = ProbeResult()
+
+    assert cast_horizontal(tree, 150, 10, 50, 1, 100, result)
+    assert result.distance == 50
+    assert result.region is tree.regions[2]
+
+    assert cast_horizontal(tree, 250, 10, 50, -1, 100, result)
+    assert result.distance == 40
+
+    # Above the wall
+    assert not cast_horizontal(tree, 150, 110, 50, 1, 100, result)
@@ -0,0 +1,204 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from PIL import Image
+
+REPOSITORY_ROOT = Path(__file__).parents[1]
+
+
+def _tile_object(object_id: int, gid: int, x: float, y: float, rotation: float = 0, **properties: str) -> dict:
+    return {
+        "properties": [{"name": name, "type": "string", "value": value} for name, value in properties.items()],
+        "gid": gid,
+        "height": 100,
+        "id": object_id,
+        "name": "",
+        "rotation": rotation,
+        "type": "",
+        "visible": True,
+        "width": 200,
+        "x": x,
+        "y": y,
+    }
+
+
+def _geometry_object(object_id: int, region_class: str, x: float, y: float, **shape: object) -> dict:
+    return {
+        "height": 0,
+        "id": object_id,
+        "name": "",
+        "rotation": 0,
+        "type": region_class,
+        "visible": True,
+        "width": 0,
+        "x": x,
+        "y": y,
+        **shape,
+    }
+
+
+@pytest.fixture
+def tiled_map_path(tmp_path: Path) -> Path:
+    """
+    A small Tiled map on disk: a level layer with a few copies of a 200x100 tile whose collision geometry has a
+    polygon (ground), a rectangle (wall) and a polyline (platform), and an object layer with a spawn point.
+    The level layer's tiles are drawn in the background render layer, except for the last one (foreground.)
+    """
+    Image.new("RGBA", (20, 10), (255, 0, 0, 255)).save(tmp_path / "tile.png")
+
+    tileset = {
+        "columns": 0,
+        "grid": {"height": 1, "orientation": "orthogonal", "width": 1},
+        "margin": 0,
+        "name": "test_tileset",
+        "spacing": 0,
+        "tilecount": 1,
+        "tiledversion": "1.10.2",
+        "tileheight": 100,
+        "tilewidth": 200,
+        "type": "tileset",
+        "version": "1.10",
+        "tiles": [
+            {
+                "id": 0,
+                "image": "tile.png",
+                "imageheight": 10,
+                "imagewidth": 20,
+                "objectgroup": {
+                    "draworder": "index",
+                    "id": 2,
+                    "name": "",
+                    "opacity": 1,
+                    "type": "objectgroup",
+                    "visible": True,
+                    "x": 0,
+                    "y": 0,
+                    "objects": [
+                        _geometry_object(
+                            1,
+                            "Ground",
+                            0,
+                            60,
+                            polygon=[
+                                {"x": 0, "y": 0},
+                                {"x": 50, "y": -10},
+                                {"x": 100, "y": -10},
+                                {"x": 150, "y": 0},
+                                {"x": 200, "y": 0},
+                                {"x": 200, "y": 40},
+                                {"x": 0, "y": 40},
+                            ],
+                        ),
+                        _geometry_object(2, "Wall", 180, 0, height=60, width=20),
+                        _geometry_object(
+                            3,
+                            "Platform",
+                            20,
+                            20,
+                            polyline=[{"x": 0, "y": 0}, {"x": 40, "y": 0}, {"x": 80, "y": 0}, {"x": 120, "y": -5}],
+                        ),
+                    ],
+                },
+            }
+        ],
+    }
+    (tmp_path / "tileset.tsj").write_text(json.dumps(tileset))
+
+    tiled_map = {
+        "compressionlevel": -1,
+        "height": 10,
+        "infinite": False,
+        "nextlayerid": 3,
+        "nextobjectid": 10,
+        "orientation": "orthogonal",
+        "renderorder": "right-down",
+        "tiledversion": "1.10.2",
+        "tileheight": 32,
+        "tilewidth": 32,
+        "type": "map",
+        "version": "1.10",
+        "width": 10,
+        "tilesets": [{"firstgid": 1, "source": "tileset.tsj"}],
+        "layers": [
+            {
+                "class": "LevelLayer",
+                "draworder": "topdown",
+                "id": 1,
+                "name": "Level",
+                "opacity": 1,
+                "properties": [{"name": "render_layer", "type": "string", "value": "background"}],
+                "type": "objectgroup",
+                "visible": True,
+                "x": 0,
+                "y": 0,
+                "objects": [
+                    _tile_object(1, 1, 0, 100),
+                    _tile_object(2, 1, 200, 100),
+                    _tile_object(3, 1, 600, 300, rotation=30, render_layer="foreground"),
+                ],
+            },
+            {
+                "class": "ObjectLayer",
+                "draworder": "topdown",
+                "id": 2,
+                "name": "Game Objects",
+                "opacity": 1,
+                "type": "objectgroup",
+                "visible": True,
+                "x": 0,
+                "y": 0,
+                "objects": [
+                    {
+                        "height": 0,
+                        "id": 9,
+                        "name": "Spawn Point",
+                        "point": True,
+                        "rotation": 0,
+                        "type": "",
+                        "visible": True,
+                        "width": 0,
+                        "x": 50,
+                        "y": -100,
+                    }
+                ],
+            },
+        ],
+    }
+    map_path = tmp_path / "map.tmj"
+    map_path.write_text(json.dumps(tiled_map))
+    return map_path
+
+
+@pytest.fixture
+def imported_packages() -> Callable[[str], set[str]]:
+    """
+    Imports a module in a fresh interpreter, and returns the top-level packages that were imported along with it.
+    The interpreter doesn't inherit the test session's environment (in particular `ARCADE_HEADLESS`); it configures
+    headless mode itself, so modules that import arcade can be imported without a display.
+    """
+
+    def import_module(module: str) -> set[str]:
+        script = (
+            "import sys\n"
+            "from luna.headless import configure_headless\n"
+            "configure_headless()\n"
+            f"import {module}\n"
+            "print(' '.join(sorted({name.split('.')[0] for name in sys.modules})))\n"
+        )
+        environment = {name: value for name, value in os.environ.items() if name != "ARCADE_HEADLESS"}
+        process = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=REPOSITORY_ROOT,
+            env=environment,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return set(process.stdout.split())
+
+    return import_module
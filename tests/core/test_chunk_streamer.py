@@ -0,0 +1,85 @@
+import threading
+
+from luna.core.chunk_streamer import MAX_BUILD_ATTEMPTS, ChunkStreamer
+from luna.core.map_chunk import ChunkCoordinate, ChunkSource, MapChunk
+
+NEAR = (0, 0)
+FAR = (10, 0)
+
+
+def make_sources() -> dict[ChunkCoordinate, ChunkSource]:
+    return {
+        NEAR: ChunkSource(NEAR, (0, 0, 100, 100)),
+        FAR: ChunkSource(FAR, (1000, 0, 1100, 100)),
+    }
+
+
+def test_failed_builds_are_retried_then_left_out() -> None:
+    attempts: list[ChunkCoordinate] = []
+
+    def build_chunk(source: ChunkSource) -> MapChunk:
+        attempts.append(source.coordinate)
+        if source.coordinate == NEAR:
+            raise ValueError("Broken chunk")
+        return MapChunk(source.coordinate)
+
+    streamer = ChunkStreamer(
+        make_sources(), build_chunk, load_distance=2000, unload_distance=3000, required_distance=2000
+    )
+    try:
+        loaded: set[ChunkCoordinate] = set()
+        for _ in range(MAX_BUILD_ATTEMPTS + 1):
+            finished, _ = streamer.update(50, 50, loaded)
+            loaded.update(chunk.coordinate for chunk in finished)
+
+        assert loaded == {FAR}
+        assert streamer.failed == {NEAR}
+        assert attempts.count(NEAR) == MAX_BUILD_ATTEMPTS
+    finally:
+        streamer.shutdown()
+
+
+def test_chunks_out_of_range_are_dropped() -> None:
+    release = threading.Event()
+    built: list[ChunkCoordinate] = []
+
+    def build_chunk(source: ChunkSource) -> MapChunk:
+        built.append(source.coordinate)
+        release.wait()
+        return MapChunk(source.coordinate)
+
+    streamer = ChunkStreamer(make_sources(), build_chunk, load_distance=2000, unload_distance=2000, required_distance=0)
+    try:
+        # The worker is busy building the near chunk, so the far chunk is waiting to start
+        assert streamer.update(-150, 50, set()) == ([], [])
+        near = streamer._pending[NEAR]
+
+        # Moving away drops both chunks, and the far one is never built
+        assert streamer.update(-5000, 50, set()) == ([], [])
+        release.set()
+        near.result()
+        assert streamer.update(-5000, 50, set()) == ([], [])
+        streamer._executor.shutdown(wait=True)
+        assert built == [NEAR]
+    finally:
+        streamer.shutdown()
+
+
+def test_finished_chunks_out_of_range_are_not_loaded() -> None:
+    release = threading.Event()
+
+    def build_chunk(source: ChunkSource) -> MapChunk:
+        release.wait()
+        return MapChunk(source.coordinate)
+
+    streamer = ChunkStreamer(make_sources(), build_chunk, unload_distance=200, required_distance=0)
+    try:
+        assert streamer.update(-150, 50, set()) == ([], [])
+        near = streamer._pending[NEAR]
+        release.set()
+        near.result()
+
+        # The near chunk finished building after the focus moved too far away to keep it
+        assert streamer.update(500, 50, set()) == ([], [])
+    finally:
+        streamer.shutdown()
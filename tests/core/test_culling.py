@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from pyglet.math import Vec2
+
+from luna.core.game_object import GameObject, SpawnParameters
+from luna.core.object_phase import ObjectPhase
+from luna.core.tile_layer import TileLayer
+from luna.utils.map_loader import MapLoader
+
+
+def test_cull_to_view(tiled_map_path: Path) -> None:
+    game_map = MapLoader().load_map(str(tiled_map_path), use_cache=False)
+    game_map.tile_page_size = 200
+    game_map.build_tile_pages()
+    game_map.build_region_overlay()
+    # The map's spawn point isn't drawn at all, so only this object is culled
+    decoration = GameObject()
+    decoration.name = "Decoration"
+    decoration.phases = ObjectPhase.DRAW
+    game_map.spawn(decoration, SpawnParameters(position=Vec2(50, -50)))
+    drawn_objects = [decoration]
+
+    everything = game_map.cull(None)
+    assert everything.stats.tiles_drawn == 3
+    assert everything.stats.regions_drawn == len(game_map.regions)
+    assert everything.objects == drawn_objects
+    assert (everything.stats.objects_drawn, everything.stats.objects_culled) == (1, 0)
+
+    # Looking at the left half of the first tile, near the spawn point
+    visible = game_map.cull((0, -100, 150, 0))
+    assert [(page.layer, page.cell) for page in visible.tile_pages] == [(TileLayer.BACKGROUND, (0, -1))]
+    assert (visible.stats.tiles_drawn, visible.stats.tiles_culled) == (1, 2)
+    assert (visible.stats.tile_pages_drawn, visible.stats.tile_pages_culled) == (1, 2)
+    assert [page.cell for page in visible.region_pages] == [(0, -1)]
+    assert (visible.stats.regions_drawn, visible.stats.regions_culled) == (5, 10)
+    assert visible.objects == drawn_objects
+
+    # Nothing in view
+    nothing = game_map.cull((5000, 5000, 6000, 6000))
+    assert not nothing.tile_pages and not nothing.region_pages and not nothing.objects
+    assert nothing.stats.tiles_culled == 3
+    assert nothing.stats.regions_culled == len(game_map.regions)
+    assert nothing.stats.objects_culled == len(drawn_objects)
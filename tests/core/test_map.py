@@ -0,0 +1,26 @@
+import shapely
+
+from luna.core.map import Map
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+
+
+def test_spatial_index_per_region_type() -> None:
+    game_map = Map(
+        regions=[
+            Region(region_points=[(0, 0), (10, 0), (10, 10)], geometry_type="polygon", designation=RegionType.GROUND),
+            Region(region_points=[(0, 0), (0, 10)], geometry_type="line_string", designation=RegionType.WALL),
+            Region(region_points=[(0, 0), (10, 0), (0, 10)], geometry_type="polygon", designation=RegionType.GROUND),
+        ]
+    )
+    game_map.build_spatial_indexes()
+
+    probe = shapely.box(-1, -1, 11, 11)
+    assert len(game_map.spatial_tree.query(probe)) == 3
+
+    ground = game_map.spatial_index(RegionType.GROUND).query(probe)
+    assert len(ground) == 2
+    assert all(region.designation == RegionType.GROUND for _, region in ground)
+
+    assert len(game_map.spatial_index(RegionType.WALL).query(probe)) == 1
+    assert len(game_map.spatial_index(RegionType.DEATH_ZONE).query(probe)) == 0
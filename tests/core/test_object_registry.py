@@ -0,0 +1,67 @@
+import pytest
+
+from luna.core.game_object import GameObject
+from luna.core.object_phase import ObjectPhase
+from luna.core.object_registry import ObjectRegistry
+from luna.game_objects.spawn_point import SpawnPoint
+
+
+class _Marker(SpawnPoint):
+    pass
+
+
+def test_lookup_by_id_type_and_name() -> None:
+    registry = ObjectRegistry()
+    spawn_point, marker, other = SpawnPoint(), _Marker(), SpawnPoint()
+    ids = [registry.add(game_object) for game_object in (spawn_point, marker, other)]
+
+    assert ids == [0, 1, 2]
+    assert [game_object.object_id for game_object in (spawn_point, marker, other)] == ids
+    assert registry.get(1) is marker
+    assert registry.first(SpawnPoint) is spawn_point
+    # Objects are found under their base classes too
+    assert registry.of_type(SpawnPoint) == [spawn_point, marker, other]
+    assert registry.of_type(GameObject) == list(registry)
+    assert registry.first(_Marker) is marker
+    assert registry.named("Spawn Point") == [spawn_point, marker, other]
+
+    with pytest.raises(ValueError):
+        registry.add(marker)
+
+
+def test_removed_objects_are_not_found() -> None:
+    registry = ObjectRegistry()
+    spawn_point, marker = SpawnPoint(), _Marker()
+    registry.add(spawn_point)
+    registry.add(marker)
+
+    registry.remove(spawn_point)
+    assert spawn_point not in registry and spawn_point.object_id is None
+    assert registry.get(0) is None
+    assert registry.first(SpawnPoint) is marker
+    assert len(registry) == 1
+
+    registry.remove(marker)
+    assert registry.first(SpawnPoint) is None
+    assert registry.of_type(_Marker) == [] and registry.named("Spawn Point") == []
+    with pytest.raises(ValueError):
+        registry.remove(marker)
+
+    # Ids aren't reused
+    assert registry.add(spawn_point) == 2
+
+
+def test_objects_are_only_in_their_phases() -> None:
+    registry = ObjectRegistry()
+    spawn_point, decoration = SpawnPoint(), GameObject()
+    decoration.name = "Decoration"
+    decoration.phases = ObjectPhase.DRAW | ObjectPhase.PHYSICS
+    registry.add(spawn_point)
+    registry.add(decoration)
+
+    assert registry.in_phase(ObjectPhase.DRAW) == [decoration]
+    assert registry.in_phase(ObjectPhase.PHYSICS) == [decoration]
+    assert registry.in_phase(ObjectPhase.UPDATE) == [] and registry.in_phase(ObjectPhase.INPUT) == []
+
+    registry.remove(decoration)
+    assert registry.in_phase(ObjectPhase.DRAW) == []
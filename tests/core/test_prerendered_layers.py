@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import arcade
+import numpy
+import pytest
+from arcade.camera import Camera2D
+
+from luna.core.map import Map
+from luna.core.tile_layer import TileLayer
+from luna.utils.map_loader import MapLoader
+
+
+def _load_prerendered_map(tiled_map_path: Path, page_size: float) -> Map:
+    game_map = MapLoader().load_map(str(tiled_map_path), use_cache=False)
+    game_map.tile_page_size = page_size
+    game_map.prerender_layers = True
+    game_map.build_tile_pages()
+    return game_map
+
+
+def test_pages_cover_every_cell_a_tile_is_in(tiled_map_path: Path) -> None:
+    game_map = _load_prerendered_map(tiled_map_path, page_size=200)
+    layers = game_map._prerendered_layers
+    assert layers is not None
+
+    # The 200x100 tiles each fill half of a cell, and the rotated tile is in several
+    for page in layers.pages:
+        column, row = page.cell
+        assert page.bounds == (column * 200, row * 200, (column + 1) * 200, (row + 1) * 200)
+        assert all(source.layer == page.layer for source in page.sources)
+    background = [page.cell for page in layers.pages if page.layer == TileLayer.BACKGROUND]
+    assert background == [(0, -1), (1, -1)]
+    assert [page.layer for page in layers.pages] == sorted(
+        (page.layer for page in layers.pages), key=lambda layer: layer.value
+    )
+
+    # Only the pages in view are drawn
+    visible = game_map.cull((0, -150, 150, -50))
+    assert [page.cell for page in visible.prerendered_pages] == [(0, -1)]
+
+
+def test_only_changed_pages_are_rendered_again(tiled_map_path: Path) -> None:
+    game_map = _load_prerendered_map(tiled_map_path, page_size=200)
+    layers = game_map._prerendered_layers
+    assert layers is not None
+    for page in layers.pages:
+        page.dirty = False
+
+    # Rebuilding the same tiles keeps every page as it was rendered
+    game_map.build_tile_pages()
+    assert not any(page.dirty for page in layers.pages)
+
+    # Moving the second tile only affects the cells it is now in
+    moved = game_map.tiles[1]
+    moved.position = (moved.position[0] + 10, moved.position[1])
+    game_map.build_tile_pages()
+    assert [page.cell for page in layers.pages if page.dirty] == [(1, -1), (2, -1)]
+
+
+def test_prerendered_layers_look_the_same(tiled_map_path: Path) -> None:
+    try:
+        window = arcade.Window(64, 64, visible=False)
+    except Exception as e:
+        pytest.skip(f"No OpenGL context: {e}")
+
+    def render(game_map: Map) -> numpy.ndarray:
+        game_map._draw_regions = False
+        texture = window.ctx.texture((480, 320), components=4)
+        framebuffer = window.ctx.framebuffer(color_attachments=[texture])
+        camera = Camera2D(position=(400, -150), render_target=framebuffer)
+        with camera.activate():
+            framebuffer.clear(color=(10, 20, 30, 255))
+            game_map.draw(view=(camera.left, camera.bottom, camera.right, camera.top))
+        return numpy.frombuffer(framebuffer.read(components=3), dtype=numpy.uint8)
+
+    try:
+        tiles_map = MapLoader().load_map(str(tiled_map_path), use_cache=False)
+        prerendered_map = _load_prerendered_map(tiled_map_path, page_size=256)
+
+        expected = render(tiles_map)
+        assert numpy.array_equal(render(prerendered_map), expected)
+        # The second frame draws the pages without rendering them again
+        assert numpy.array_equal(render(prerendered_map), expected)
+        assert prerendered_map._prerendered_layers is not None
+        assert all(page.renders <= 1 for page in prerendered_map._prerendered_layers.pages)
+        assert (expected != 0).any()
+    finally:
+        window.close()
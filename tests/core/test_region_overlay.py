@@ -0,0 +1,37 @@
+import numpy
+
+from luna.core.region import Region
+from luna.core.region_overlay import build_region_overlay, outline_segments, thick_line_triangles
+from luna.core.region_type import RegionType
+
+
+def test_outline_segments() -> None:
+    triangle = Region(region_points=[(0, 0), (10, 0), (0, 10)], geometry_type="polygon", designation=RegionType.GROUND)
+    assert outline_segments(triangle).tolist() == [[[0, 0], [10, 0]], [[10, 0], [0, 10]], [[0, 10], [0, 0]]]
+
+    line = Region(region_points=[(0, 0), (10, 0), (20, 5)], geometry_type="line_string", designation=RegionType.WALL)
+    assert outline_segments(line).tolist() == [[[0, 0], [10, 0]], [[10, 0], [20, 5]]]
+
+
+def test_thick_line_triangles() -> None:
+    triangles = thick_line_triangles(numpy.array([[[0.0, 0.0], [10.0, 0.0]]]), width=2)
+    assert triangles.tolist() == [[0, 1], [0, -1], [10, 1], [10, 1], [0, -1], [10, -1]]
+
+
+def test_overlay_is_paged_and_grouped_by_region_type() -> None:
+    regions = [
+        Region(region_points=[(0, 0), (10, 0), (0, 10)], geometry_type="polygon", designation=RegionType.GROUND),
+        Region(region_points=[(20, 0), (20, 10)], geometry_type="line_string", designation=RegionType.WALL),
+        Region(region_points=[(0, 20), (10, 20), (0, 30)], geometry_type="polygon", designation=RegionType.GROUND),
+        Region(region_points=[(500, 0), (510, 0), (500, 10)], geometry_type="polygon", designation=RegionType.GROUND),
+    ]
+    pages = build_region_overlay(regions, page_size=100)
+
+    assert [(page.cell, page.region_count) for page in pages] == [((0, 0), 3), ((5, 0), 1)]
+    assert pages[0].bounds == (0, 0, 20, 30)
+
+    # Two triangles (6 vertices) per outline segment, in one batch per region type
+    assert {region_type: len(vertices) for region_type, vertices in pages[0].triangles.items()} == {
+        RegionType.GROUND: 2 * 3 * 6,
+        RegionType.WALL: 1 * 6,
+    }
@@ -0,0 +1,74 @@
+from pyglet.math import Vec2
+
+from luna.core.game_object import GameObject
+from luna.core.object_phase import ObjectPhase
+from luna.core.simulation_lod import Activity, SimulationLod
+
+
+class _Mover(GameObject):
+    phases = ObjectPhase.UPDATE | ObjectPhase.PHYSICS
+
+    def __init__(self, object_id: int, x: float) -> None:
+        self.name = f"Mover {object_id}"
+        self.object_id = object_id
+        self.position = self.previous_position = self.render_position = Vec2(x, 0)
+        self.step_scales = []
+
+    def set_step_scale(self, step_scale: int) -> None:
+        self.step_scales.append(step_scale)
+
+
+def _create_lod(*xs: float) -> tuple[SimulationLod, list[_Mover]]:
+    simulation_lod = SimulationLod(active_radius=100, reduced_radius=200, reduced_interval=4, wake_ticks=10)
+    movers = [_Mover(object_id, x) for object_id, x in enumerate(xs)]
+    for mover in movers:
+        simulation_lod.add(mover)
+    return simulation_lod, movers
+
+
+def test_activity_by_distance() -> None:
+    simulation_lod, (near, middle, far) = _create_lod(50, 150, 500)
+
+    updates = {near: 0, middle: 0, far: 0}
+    for tick in range(8):
+        simulation_lod.update((0, 0), tick)
+        for game_object, step_scale in simulation_lod.updated:
+            updates[game_object] += step_scale
+
+    assert [simulation_lod.activity(mover) for mover in (near, middle, far)] == [
+        Activity.ACTIVE,
+        Activity.REDUCED,
+        Activity.ASLEEP,
+    ]
+    # The middle band is updated every 4 steps, by 4 steps at a time, so it keeps up
+    assert updates == {near: 8, middle: 8, far: 0}
+    assert far.step_scales == [0]
+    assert simulation_lod.awake_moving == [near, middle]
+    assert simulation_lod.counts() == {Activity.ACTIVE: 1, Activity.REDUCED: 1, Activity.ASLEEP: 1}
+
+    # Moving the focus over wakes the sleeping object, and puts the others to sleep
+    simulation_lod.update((500, 0), 8)
+    assert [simulation_lod.activity(mover) for mover in (near, middle, far)] == [
+        Activity.ASLEEP,
+        Activity.ASLEEP,
+        Activity.ACTIVE,
+    ]
+    assert simulation_lod.updated == [(far, 1)]
+    assert far.step_scales == [0, 1]
+
+
+def test_event_wakes_object() -> None:
+    simulation_lod, (far,) = _create_lod(1000)
+    simulation_lod.update((0, 0), 0)
+    assert simulation_lod.activity(far) == Activity.ASLEEP
+
+    # Woken objects stay active for `wake_ticks` steps, then go back to sleep
+    simulation_lod.wake(far)
+    for tick in range(1, 10):
+        simulation_lod.update((0, 0), tick)
+        assert simulation_lod.updated == [(far, 1)]
+    simulation_lod.update((0, 0), 10)
+    assert simulation_lod.activity(far) == Activity.ASLEEP
+
+    simulation_lod.remove(far)
+    assert simulation_lod.activity(far) is None
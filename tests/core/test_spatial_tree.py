@@ -0,0 +1,141 @@
+import numpy
+import shapely
+
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+from luna.core.spatial_tree import PREPARE_MIN_VERTICES, SpatialTree
+
+
+def _create_tree() -> SpatialTree:
+    regions = [
+        Region(region_points=[(0, 0), (10, 0), (10, 10)], geometry_type="polygon", designation=RegionType.GROUND),
+        Region(region_points=[(20, 0), (30, 0), (30, 10)], geometry_type="polygon", designation=RegionType.WALL),
+        Region(region_points=[(0, 20), (30, 20)], geometry_type="line_string", designation=RegionType.GROUND),
+    ]
+    geometries = [
+        shapely.Polygon(regions[0].region_points),
+        shapely.Polygon(regions[1].region_points),
+        shapely.LineString(regions[2].region_points),
+    ]
+    return SpatialTree(geometries, regions)
+
+
+def test_query_bulk() -> None:
+    tree = _create_tree()
+
+    result = tree.query_bulk([shapely.box(5, 5, 6, 6), shapely.box(25, 5, 26, 25), shapely.box(100, 100, 101, 101)])
+
+    hits = sorted(zip(result.query_indices.tolist(), result.region_indices.tolist()))
+    assert hits == [(0, 0), (1, 1), (1, 2)]
+
+    # the designations line up with the regions that were hit
+    for region_index, designation in zip(result.region_indices, result.designations):
+        assert tree.regions[region_index].designation.value == designation
+
+
+def test_query_bulk_matches_single_query() -> None:
+    tree = _create_tree()
+    probes = [shapely.box(x, y, x + 8, y + 8) for x in range(-10, 40, 5) for y in range(-10, 30, 5)]
+
+    result = tree.query_bulk(probes)
+
+    for query_index, probe in enumerate(probes):
+        expected = sorted(tree.regions.index(region) for _, region in tree.query(probe))
+        assert sorted(result.region_indices[result.query_indices == query_index].tolist()) == expected
+
+
+def test_query_bulk_bounds_and_filter() -> None:
+    tree = _create_tree()
+
+    result = tree.query_bulk_bounds(numpy.array([[-1, -1, 31, 21]]))
+    assert len(result) == 3
+
+    ground = result.filter(RegionType.GROUND)
+    assert sorted(ground.region_indices.tolist()) == [0, 2]
+    assert result.mask(RegionType.WALL).sum() == 1
+
+
+def test_query_bulk_no_hits() -> None:
+    tree = _create_tree()
+
+    result = tree.query_bulk_bounds(numpy.array([[100, 100, 101, 101]]))
+    assert len(result) == 0
+    assert len(result.filter(RegionType.GROUND)) == 0
+
+    empty_tree = SpatialTree([], [])
+    assert len(empty_tree.query_bulk([shapely.box(0, 0, 1, 1)])) == 0
+
+
+def test_query_with_predicate() -> None:
+    tree = _create_tree()
+    # Overlaps the bounding box of the first triangle, but not the triangle itself
+    probe = shapely.box(1, 5, 2, 9)
+
+    assert len(tree.query(probe)) == 1
+    assert tree.query(probe, predicate="intersects") == []
+    assert [region for _, region in tree.query(shapely.box(8, 1, 9, 2), predicate="intersects")] == [tree.regions[0]]
+    assert tree.evaluate("within", numpy.array([0, 1, 2]), shapely.box(-1, -1, 11, 11)).tolist() == [True, False, False]
+
+
+def test_region_arrays() -> None:
+    tree = _create_tree()
+
+    assert tree.bounds.tolist() == [[0, 0, 10, 10], [20, 0, 30, 10], [0, 20, 30, 20]]
+    assert tree.bounds_overlap(numpy.array([0, 1, 2]), 9, 9, 21, 21).tolist() == [True, True, True]
+    assert tree.bounds_overlap(numpy.array([0, 1, 2]), 11, 11, 19, 19).tolist() == [False, False, False]
+
+    # The first triangle is counter-clockwise: its bottom edge faces down, its right edge faces right
+    numpy.testing.assert_allclose(tree.edge_normals[0, :2], [[0, -1], [1, 0]])
+    # The line faces up; its padding and closing edge have no normal
+    numpy.testing.assert_allclose(tree.edge_normals[2], [[0, 1], [0, 0], [0, 0]])
+
+    assert tree.line_directions[2].tolist() == [1, 0]
+    assert tree.line_slopes[2] == 0
+    assert numpy.isnan(tree.line_slopes[0])
+
+
+def test_only_complex_regions_are_prepared() -> None:
+    zigzag = [(x, x % 2) for x in range(PREPARE_MIN_VERTICES)]
+    tree = SpatialTree.from_regions(
+        [
+            Region(region_points=zigzag, geometry_type="line_string", designation=RegionType.GROUND),
+            Region(region_points=[(0, 0), (10, 0), (10, 10)], geometry_type="polygon", designation=RegionType.GROUND),
+        ]
+    )
+
+    assert shapely.is_prepared(tree.geometries).tolist() == [True, False]
+
+
+def test_combine_matches_tree_built_from_all_regions() -> None:
+    regions = [
+        Region(region_points=[(0, 0), (10, 0), (10, 10)], geometry_type="polygon", designation=RegionType.GROUND),
+        Region(region_points=[(0, 20), (30, 20)], geometry_type="line_string", designation=RegionType.GROUND),
+        Region(
+            region_points=[(100, 0), (110, 0), (110, 10), (100, 10)],
+            geometry_type="polygon",
+            designation=RegionType.WALL,
+        ),
+        Region(
+            region_points=[(200, 0), (210, 5), (220, 0)], geometry_type="line_string", designation=RegionType.GROUND
+        ),
+    ]
+    whole = SpatialTree.from_regions(regions)
+    combined = SpatialTree.combine(
+        [SpatialTree.from_regions(regions[:2]), SpatialTree.from_regions([]), SpatialTree.from_regions(regions[2:])]
+    )
+
+    assert combined.regions == whole.regions
+    for name in ("vertices", "closed", "bounds", "edge_normals", "line_directions", "line_slopes"):
+        numpy.testing.assert_array_equal(getattr(combined, name), getattr(whole, name))
+
+    for query in ([-1, -1, 5, 5], [5, 5, 105, 25], [205, -5, 300, 5], [50, 50, 60, 60]):
+        assert sorted(combined.query_indices(*query).tolist()) == sorted(whole.query_indices(*query).tolist())
+    probe = shapely.box(5, 1, 109, 2)
+    assert sorted(id(region) for _, region in combined.query(probe, predicate="intersects")) == sorted(
+        id(region) for _, region in whole.query(probe, predicate="intersects")
+    )
+    hits = combined.query_bulk([shapely.box(0, 0, 250, 1), shapely.box(205, 0, 206, 10)])
+    expected = whole.query_bulk([shapely.box(0, 0, 250, 1), shapely.box(205, 0, 206, 10)])
+    assert sorted(zip(hits.query_indices.tolist(), hits.region_indices.tolist())) == sorted(
+        zip(expected.query_indices.tolist(), expected.region_indices.tolist())
+    )
@@ -0,0 +1,98 @@
+import pytest
+
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+from luna.core.surface_graph import SurfaceGraph, weld_vertices
+
+
+def _ground(*points: tuple[float, float], geometry_type: str = "polygon") -> Region:
+    return Region(region_points=list(points), geometry_type=geometry_type, designation=RegionType.GROUND)
+
+
+def test_weld_vertices() -> None:
+    regions = [_ground((0, 0), (100, 0), (100, 10)), _ground((100.004, 10.003), (200, 10), geometry_type="line_string")]
+
+    assert weld_vertices(regions) == 1
+    assert regions[1].region_points[0] == (100, 10)
+    assert regions[1].region_points[0] is regions[0].region_points[2]
+
+
+def test_surface_follows_connected_edges() -> None:
+    regions = [
+        # A block, drawn clockwise, with a slope on its right
+        _ground((0, 0), (0, 10), (100, 10), (100, 0)),
+        _ground((100, 0), (100, 10), (200, 30), (200, 0)),
+        # and a flat line continuing on from the slope
+        _ground((300, 30), (200, 30), geometry_type="line_string"),
+    ]
+    graph = SurfaceGraph.from_regions(regions)
+
+    assert [(edge.start, edge.end) for edge in graph.edges] == [
+        ((0, 10), (100, 10)),
+        ((100, 10), (200, 30)),
+        ((200, 30), (300, 30)),
+    ]
+    assert [(edge.previous, edge.next) for edge in graph.edges] == [(None, 1), (0, 2), (1, None)]
+    assert not any(edge.contested for edge in graph.edges)
+
+    assert graph.follow(0, 250) == 2
+    assert graph.follow(2, 50) == 0
+    assert graph.follow(0, 350) is None
+    assert graph.edge_under(regions[1], 90, 110) == 1
+
+    # Across the top of the slope, the highest point is on it
+    assert graph.surface_height(1, 140, 160) == pytest.approx(22)
+    assert graph.surface_height(1, 190, 210) == 30
+    # The surface ends at x = 0
+    assert graph.surface_height(0, -10, 10) is None
+
+
+def test_stacked_and_overlapping_ground() -> None:
+    regions = [
+        _ground((0, 0), (100, 0), (100, 10), (0, 10)),
+        # A block stacked exactly on top hides the top of the one below it
+        _ground((0, 10), (100, 10), (100, 20), (0, 20)),
+        # A step standing on part of the top
+        _ground((40, 20), (60, 20), (60, 25), (40, 25)),
+    ]
+    graph = SurfaceGraph.from_regions(regions)
+
+    assert [(edge.start, edge.end, edge.contested) for edge in graph.edges] == [
+        ((0, 20), (100, 20), True),
+        ((40, 25), (60, 25), False),
+    ]
+    assert graph.surface_height(0, 10, 20) is None
+
+
+def test_combined_graphs_connect_and_settle_forks() -> None:
+    left = [_ground((0, 0), (100, 0), (100, 10), (0, 10))]
+    # Past x = 100, the surface forks into a slope up and a flat line
+    right = [
+        _ground((100, 10), (200, 10), geometry_type="line_string"),
+        _ground((100, 0), (100, 10), (200, 30), (200, 0)),
+    ]
+    graph = SurfaceGraph.combine(
+        [SurfaceGraph.from_regions(left, context=right), SurfaceGraph.from_regions(right, context=left)]
+    )
+
+    assert _describe(graph) == _describe(SurfaceGraph.from_regions(left + right))
+    left_edge = graph.edges_of(left[0])[0]
+    assert graph.edges[graph.edges[left_edge].next].region is right[1]
+
+
+def test_context_covers_edges() -> None:
+    floor = _ground((0, 0), (100, 0), (100, 10), (0, 10))
+
+    # Only the floor's own edges are in the graph, but a block stacked exactly on top of it still hides its top
+    assert SurfaceGraph.from_regions([floor], context=[_ground((0, 10), (100, 10), (100, 20), (0, 20))]).edges == []
+
+    # and a step standing on part of it still overlaps it
+    graph = SurfaceGraph.from_regions([floor], context=[_ground((60, 10), (80, 10), (80, 15), (60, 15))])
+    assert [(edge.start, edge.end, edge.contested) for edge in graph.edges] == [((0, 10), (100, 10), True)]
+
+
+def _describe(graph: SurfaceGraph) -> set[tuple]:
+    def ends(edge: int | None) -> tuple | None:
+        return None if edge is None else (graph.edges[edge].start, graph.edges[edge].end)
+
+    return {(edge.start, edge.end, edge.contested, ends(edge.previous), ends(edge.next)) for edge in graph.edges}
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from luna.core.tile_layer import TileLayer
+from luna.core.tile_sprites import build_tile_pages
+from luna.utils.map_loader import MapLoader
+
+
+def test_tiles_are_batched_per_layer(tiled_map_path: Path) -> None:
+    game_map = MapLoader().load_map(str(tiled_map_path), use_cache=False)
+    assert [tile.layer for tile in game_map.tiles] == [TileLayer.BACKGROUND, TileLayer.BACKGROUND, TileLayer.FOREGROUND]
+
+    # One page per layer, since all the tiles fit in a single cell
+    pages = game_map.tile_pages
+    assert [(page.layer, len(page)) for page in pages] == [(TileLayer.BACKGROUND, 2), (TileLayer.FOREGROUND, 1)]
+
+    # Sprites keep the tile order, and draw each tile where it would have been drawn on its own
+    for tile, sprite in zip(game_map.tiles[:2], pages[0].sprite_list):
+        assert sprite.position == tile.position
+        assert (sprite.width, sprite.height) == tile.size
+        assert sprite.angle == tile.rotation
+        assert sprite.texture is tile.texture
+
+
+def test_tile_pages_are_partitioned_by_cell(tiled_map_path: Path) -> None:
+    tiles = MapLoader().load_map(str(tiled_map_path), use_cache=False).tiles
+    pages = build_tile_pages(tiles, page_size=200)
+
+    assert [(page.layer, page.cell, len(page)) for page in pages] == [
+        (TileLayer.BACKGROUND, (0, -1), 1),
+        (TileLayer.BACKGROUND, (1, -1), 1),
+        (TileLayer.FOREGROUND, (3, -2), 1),
+    ]
+    for page, tile in zip(pages, tiles):
+        assert page.bounds == tile.bounds
+
+    # Lazy sprite lists are not uploaded until drawn, and all use the same (default) atlas
+    assert all(page.sprite_list.atlas is None for page in pages)
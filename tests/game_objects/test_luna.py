@@ -0,0 +1,41 @@
+import pytest
+from arcade.experimental.input import ActionState
+from pyglet.math import Vec2
+
+from luna.core.game_object import SpawnParameters
+from luna.core.input_action import InputAction
+from luna.core.map import Map
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+from luna.entities.character import Character
+from luna.game_objects.spawn_point import SpawnPoint
+from luna.managers.game_object_manager import GameObjectManager
+from luna.managers.state_manager import StateManager
+
+
+def test_steps_up_onto_unconnected_ledge() -> None:
+    # A floor, and a ledge a little above it that doesn't share any vertices with it
+    game_map = Map(
+        regions=[
+            Region([(0, -100), (2000, -100), (2000, 0), (0, 0)], "polygon", RegionType.GROUND),
+            Region([(400, 30), (1000, 30)], "line_string", RegionType.GROUND),
+        ]
+    )
+    game_map.build_spatial_indexes()
+    game_map.spawn(SpawnPoint(), SpawnParameters(position=Vec2(100, 0)))
+    manager = GameObjectManager(StateManager(current_map=game_map, character=Character()))
+    luna = manager.get_player()
+    manager.run_headless(60)
+    assert luna.on_ground and luna.position[1] == pytest.approx(0)
+
+    # Walking along the floor, she steps up onto the ledge as soon as she reaches it
+    manager.send_action(luna, InputAction.RIGHT, ActionState.PRESSED)
+    while luna.position[0] < 400:
+        manager.run_headless(1)
+    manager.run_headless(1)
+    assert luna.on_ground and luna.position[1] == pytest.approx(30)
+
+    # and falls back down to the floor past its end
+    while luna.position[0] < 1200:
+        manager.run_headless(1)
+    assert luna.on_ground and luna.position[1] == pytest.approx(0)
@@ -0,0 +1,14 @@
+from types import ModuleType
+
+import pytest
+
+from luna.headless import configure_headless
+
+
+@pytest.fixture(scope="session")
+def runner() -> ModuleType:
+    # The runner imports arcade, so it is only imported once arcade can be configured to run headless
+    configure_headless()
+    from luna.headless import runner
+
+    return runner
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+import arcade  # noqa: F401
+from luna.headless import configure_headless
+
+
+def test_configure_headless_leaves_imported_arcade_alone(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ARCADE_HEADLESS", raising=False)
+    assert not configure_headless()
+    assert "ARCADE_HEADLESS" not in os.environ
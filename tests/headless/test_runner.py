@@ -0,0 +1,22 @@
+from pathlib import Path
+from types import ModuleType
+
+from luna.core.input_action import InputAction
+
+
+def test_scripted_input_is_offset_per_actor(runner: ModuleType) -> None:
+    first = runner.scripted_input(480, 0)
+    second = runner.scripted_input(480, 1)
+    assert len(first) == len(second) == 16
+    assert [event.tick for event in second] == [event.tick + 7 for event in first]
+    assert first[0].action == InputAction.RIGHT
+    assert all(event.tick < 480 for event in runner.scripted_input(100, 30))
+
+
+def test_run_simulation(runner: ModuleType, tiled_map_path: Path) -> None:
+    report = runner.run_simulation(str(tiled_map_path), actors=3, ticks=50, trace_allocations=True)
+    assert report.actors == 3
+    assert report.ticks == 50
+    assert report.ticks_per_second > 0
+    assert 0 < report.p50_us <= report.p99_us
+    assert report.traced_peak_bytes is not None and report.traced_peak_bytes > 0
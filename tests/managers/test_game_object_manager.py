@@ -0,0 +1,147 @@
+import math
+from pathlib import Path
+
+import pytest
+from arcade.experimental.input import ActionState
+from pyglet.math import Vec2
+
+from luna.core.game_object import SpawnParameters
+from luna.core.input_action import InputAction
+from luna.core.input_log import InputLog
+from luna.core.map import Map
+from luna.core.region import Region
+from luna.core.region_type import RegionType
+from luna.core.simulation_lod import Activity, SimulationLod
+from luna.entities.character import Character
+from luna.game_objects.luna import Luna
+from luna.game_objects.spawn_point import SpawnPoint
+from luna.managers.game_object_manager import GameObjectManager
+from luna.managers.state_manager import StateManager
+from luna.utils.map_loader import MapLoader
+from luna.utils.profiler import PROFILER
+
+
+def _create_manager(map_path: Path, **kwargs) -> GameObjectManager:
+    game_map = MapLoader().load_map(str(map_path), use_cache=False)
+    return GameObjectManager(StateManager(current_map=game_map, character=Character()), **kwargs)
+
+
+def test_fixed_steps_with_interpolation(tiled_map_path: Path) -> None:
+    manager = _create_manager(tiled_map_path, timestep=0.01, max_substeps=4)
+    player = manager.get_player()
+
+    # Less than a step: nothing is simulated yet
+    assert manager.advance(0.005) == 0
+    assert manager.tick == 0
+
+    assert manager.advance(0.02) == 2
+    assert manager.tick == 2
+    assert manager.interpolation_alpha == pytest.approx(0.5)
+    expected = player.previous_position + (player.position - player.previous_position) * 0.5
+    assert tuple(player.render_position) == pytest.approx(tuple(expected))
+
+    # A long frame runs at most `max_substeps` steps, and the rest of the time is dropped
+    assert manager.advance(1.0) == 4
+    assert manager.tick == 6
+    assert 0 <= manager.interpolation_alpha < 1
+
+
+def test_profiled_steps_time_each_class_of_object(tiled_map_path: Path) -> None:
+    manager = _create_manager(tiled_map_path)
+    PROFILER.reset()
+    PROFILER.enabled = True
+    try:
+        manager.step()
+        manager.step()
+        PROFILER.end_frame()
+        calls = {scope_stats.name: scope_stats.calls for scope_stats in PROFILER.stats()}
+    finally:
+        PROFILER.enabled = False
+        PROFILER.reset()
+
+    assert calls["Luna.update"] == 2
+    assert calls["GameObjectManager.step"] == 2
+
+
+def test_replay_reproduces_run(tiled_map_path: Path, tmp_path: Path) -> None:
+    recorded = _create_manager(tiled_map_path)
+    script = {10: (InputAction.RIGHT, ActionState.PRESSED), 60: (InputAction.RIGHT, ActionState.RELEASED)}
+    for tick in range(120):
+        if tick in script:
+            recorded.on_action(*script[tick])
+        recorded.run_headless(1)
+
+    assert [(event.tick, event.action) for event in recorded.input_log.events] == [
+        (10, InputAction.RIGHT),
+        (60, InputAction.RIGHT),
+    ]
+    log_path = tmp_path / "input.log"
+    recorded.input_log.save(log_path)
+
+    replayed = _create_manager(tiled_map_path, replay=InputLog.load(log_path))
+    replayed.run_headless(120)
+
+    assert replayed.input_log == recorded.input_log
+    assert replayed.get_player_position() == recorded.get_player_position()
+    assert recorded.get_player_position()[0] > 50
+
+
+def test_despawned_player_is_replaced_by_the_next(tiled_map_path: Path) -> None:
+    manager = _create_manager(tiled_map_path)
+    player = manager.get_player()
+    other = Luna(manager.state_manager)
+    manager.map.spawn(other, SpawnParameters(position=Vec2(100, 0)))
+    assert manager.get_player() is player
+
+    manager.map.despawn(player)
+    assert player not in manager.map.objects
+    assert manager.get_player() is other
+    assert len(manager.map.bodies) == 1
+    manager.run_headless(10)
+
+
+def test_far_objects_sleep_until_woken(tiled_map_path: Path) -> None:
+    manager = _create_manager(tiled_map_path)
+    far = Luna(manager.state_manager)
+    manager.map.spawn(far, SpawnParameters(position=Vec2(10_000, 500)))
+
+    manager.run_headless(60)
+    assert manager.map.simulation_lod.activity(far) == Activity.ASLEEP
+    assert far.position == Vec2(10_000, 500)
+
+    # An input action wakes it up, even that far away, and it carries on from where it stopped
+    manager.send_action(far, InputAction.RIGHT, ActionState.PRESSED)
+    manager.run_headless(10)
+    assert manager.map.simulation_lod.activity(far) == Activity.ACTIVE
+    assert far.position[0] > 10_000 and far.position[1] > 500
+
+
+def test_falling_objects_are_simulated_every_step_until_they_land() -> None:
+    paths = []
+    landed_activities = []
+    for simulation_lod in (SimulationLod(), SimulationLod(active_radius=math.inf)):
+        # The player stands on a floor; far enough away to be simulated at a reduced rate, there is a thin platform
+        game_map = Map(
+            regions=[
+                Region([(0, -100), (400, -100), (400, 0), (0, 0)], "polygon", RegionType.GROUND),
+                Region([(1300, 0), (1600, 0)], "line_string", RegionType.GROUND),
+            ],
+            simulation_lod=simulation_lod,
+        )
+        game_map.build_spatial_indexes()
+        game_map.spawn(SpawnPoint(), SpawnParameters(position=Vec2(100, 0)))
+        manager = GameObjectManager(StateManager(current_map=game_map, character=Character()))
+        falling = Luna(manager.state_manager)
+        game_map.spawn(falling, SpawnParameters(position=Vec2(1450, 1500)))
+
+        path = []
+        for _ in range(240):
+            manager.run_headless(1)
+            path.append(tuple(falling.position))
+        paths.append(path)
+        landed_activities.append(simulation_lod.activity(falling))
+        assert falling.on_ground and falling.position[1] == pytest.approx(0)
+
+    # It falls exactly as it would at the full rate, and is only simulated at a reduced rate once it has landed
+    assert paths[0] == paths[1]
+    assert landed_activities == [Activity.REDUCED, Activity.ACTIVE]
@@ -0,0 +1,101 @@
+import numpy
+import pytest
+
+from luna.physics.body_store import AIR_FRICTION, BodyStore
+
+
+def test_create_remove_and_grow() -> None:
+    bodies = BodyStore(capacity=2)
+    handles = [bodies.create(position=(i, 0), size=(10, 20)) for i in range(5)]
+    assert handles == [0, 1, 2, 3, 4]
+    assert bodies.capacity >= 5
+    assert bodies.position[:5, 0].tolist() == [0, 1, 2, 3, 4]
+
+    bodies.remove(handles[1])
+    assert len(bodies) == 4
+    with pytest.raises(ValueError):
+        bodies.remove(handles[1])
+
+    # Removed handles are reused
+    assert bodies.create(position=(9, 9), size=(1, 1)) == handles[1]
+    assert len(bodies) == 5
+
+
+def test_integrate_applies_gravity_and_caps() -> None:
+    bodies = BodyStore()
+    falling = bodies.create(position=(0, 100), size=(10, 20), gravity=-1000, terminal_velocity=-15)
+    running = bodies.create(position=(0, 0), size=(10, 20), velocity=(500, 0), max_speed=200)
+    bodies.on_ground[running] = True
+
+    bodies.integrate(0.1)
+    assert bodies.velocity[falling].tolist() == [0, -15]
+    assert bodies.position[falling].tolist() == pytest.approx([0, 98.5])
+    assert bodies.velocity[running].tolist() == [200, 0]
+    assert bodies.position[running].tolist() == pytest.approx([20, 0])
+    assert bodies.previous_position[running].tolist() == [0, 0]
+    assert numpy.isnan(bodies.ground_distance[:2]).all()
+
+
+def test_settle_lands_snaps_and_applies_friction() -> None:
+    bodies = BodyStore()
+    landing = bodies.create(position=(0, 10), size=(10, 20), velocity=(0, -100), acceleration=100)
+    no_ground = bodies.create(position=(0, 10), size=(10, 20), velocity=(50, -100), acceleration=100)
+    walking = bodies.create(position=(0, 10), size=(10, 20), velocity=(10, 0), acceleration=100)
+    bodies.on_ground[walking] = True
+    bodies.horizontal_input[walking] = 1
+
+    bodies.integrate(0.1)
+    # Fell 10 units, into ground 2 units above its feet
+    bodies.set_ground(landing, -2, friction=0.5)
+    bodies.set_ground(walking, 5, friction=1.0)
+    bodies.settle(0.1)
+
+    assert bodies.on_ground[landing]
+    assert bodies.velocity[landing].tolist() == [0, 0]
+    assert bodies.position[landing].tolist() == pytest.approx([0, 2])
+
+    # Idle in the air: only horizontal air friction
+    assert not bodies.on_ground[no_ground]
+    assert bodies.friction[no_ground] == AIR_FRICTION
+    assert bodies.velocity[no_ground].tolist() == pytest.approx([50 - AIR_FRICTION * 100 * 0.1, -100])
+
+    # Still on the ground (within snapping distance): snapped down, and accelerating with the ground's friction
+    assert bodies.on_ground[walking]
+    assert bodies.position[walking].tolist() == pytest.approx([1, 5])
+    assert bodies.velocity[walking].tolist() == pytest.approx([20, 0])
+
+
+def test_frozen_bodies_stay_as_they_are() -> None:
+    bodies = BodyStore()
+    standing = bodies.create(position=(0, 0), size=(10, 20), velocity=(100, 0), gravity=-1000, acceleration=500)
+    falling = bodies.create(position=(0, 100), size=(10, 20), velocity=(0, -50), gravity=-1000)
+    bodies.on_ground[standing] = True
+    bodies.step_scale[[standing, falling]] = 0
+
+    # Nothing reports ground for frozen bodies, but they don't leave it, move or slow down
+    bodies.integrate(0.1)
+    bodies.settle(0.1)
+    assert bodies.position[:2].tolist() == [[0, 0], [0, 100]]
+    assert bodies.velocity[:2].tolist() == [[100, 0], [0, -50]]
+    assert bodies.on_ground[:2].tolist() == [True, False]
+
+    # Catching up on two steps moves the body as far as two steps would
+    bodies.step_scale[falling] = 2
+    bodies.integrate(0.1)
+    assert bodies.velocity[falling].tolist() == pytest.approx([0, -250])
+    assert bodies.position[falling].tolist() == pytest.approx([0, 50])
+
+
+def test_removed_bodies_are_not_simulated() -> None:
+    bodies = BodyStore()
+    removed = bodies.create(position=(0, 100), size=(10, 20), gravity=-1000, acceleration=500)
+    bodies.create(position=(50, 100), size=(10, 20), gravity=-1000)
+    bodies.on_ground[removed] = True
+    bodies.remove(removed)
+
+    bodies.integrate(0.1)
+    bodies.settle(0.1)
+    assert bodies.position[removed].tolist() == [0, 100]
+    assert bodies.velocity[removed].tolist() == [0, 0]
+    assert bodies.on_ground[removed]
+    assert bodies.position[1].tolist() == pytest.approx([50, 90])
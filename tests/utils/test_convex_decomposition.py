@@ -0,0 +1,56 @@
+import math
+
+import shapely
+
+from luna.utils.convex_decomposition import convex_decomposition, merge_triangles, remove_collinear
+
+
+def _assert_convex_cover(pieces: list, polygon: list) -> None:
+    for piece in pieces:
+        area = shapely.Polygon(piece).area
+        assert area > 0
+        assert math.isclose(area, shapely.Polygon(piece).convex_hull.area)
+    assert math.isclose(sum(shapely.Polygon(piece).area for piece in pieces), shapely.Polygon(polygon).area)
+
+
+def test_convex_polygon_is_one_piece() -> None:
+    circle = [(100 * math.cos(i * math.tau / 40), 100 * math.sin(i * math.tau / 40)) for i in range(40)]
+
+    pieces = convex_decomposition(circle)
+
+    assert len(pieces) == 1
+    assert len(pieces[0]) == 40
+    _assert_convex_cover(pieces, circle)
+
+
+def test_concave_polygon() -> None:
+    # An E shape, drawn clockwise: the back and three prongs
+    comb = [(0, 0), (0, 30), (10, 30), (10, 10), (20, 10), (20, 30), (30, 30), (30, 10), (40, 10), (40, 30),
+            (50, 30), (50, 0)]
+
+    pieces = convex_decomposition(comb)
+
+    assert len(pieces) == 4
+    _assert_convex_cover(pieces, comb)
+
+
+def test_merge_triangles_keeps_reflex_diagonals() -> None:
+    # Two triangles forming a concave quadrilateral (a dart) can't be merged
+    dart = merge_triangles([[(0, 0), (10, 5), (4, 5)], [(0, 0), (4, 5), (0, 10)]])
+    assert len(dart) == 2
+
+    # but two forming a square can, dropping the diagonal
+    square = merge_triangles([[(0, 0), (10, 0), (10, 10)], [(0, 0), (10, 10), (0, 10)]])
+    assert [sorted(piece) for piece in square] == [[(0, 0), (0, 10), (10, 0), (10, 10)]]
+
+
+def test_remove_collinear() -> None:
+    assert remove_collinear([(0, 0), (40, 0), (80, 0), (120, -5)]) == [(0, 0), (80, 0), (120, -5)]
+    # A line that doubles back on itself keeps its turning point
+    assert remove_collinear([(0, 0), (10, 0), (5, 0)]) == [(0, 0), (10, 0), (5, 0)]
+    assert remove_collinear([(0, 0), (5, 0), (10, 0), (10, 10), (0, 10), (0, 5)], closed=True) == [
+        (0, 0),
+        (10, 0),
+        (10, 10),
+        (0, 10),
+    ]
@@ -0,0 +1,77 @@
+import json
+import os
+from pathlib import Path
+
+import numpy
+import pytest
+from PIL import Image
+
+from luna.utils import map_cache
+from luna.utils.map_cache import map_cache_path, read_map_cache
+from luna.utils.map_loader import MapLoader
+
+
+def test_cached_map_matches_parsed_map(tiled_map_path: Path) -> None:
+    parsed_map = MapLoader().load_map(str(tiled_map_path))
+    assert map_cache_path(tiled_map_path).exists()
+
+    cooked_map = read_map_cache(map_cache_path(tiled_map_path))
+    assert cooked_map is not None
+    assert isinstance(cooked_map.region_vertices, numpy.memmap)
+
+    cached_map = MapLoader().load_map(str(tiled_map_path))
+
+    assert len(cached_map.regions) == len(parsed_map.regions)
+    for cached_region, parsed_region in zip(cached_map.regions, parsed_map.regions):
+        assert cached_region.region_points == parsed_region.region_points
+        assert cached_region.geometry_type == parsed_region.geometry_type
+        assert cached_region.designation == parsed_region.designation
+        assert cached_region.friction == parsed_region.friction
+
+    assert [(tile.position, tile.size, tile.rotation, tile.layer) for tile in cached_map.tiles] == [
+        (tile.position, tile.size, tile.rotation, tile.layer) for tile in parsed_map.tiles
+    ]
+    assert [(type(obj), obj.position) for obj in cached_map.objects] == [
+        (type(obj), obj.position) for obj in parsed_map.objects
+    ]
+    assert len(cached_map.spatial_tree) == len(parsed_map.spatial_tree)
+
+
+def test_cache_invalidated_by_source_change(tiled_map_path: Path) -> None:
+    MapLoader().load_map(str(tiled_map_path))
+
+    # Touching a source without changing it keeps the cache valid
+    tileset_path = tiled_map_path.parent / "tileset.tsj"
+    stat = tileset_path.stat()
+    os.utime(tileset_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert read_map_cache(map_cache_path(tiled_map_path)) is not None
+
+    # Changing the contents of a source invalidates it
+    tileset = json.loads(tileset_path.read_text())
+    tileset["tiles"][0]["objectgroup"]["objects"].pop()
+    tileset_path.write_text(json.dumps(tileset))
+    assert read_map_cache(map_cache_path(tiled_map_path)) is None
+
+    # and the next load parses the map again, with the change
+    assert len(MapLoader().load_map(str(tiled_map_path)).regions) == 9
+    assert read_map_cache(map_cache_path(tiled_map_path)) is not None
+
+
+def test_cache_invalidated_by_tile_image_change(tiled_map_path: Path) -> None:
+    MapLoader().load_map(str(tiled_map_path))
+
+    Image.new("RGBA", (20, 10), (0, 0, 255, 255)).save(tiled_map_path.parent / "tile.png")
+    assert read_map_cache(map_cache_path(tiled_map_path)) is None
+
+
+def test_cache_invalidated_by_version_change(tiled_map_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    MapLoader().load_map(str(tiled_map_path))
+
+    monkeypatch.setattr(map_cache, "MAP_CACHE_VERSION", map_cache.MAP_CACHE_VERSION + 1)
+    assert read_map_cache(map_cache_path(tiled_map_path)) is None
+
+
+def test_load_without_cache(tiled_map_path: Path) -> None:
+    MapLoader().load_map(str(tiled_map_path), use_cache=False)
+
+    assert not map_cache_path(tiled_map_path).exists()
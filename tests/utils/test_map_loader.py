@@ -0,0 +1,130 @@
+from pathlib import Path
+
+import pytest
+
+from luna.core.region_type import RegionType
+from luna.core.surface_graph import SurfaceGraph
+from luna.utils import map_loader
+from luna.utils.map_cache import map_cache_path, read_map_cache
+from luna.utils.map_loader import MapLoader
+
+
+def test_streaming_map_loads_and_unloads_chunks(tiled_map_path: Path) -> None:
+    whole_map = MapLoader().load_map(str(tiled_map_path), use_cache=False)
+    streamed_map = MapLoader().load_streaming_map(str(tiled_map_path), chunk_size=200)
+    assert streamed_map.chunk_streamer is not None
+    streamed_map.chunk_streamer.load_distance = 150
+    streamed_map.chunk_streamer.unload_distance = 250
+    streamed_map.chunk_streamer.required_distance = 150
+
+    # Objects are spawned right away, but no level content is loaded until the map is streamed
+    assert len(streamed_map.objects) == len(whole_map.objects)
+    assert not streamed_map.regions and not streamed_map.tiles
+
+    # Close to the first two tiles only
+    streamed_map.stream((200, -50))
+    assert len(streamed_map.chunks) == 2
+    assert len(streamed_map.tiles) == 2
+    assert len(streamed_map.regions) == len(whole_map.regions) * 2 // 3
+    assert len(streamed_map.spatial_tree) == len(streamed_map.regions)
+
+    # The chunks were indexed as they were built, and the map is made of their indexes
+    chunks = list(streamed_map.chunks.values())
+    assert len(streamed_map.tile_pages) == sum(len(chunk.tile_pages) for chunk in chunks)
+    first_ground = chunks[0].spatial_indexes[RegionType.GROUND].regions[0]
+    last_ground = chunks[1].spatial_indexes[RegionType.GROUND].regions[-1]
+    surface_graph = streamed_map.surface_graph_of(first_ground)
+    assert surface_graph is streamed_map.surface_graph_of(last_ground)
+    assert len(surface_graph) == sum(len(chunk.surface_graph) for chunk in chunks)
+    assert streamed_map.spatial_index(RegionType.GROUND).regions == [
+        region for chunk in sorted(chunks, key=lambda chunk: chunk.coordinate)
+        for region in chunk.spatial_indexes[RegionType.GROUND].regions
+    ]
+
+    # Move over to the last (rotated) tile: the first two are far enough away to be unloaded
+    streamed_map.stream((700, -300))
+    assert len(streamed_map.chunks) == 1
+    assert [tile.position for tile in streamed_map.tiles] == [whole_map.tiles[2].position]
+    assert [region.region_points for region in streamed_map.regions] == [
+        region.region_points for region in whole_map.regions[len(whole_map.regions) * 2 // 3:]
+    ]
+    assert streamed_map.surface_graph_of(first_ground) is None
+
+    streamed_map.chunk_streamer.shutdown()
+
+
+def _describe_surfaces(graph: SurfaceGraph) -> set[tuple]:
+    def ends(edge: int | None) -> tuple | None:
+        return None if edge is None else (graph.edges[edge].start, graph.edges[edge].end)
+
+    return {
+        (edge.start, edge.end, edge.contested, ends(edge.previous), ends(edge.next)) for edge in graph.edges
+    }
+
+
+def test_streamed_surfaces_connect_across_chunks(tiled_map_path: Path) -> None:
+    whole_map = MapLoader(load_textures=False).load_map(str(tiled_map_path), use_cache=False)
+    whole_ground = whole_map.spatial_index(RegionType.GROUND).regions[0]
+
+    streamed_map = MapLoader(load_textures=False).load_streaming_map(str(tiled_map_path), chunk_size=100)
+    assert streamed_map.chunk_streamer is not None
+    streamed_map.chunk_streamer.required_distance = 1000
+    streamed_map.stream((200, -50))
+    assert len(streamed_map.chunks) > 3
+    streamed_ground = streamed_map.spatial_index(RegionType.GROUND).regions[0]
+
+    # The surfaces were built chunk by chunk, but they are the same as the whole map's
+    streamed_graph = streamed_map.surface_graph_of(streamed_ground)
+    assert _describe_surfaces(streamed_graph) == _describe_surfaces(whole_map.surface_graph_of(whole_ground))
+
+    # The ground of the first tile continues into the second's, which is in another chunk
+    chunk_of = {id(region): chunk.coordinate for chunk in streamed_map.chunks.values() for region in chunk.regions}
+    (border_edge,) = [edge for edge in streamed_graph.edges if edge.end == (200, -60)]
+    assert border_edge.next is not None
+    next_edge = streamed_graph.edges[border_edge.next]
+    assert next_edge.start == (200, -60)
+    assert chunk_of[id(next_edge.region)] != chunk_of[id(border_edge.region)]
+
+    streamed_map.chunk_streamer.shutdown()
+
+
+def test_streamed_map_is_cooked(tiled_map_path: Path) -> None:
+    MapLoader(load_textures=False).load_streaming_map(str(tiled_map_path)).chunk_streamer.shutdown()
+    assert read_map_cache(map_cache_path(tiled_map_path)) is not None
+
+    # The cache written while streaming holds the whole map, tiles included
+    parsed_map = MapLoader().load_map(str(tiled_map_path), use_cache=False)
+    cached_map = MapLoader().load_map(str(tiled_map_path))
+    assert [region.region_points for region in cached_map.regions] == [
+        region.region_points for region in parsed_map.regions
+    ]
+    assert [(tile.position, tile.size, tile.rotation, tile.layer) for tile in cached_map.tiles] == [
+        (tile.position, tile.size, tile.rotation, tile.layer) for tile in parsed_map.tiles
+    ]
+
+    # and later streamed loads are built from it
+    streamed_map = MapLoader().load_streaming_map(str(tiled_map_path))
+    assert streamed_map.chunk_streamer is not None
+    streamed_map.stream((200, -50))
+    assert sorted(region.region_points for region in streamed_map.regions) == sorted(
+        region.region_points for region in parsed_map.regions
+    )
+    assert len(streamed_map.tiles) == len(parsed_map.tiles)
+    assert len(streamed_map.objects) == len(parsed_map.objects)
+    streamed_map.chunk_streamer.shutdown()
+
+
+def test_parallel_load_matches_sequential_load(tiled_map_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    sequential_map = MapLoader(workers=1).load_map(str(tiled_map_path), use_cache=False)
+
+    # Send even this small map's geometry to the process pool, one placement per batch
+    monkeypatch.setattr(map_loader, "PARALLEL_MIN_PLACEMENTS", 1)
+    monkeypatch.setattr(map_loader, "PLACEMENTS_PER_BATCH", 1)
+    parallel_map = MapLoader(workers=2).load_map(str(tiled_map_path), use_cache=False)
+
+    assert [(region.region_points, region.geometry_type, region.designation) for region in parallel_map.regions] == [
+        (region.region_points, region.geometry_type, region.designation) for region in sequential_map.regions
+    ]
+    assert [(tile.position, tile.rotation, tile.layer) for tile in parallel_map.tiles] == [
+        (tile.position, tile.rotation, tile.layer) for tile in sequential_map.tiles
+    ]
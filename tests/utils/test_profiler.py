@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from luna.utils.profiler import FRAME_SCOPE, Profiler
+
+
+def test_disabled_profiler_records_nothing() -> None:
+    profiler = Profiler()
+    with profiler.scope("update"):
+        pass
+    profiler.end_frame()
+
+    assert profiler.frames == 0
+    assert profiler.stats() == []
+
+
+def test_ring_buffer_stats() -> None:
+    profiler = Profiler(frame_capacity=4)
+    profiler.enabled = True
+
+    # Scope "update" takes (frame + 1) ms, twice per frame. "draw" only runs in the first frame, which is dropped.
+    for frame in range(6):
+        profiler.record("update", 0, (frame + 1) * 500_000)
+        profiler.record("update", 0, (frame + 1) * 500_000)
+        if frame == 0:
+            profiler.record("draw", 0, 1_000_000)
+        profiler.end_frame()
+
+    assert profiler.frames == 6
+    assert profiler.history("update").tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert profiler.history("draw").tolist() == [0.0, 0.0, 0.0, 0.0]
+
+    stats = {scope_stats.name: scope_stats for scope_stats in profiler.stats()}
+    assert stats["update"].mean_ms == pytest.approx(4.5)
+    assert stats["update"].max_ms == 6.0
+    assert stats["update"].p99_ms == pytest.approx(5.97)
+    assert stats["update"].calls == 2.0
+    assert stats["draw"].calls == 0.0
+    # Every frame but the first has a start to be timed from
+    assert len(profiler.history(FRAME_SCOPE)) == 4
+
+
+def test_export_chrome_trace(tmp_path: Path) -> None:
+    profiler = Profiler()
+    profiler.enabled = True
+    with profiler.scope("GameObjectManager.step"):
+        with profiler.scope("Luna.update"):
+            pass
+    profiler.end_frame()
+
+    assert profiler.export_chrome_trace(tmp_path / "trace.json") == 2
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    inner, outer = events
+    assert (inner["name"], inner["cat"], inner["ph"]) == ("Luna.update", "Luna", "X")
+    assert outer["name"] == "GameObjectManager.step"
+    # The inner scope is nested inside the outer one
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
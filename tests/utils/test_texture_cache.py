@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import arcade
+import pytest
+from PIL import Image
+
+from luna.utils.map_loader import MapLoader
+from luna.utils import texture_cache
+from luna.utils.texture_cache import TextureCache
+
+
+def test_textures_are_loaded_once(tmp_path: Path) -> None:
+    Image.new("RGBA", (20, 10), (255, 0, 0, 255)).save(tmp_path / "tile.png")
+    cache = TextureCache()
+
+    texture = cache.load(tmp_path / "tile.png")
+    # The same file, by another path
+    assert cache.load(str(tmp_path / ".." / tmp_path.name / "tile.png")) is texture
+    # A sub-rectangle of it is a different texture
+    cropped = cache.load(tmp_path / "tile.png", x=0, y=0, width=10, height=10)
+
+    assert cropped is not texture
+    assert (cropped.width, cropped.height) == (10, 10)
+    assert (len(cache), cache.loads, cache.hits) == (2, 2, 1)
+
+
+def test_map_tiles_share_textures(tiled_map_path: Path) -> None:
+    loader = MapLoader()
+    game_map = loader.load_map(str(tiled_map_path), use_cache=False)
+
+    assert len(game_map.tiles) == 3
+    assert len({id(tile.texture) for tile in game_map.tiles}) == 1
+    assert loader.textures.loads == 1
+
+    # Loading the map again doesn't load any more textures
+    cached_map = loader.load_map(str(tiled_map_path))
+    assert cached_map.tiles[0].texture is game_map.tiles[0].texture
+    assert loader.textures.loads == 1
+
+
+def test_pack_atlas(tiled_map_path: Path) -> None:
+    try:
+        window = arcade.Window(64, 64, visible=False)
+    except Exception as e:
+        pytest.skip(f"No OpenGL context: {e}")
+
+    try:
+        game_map = MapLoader(pack_atlas=True).load_map(str(tiled_map_path), use_cache=False)
+
+        assert game_map.texture_atlas is not None
+        assert game_map.texture_atlas.has_texture(game_map.tiles[0].texture)
+        assert all(page.sprite_list.atlas is game_map.texture_atlas for page in game_map.tile_pages)
+    finally:
+        window.close()
+
+
+def test_preload_keeps_order(tmp_path: Path) -> None:
+    paths = []
+    for i in range(4):
+        Image.new("RGBA", (10 + i, 10), (255, 0, 0, 255)).save(tmp_path / f"tile_{i}.png")
+        paths.append(tmp_path / f"tile_{i}.png")
+    cache = TextureCache()
+    first = cache.load(paths[2])
+
+    cache.preload([*paths, paths[0]], workers=4)
+
+    assert [texture.width for texture in cache.textures] == [12, 10, 11, 13]
+    assert cache.textures[0] is first
+    assert cache.loads == 4
+
+
+def test_textures_are_decoded_outside_the_lock(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    Image.new("RGBA", (10, 10), (255, 0, 0, 255)).save(tmp_path / "tile.png")
+    cache = TextureCache()
+    load_texture = texture_cache._load_texture
+    locked_while_decoding = []
+
+    def checked_load_texture(key: texture_cache.TextureKey) -> arcade.Texture:
+        locked_while_decoding.append(cache._lock.locked())
+        return load_texture(key)
+
+    monkeypatch.setattr(texture_cache, "_load_texture", checked_load_texture)
+    texture = cache.load(tmp_path / "tile.png")
+
+    assert locked_while_decoding == [False]
+    assert cache.load(tmp_path / "tile.png") is texture
+    assert (cache.loads, cache.hits) == (1, 1)
@@ -1,4 +1,16 @@
-from luna.utils.tiled_utils import tiled_to_luna, tile_point_to_absolute_luna_point
+import random
+from typing import Callable
+
+import numpy
+
+from luna.utils.tiled_utils import (
+    round_epsilon,
+    round_epsilon_array,
+    tiled_to_luna,
+    tiled_to_luna_array,
+    tile_point_to_absolute_luna_point,
+    tile_points_to_absolute_luna_points,
+)
 
 
 def test_tiled_to_luna_point() -> None:
@@ -65,3 +77,61 @@ def test_tile_point_to_absolute_luna_point() -> None:
             tile_point=(0, 100),  # bottom left
             tile_rotation=i
         ) == (0, 0)  # no change because it is at the rotation point
+
+
+def test_round_epsilon_array_matches_round_epsilon() -> None:
+    rng = numpy.random.default_rng(0)
+    values = numpy.concatenate(
+        [
+            rng.uniform(-1e7, 1e7, 10000),
+            rng.uniform(-1, 1, 10000),
+            # Halfway between two multiples of 1e-10, give or take the rounding error
+            numpy.round(rng.uniform(-1000, 1000, 10000), 10) + 5e-11,
+            [0.5e-10, 1.5e-10, -2.5e-10, 1e300, -0.0],
+        ]
+    )
+    assert round_epsilon_array(values).tolist() == [round_epsilon(value) for value in values.tolist()]
+
+
+def test_tiled_to_luna_array() -> None:
+    points = [(1, 2), (0, 0), (-1, 1), (0.12345678901234, -3)]
+    assert tiled_to_luna_array(numpy.array(points)).tolist() == [list(tiled_to_luna(point)) for point in points]
+
+
+def test_tile_points_to_absolute_luna_points_matches_scalar() -> None:
+    generator = random.Random(0)
+    for _ in range(200):
+        position = (generator.uniform(-1e4, 1e4), generator.uniform(-1e4, 1e4))
+        size = (generator.choice([100, 200, 64.5]), generator.choice([100, 128, 33.3]))
+        rotation = generator.choice([0, 90, -90, 180, 30, generator.uniform(-360, 360)])
+        points = [(generator.uniform(0, size[0]), generator.choice([0, size[1], generator.uniform(0, size[1])]))]
+        points += [(0, 0), (size[0], size[1])]
+
+        assert tile_points_to_absolute_luna_points(position, size, numpy.array(points), rotation).tolist() == [
+            list(tile_point_to_absolute_luna_point(position, size, point, rotation)) for point in points
+        ]
+
+
+def test_tile_points_to_absolute_luna_points_per_point_tiles() -> None:
+    """
+    Each point can have its own tile.
+    """
+    tiles = [((0, 0), (100, 100), 0), ((50, -50), (100, 100), 90), ((10, 20), (200, 100), 30)]
+    points = [(60, 70), (0, 0), (200, 100)]
+
+    assert tile_points_to_absolute_luna_points(
+        tile_position=numpy.array([position for position, _, _ in tiles]),
+        tile_size=numpy.array([size for _, size, _ in tiles]),
+        tile_points=numpy.array(points),
+        tile_rotation=numpy.array([rotation for _, _, rotation in tiles]),
+    ).tolist() == [
+        list(tile_point_to_absolute_luna_point(position, size, point, rotation))
+        for (position, size, rotation), point in zip(tiles, points)
+    ]
+
+
+def test_importing_doesnt_import_arcade(imported_packages: Callable[[str], set[str]]) -> None:
+    """
+    Converting co-ordinates doesn't need the graphics stack, so importing this module doesn't import it.
+    """
+    assert "arcade" not in imported_packages("luna.utils.tiled_utils")